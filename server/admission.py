@@ -0,0 +1,225 @@
+"""
+Admission control for the API
+Under a burst, a few expensive endpoints (login, search, document
+generation, imports) could take every threadpool slot, and the cheap ones
+queued behind them. AdmissionMiddleware decides before a request reaches
+its endpoint:
+
+- Rate limits: token buckets per user id (from the bearer token) and per
+  client IP. A request takes its cost class's tokens from both, and gets a
+  429 with Retry-After when either bucket is short.
+- Cost classes: each route is cheap, standard, expensive or streaming.
+  Standard, expensive and streaming requests run at most `concurrency` at
+  a time per worker. The next `queue` wait up to `max_wait` seconds for a
+  slot, in arrival order. Past that they get a 503 with Retry-After
+  straight away, rather than adding to everyone's latency. Cheap requests
+  are never queued. A request keeps its slot until its response body has
+  been sent. So long streamed responses (exports) get a class and slots of
+  their own, and a few slow downloads can't hold up logins or searches.
+
+State is per worker process and lives on its event loop, so no locks. The
+client IP is the ASGI client address; run uvicorn with --proxy-headers
+behind a proxy. Shed requests are counted in jobhunt_admission_shed_total.
+
+JOBHUNT_ADMISSION=0 turns it all off. A rate of 0 turns that bucket off.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from starlette.routing import Match
+
+from metrics import ADMISSION_QUEUED, ADMISSION_SHED, ADMISSION_WAIT
+
+ENABLED = os.getenv("JOBHUNT_ADMISSION", "1") != "0"
+USER_RATE = float(os.getenv("JOBHUNT_RATE_USER", "20"))  # tokens per second
+USER_BURST = float(os.getenv("JOBHUNT_RATE_USER_BURST", "60"))
+IP_RATE = float(os.getenv("JOBHUNT_RATE_IP", "100"))
+IP_BURST = float(os.getenv("JOBHUNT_RATE_IP_BURST", "300"))
+MAX_BUCKETS = 100_000  # least recently used keys are dropped past this, starting full again
+SHED_RETRY_AFTER = 2  # seconds, for 503s
+
+
+@dataclass(frozen=True)
+class CostClass:
+    """Rate-limit cost and concurrency bounds for a group of routes"""
+    name: str
+    tokens: float
+    concurrency: Optional[int] = None  # None: not queued
+    queue: int = 0
+    max_wait: float = 0.0
+
+
+COST_CLASSES = {
+    "cheap": CostClass("cheap", 1),
+    "standard": CostClass("standard", 1, int(os.getenv("JOBHUNT_ADMIT_STANDARD", "32")), 128, 5.0),
+    "expensive": CostClass("expensive", 5, int(os.getenv("JOBHUNT_ADMIT_EXPENSIVE", "4")), 32, 2.0),
+    "streaming": CostClass("streaming", 5, int(os.getenv("JOBHUNT_ADMIT_STREAMING", "4")), 8, 2.0),
+}
+
+
+class TokenBuckets:
+    """One token bucket per key: `rate` tokens a second, holding at most `burst`"""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = MAX_BUCKETS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # key -> [tokens, updated]
+
+    def shortfall(self, key: str, cost: float, now: float) -> float:
+        """0 if the key has cost tokens, else seconds until it will"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return 0.0 if cost <= self.burst else (cost - self.burst) / self.rate
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        return 0.0 if tokens >= cost else (cost - tokens) / self.rate
+
+    def take(self, key: str, cost: float, now: float):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate) - cost
+        bucket[1] = now
+
+
+class Gate:
+    """At most `concurrency` requests at once, a FIFO queue of `queue` more"""
+
+    def __init__(self, cost: CostClass):
+        self.cost = cost
+        self.in_flight = 0
+        self._waiters: deque = deque()
+
+    async def enter(self) -> Optional[str]:
+        """None once admitted; else why not (queue_full, queue_timeout)"""
+        if self.in_flight < self.cost.concurrency and not self._waiters:
+            self.in_flight += 1
+            return None
+        if len(self._waiters) >= self.cost.queue:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUED.inc(self.cost.name)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait((waiter,), timeout=self.cost.max_wait)
+        except asyncio.CancelledError:  # client went away while queued
+            self._abandon(waiter)
+            raise
+        finally:
+            ADMISSION_QUEUED.dec(self.cost.name)
+            ADMISSION_WAIT.observe(time.perf_counter() - start, self.cost.name)
+        if waiter.done():  # leave() handed over its slot
+            return None
+        self._abandon(waiter)
+        return "queue_timeout"
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done() and not waiter.cancelled():
+            self.leave()  # a slot was handed over as we gave up; pass it on
+        else:
+            self._waiters.remove(waiter)
+            waiter.cancel()
+
+    def leave(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot moves to the next waiter
+                return
+        self.in_flight -= 1
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware applying per-user and per-IP rate limits and
+    per-cost-class concurrency limits. route_costs maps "METHOD /route/path"
+    templates to a COST_CLASSES name; unlisted routes are standard.
+    identify(token) returns the user id for a bearer token, or None.
+    """
+
+    def __init__(self, app, route_costs: Dict[str, str], identify: Callable[[str], Optional[str]],
+                 enabled: bool = ENABLED, user_rate: float = USER_RATE, user_burst: float = USER_BURST,
+                 ip_rate: float = IP_RATE, ip_burst: float = IP_BURST):
+        self.app = app
+        self.route_costs = {route: COST_CLASSES[name] for route, name in route_costs.items()}
+        self.identify = identify
+        self.enabled = enabled
+        self.users = TokenBuckets(user_rate, user_burst) if user_rate > 0 else None
+        self.ips = TokenBuckets(ip_rate, ip_burst) if ip_rate > 0 else None
+        self.gates = {name: Gate(cost) for name, cost in COST_CLASSES.items() if cost.concurrency}
+
+    def cost_class(self, scope) -> CostClass:
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                scope["route"] = route  # labels the request in MetricsMiddleware even if shed
+                return self.route_costs.get(f"{scope['method']} {route.path}", COST_CLASSES["standard"])
+        return COST_CLASSES["cheap"]  # a 404 or 405 costs next to nothing
+
+    def _user(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                return self.identify(token.strip()) if scheme.lower() == "bearer" and token else None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        cost = self.cost_class(scope)
+        now = time.monotonic()
+        user = self._user(scope) if self.users else None
+        ip = scope["client"][0] if self.ips and scope.get("client") else None
+        if user is not None:
+            wait = self.users.shortfall(user, cost.tokens, now)
+            if wait:
+                await self._shed(send, cost, "user_rate", 429, wait)
+                return
+        if ip is not None:
+            wait = self.ips.shortfall(ip, cost.tokens, now)
+            if wait:
+                await self._shed(send, cost, "ip_rate", 429, wait)
+                return
+        # Charged only once admitted by both, so a limited user doesn't drain the shared IP bucket
+        if user is not None:
+            self.users.take(user, cost.tokens, now)
+        if ip is not None:
+            self.ips.take(ip, cost.tokens, now)
+
+        gate = self.gates.get(cost.name)
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+        refused = await gate.enter()
+        if refused:
+            await self._shed(send, cost, refused, 503, SHED_RETRY_AFTER)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.leave()
+
+    @staticmethod
+    async def _shed(send, cost: CostClass, reason: str, status: int, retry_after: float):
+        ADMISSION_SHED.inc(cost.name, reason)
+        detail = "Too many requests" if status == 429 else "Server busy"
+        body = f'{{"detail":"{detail}, try again shortly"}}'.encode()
+        await send({"type": "http.response.start", "status": status, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
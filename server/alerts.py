@@ -0,0 +1,233 @@
+"""
+Job alerts: a percolator over newly ingested postings
+
+Subscriptions are compiled into an inverted index instead of being checked
+one by one. The sources are saved searches, each user's search_config roles,
+and dream-company watches. Each subscription is indexed under the phrases of
+one "anchor" clause, e.g. field "role" + phrase "product designer" -> ids.
+Matching a posting means looking up its own phrases (n-grams of role,
+description and skills, plus company and industry). Only the subscriptions
+found that way have their other clauses checked. The cost follows the
+posting's terms, not users × jobs.
+"""
+
+import html
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from models import db as default_db
+
+logger = logging.getLogger(__name__)
+
+MAX_PHRASE_TOKENS = 4
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+_TAG = re.compile(r"<[^>]+>")
+
+# Clause fields a subscription can constrain
+ROLE, TEXT, INDUSTRY, COMPANY = "role", "text", "industry", "company"
+
+# Called as hook(user_ids) after notifications were recorded for those users
+ALERT_HOOKS: List[Callable[[Set[str]], None]] = []
+
+
+def add_alert_hook(hook: Callable[[Set[str]], None]):
+    """Register a callback run whenever a batch creates notifications"""
+    if hook not in ALERT_HOOKS:
+        ALERT_HOOKS.append(hook)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def phrase(text: str) -> str:
+    """Canonical form of a search phrase ("Product  Designer" -> "product designer")"""
+    return " ".join(tokenize(text)[:MAX_PHRASE_TOKENS])
+
+
+def ngrams(tokens: List[str], max_n: int = MAX_PHRASE_TOKENS) -> Set[str]:
+    grams = set()
+    for n in range(1, max_n + 1):
+        for i in range(len(tokens) - n + 1):
+            grams.add(" ".join(tokens[i:i + n]))
+    return grams
+
+
+def job_terms(job: dict) -> Dict[str, Set[str]]:
+    """Phrases a posting can be matched on, per field"""
+    role = ngrams(tokenize(job.get("role") or ""))
+    text = set(role)
+    description = _TAG.sub(" ", html.unescape(job.get("job_description_summary") or ""))
+    text |= ngrams(tokenize(description), 3)
+    for skill in job.get("skills") or []:
+        text |= ngrams(tokenize(skill))
+    return {
+        ROLE: role,
+        TEXT: text,
+        INDUSTRY: ngrams(tokenize(job.get("industry") or "")),
+        COMPANY: {phrase(job.get("company") or "")},
+    }
+
+
+@dataclass(frozen=True)
+class Subscription:
+    key: str  # search:<id>, config or company:<name>
+    user_id: str
+    clauses: Tuple[Tuple[str, frozenset], ...]  # all clauses must match; any phrase within one
+
+    def matches(self, terms: Dict[str, Set[str]], skip_anchor: bool = True) -> bool:
+        for field, phrases in self.clauses[1 if skip_anchor else 0:]:
+            have = terms[field]
+            small, large = (phrases, have) if len(phrases) <= len(have) else (have, phrases)
+            if not any(p in large for p in small):
+                return False
+        return True
+
+
+def compile_subscription(key: str, user_id: str, roles: Iterable[str] = (), keywords: Iterable[str] = (),
+                         industries: Iterable[str] = (), companies: Iterable[str] = ()) -> Optional[Subscription]:
+    """
+    Build a subscription. Its first clause, in the order role, company,
+    keyword, industry, becomes the anchor: roles and companies usually
+    narrow a posting down the most, industries the least.
+    """
+    clauses = []
+    for field, values in ((ROLE, roles), (COMPANY, companies), (TEXT, keywords), (INDUSTRY, industries)):
+        phrases = frozenset(p for p in (phrase(v) for v in values if v) if p)
+        if phrases:
+            clauses.append((field, phrases))
+    if not clauses:
+        return None
+    return Subscription(key, user_id, tuple(clauses))
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [v.strip() for v in (value or "").split(";") if v.strip()]
+
+
+class Percolator:
+    """Inverted index from (field, phrase) to subscriptions"""
+
+    def __init__(self):
+        self._subs: Dict[int, Subscription] = {}
+        self._ids: Dict[Tuple[str, str], int] = {}  # (user_id, key) -> internal id
+        # (field, phrase) -> (anchor-only subscription ids, ids needing their other clauses checked)
+        self._index: Dict[Tuple[str, str], Tuple[Set[int], Set[int]]] = {}
+        self._next_id = 0
+        self._lock = threading.RLock()
+        self._signature = None
+
+    def __len__(self):
+        return len(self._subs)
+
+    def add(self, sub: Subscription):
+        with self._lock:
+            self.remove(sub.user_id, sub.key)
+            sid = self._next_id
+            self._next_id += 1
+            self._subs[sid] = sub
+            self._ids[(sub.user_id, sub.key)] = sid
+            # Postings keep anchor-only subscriptions apart: a hit on them is already a match
+            slot = 0 if len(sub.clauses) == 1 else 1
+            field, phrases = sub.clauses[0]
+            for p in phrases:
+                self._index.setdefault((field, p), (set(), set()))[slot].add(sid)
+
+    def remove(self, user_id: str, key: str):
+        with self._lock:
+            sid = self._ids.pop((user_id, key), None)
+            if sid is None:
+                return
+            sub = self._subs.pop(sid)
+            field, phrases = sub.clauses[0]
+            for p in phrases:
+                postings = self._index.get((field, p))
+                if postings is not None:
+                    postings[0].discard(sid)
+                    postings[1].discard(sid)
+                    if not postings[0] and not postings[1]:
+                        del self._index[(field, p)]
+
+    def match(self, job: dict) -> List[Subscription]:
+        """Subscriptions matching one posting"""
+        terms = job_terms(job)
+        exact: Set[int] = set()
+        verify: Set[int] = set()
+        with self._lock:
+            for field, phrases in terms.items():
+                for p in phrases:
+                    postings = self._index.get((field, p))
+                    if postings:
+                        exact |= postings[0]
+                        verify |= postings[1]
+            subs = self._subs
+            matched = [subs[sid] for sid in exact]
+            candidates = [subs[sid] for sid in verify]
+        matched.extend(sub for sub in candidates if sub.matches(terms))
+        return matched
+
+    # Loading from the database
+    def load(self, database=None):
+        """Rebuild from saved searches, search configs and dream companies"""
+        database = database or default_db
+        # Read first: a change made while loading then shows on the next refresh_if_stale
+        signature = database.alert_sources_signature()
+        subs = []
+        for s in database.get_saved_searches():
+            subs.append(compile_subscription(f"search:{s['id']}", s["user_id"], s["roles"], s["keywords"], s["industries"]))
+        for user_id, config in database.get_search_configs().items():
+            # Only roles: config industries (SaaS, Fintech...) don't appear in posting industries
+            roles = _split(config.get("primary_role")) + _split(config.get("secondary_roles"))
+            subs.append(compile_subscription("config", user_id, roles=roles))
+        for user_id, company in database.get_watched_companies():
+            subs.append(compile_subscription(f"company:{phrase(company)}", user_id, companies=[company]))
+        with self._lock:
+            self._subs.clear()
+            self._ids.clear()
+            self._index.clear()
+            for sub in subs:
+                if sub is not None:
+                    self.add(sub)
+            self._signature = signature
+
+    def refresh_if_stale(self, database=None):
+        """Reload when another process (or an import) changed the subscription sources"""
+        database = database or default_db
+        if database.alert_sources_signature() != self._signature:
+            self.load(database)
+
+    def notify(self, jobs: List[dict], database=None) -> int:
+        """Match a batch of postings and record notifications in one transaction"""
+        database = database or default_db
+        self.refresh_if_stale(database)
+        now = datetime.now().isoformat()
+        rows = {}
+        for job in jobs:
+            for sub in self.match(job):
+                rows.setdefault((sub.user_id, job["id"]), sub.key)
+        if not rows:
+            return 0
+        created = database.add_notifications([(user_id, job_id, key, now) for (user_id, job_id), key in rows.items()])
+        if created:
+            # Some of these may have been duplicates; hooks re-read what is actually new
+            user_ids = {user_id for user_id, _ in rows}
+            for hook in ALERT_HOOKS:
+                try:
+                    hook(user_ids)
+                except Exception:
+                    logger.exception("Alert hook %r failed", hook)
+        return created
+
+
+percolator = Percolator()
+
+
+def on_ingest(jobs: List[dict]):
+    """importer.INGEST_HOOKS callback (jobs.json ingests and CSV imports)"""
+    created = percolator.notify(jobs)
+    if created:
+        logger.info("Created %d job alert notifications", created)
@@ -3,24 +3,76 @@ JobHunt AI API Server
 Multi-user backend with SQLite database
 """
 
+import asyncio
 import hashlib
+import json
 import secrets
 import os
 from datetime import datetime, timedelta
-from typing import Optional
-from fastapi import FastAPI, HTTPException, Depends
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Header, Query, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 import jwt
 
-from models import db, init_db
+from models import db, init_db, add_query_hook
+from admission import AdmissionMiddleware
+from metrics import MetricsMiddleware, observe_db_query, render_metrics, PROMETHEUS_CONTENT_TYPE, PUSH_CONNECTIONS
+from query_profiler import install_from_env as install_query_profiler
+from export import EXPORT_FORMATS, export_saved_jobs, export_applications
+from importer import IMPORT_KINDS, import_csv
+from ingest import ingest_jobs_file, add_ingest_hook
+from alerts import compile_subscription, add_alert_hook, on_ingest as notify_alerts
+from push import broker as push_broker, format_sse, publish_jobs_updated, publish_matches, user_events
+from tasks import task_manager
+from job_index import SORTS as JOB_SORTS, job_index, publish_snapshot
+from liveness import LivenessScheduler, run_liveness_checks
+from salary import DEFAULT_CURRENCY, RATES_TO_AUD, to_aud
+from gazetteer import REGIONS as LOCATION_REGIONS
+from descriptions import CACHE_CONTROL as DESCRIPTION_CACHE_CONTROL
+from funnel import STAGES as APPLICATION_STAGES, summarise as summarise_funnel
+from assets import (ASSET_CSP, IMMUTABLE_CACHE_CONTROL, MEDIA_TYPES as ASSET_MEDIA_TYPES, REDIRECT_CACHE_CONTROL,
+                    THUMB_SIZES, ZeroCopyFileResponse, logo_cache)
+from docgen import MAX_BATCH as MAX_DOCS_BATCH, TEMPLATES as DOC_TEMPLATES, generate_docs
+from resume_parser import UnsupportedResume
+from resume_pool import MAX_RESUME_BYTES, ResumeParseFailed, ResumePoolBusy, resume_pool
 
 app = FastAPI(title="JobHunt AI API", version="2.0.0")
 
 # Get allowed origins from environment or allow all for development
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "*").split(",")
 
+# Admission control cost classes; routes not listed are "standard"
+ROUTE_COSTS = {
+    "POST /api/auth/register": "expensive",
+    "POST /api/auth/login": "expensive",
+    "POST /api/profile/resume": "expensive",
+    "GET /api/jobs/saved/export": "streaming",
+    "GET /api/applications/export": "streaming",
+    "POST /api/docs/generate": "expensive",
+    "GET /api/jobs": "expensive",
+    "GET /api/jobs/similar": "expensive",
+    "POST /api/import/{kind}": "expensive",
+    # A logo's first request decodes the source and renders every thumbnail size
+    "GET /api/assets/logo/{company}": "expensive",
+    "GET /api/auth/me": "cheap",
+    "GET /api/profile": "cheap",
+    "GET /api/applications/stats": "cheap",
+    "GET /api/jobs/{job_id}": "cheap",
+    "GET /api/jobs/{job_id}/description": "cheap",
+    "GET /api/tasks/{task_id}": "cheap",
+    "GET /api/tasks/{task_id}/events": "cheap",
+    "GET /api/push/events": "cheap",
+    "GET /api/assets/thumbs/{name}": "cheap",
+    "GET /api/health": "cheap",
+    "GET /api/metrics": "cheap",
+}
+
+# Rate limits and load shedding, inside CORS so refusals still carry its headers
+app.add_middleware(AdmissionMiddleware, route_costs=ROUTE_COSTS, identify=lambda token: verify_jwt(token))
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -30,12 +82,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request timing and DB usage (outermost so it sees the full request)
+app.add_middleware(MetricsMiddleware)
+add_query_hook(observe_db_query)
+# Slow-query log, enabled with JOBHUNT_SLOW_QUERY_MS
+install_query_profiler()
+
+# Match newly ingested jobs against saved searches and company watches,
+# and push the matches to connected clients
+add_ingest_hook(notify_alerts)
+add_alert_hook(publish_matches)
+
 # JWT Configuration
 JWT_SECRET = os.getenv("JWT_SECRET", secrets.token_hex(32))
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRE_DAYS = 30
 
+# Seconds between SSE keepalive comments while a stream is quiet
+SSE_KEEPALIVE_SECONDS = 15
+
+# Users allowed to import into the shared job catalogue
+ADMIN_USER_IDS = {u for u in os.getenv("ADMIN_USER_IDS", "").split(",") if u}
+
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Pydantic models
 class UserRegister(BaseModel):
@@ -77,6 +147,28 @@ class ApplicationCreate(BaseModel):
     role: str
     cover_letter: Optional[str] = ""
     email_sent: Optional[str] = ""
+    doc_id: Optional[int] = None  # draft from /api/docs/generate, stored by reference
+
+class ApplicationStatusUpdate(BaseModel):
+    status: str
+
+class DocsGenerate(BaseModel):
+    job_ids: List[str]
+    template: str = "professional"
+    hiring_manager: Optional[str] = ""
+
+class SavedSearchCreate(BaseModel):
+    name: str
+    roles: list = []
+    keywords: list = []
+    industries: list = []
+
+class CompanyWatch(BaseModel):
+    company: str
+    careers_url: Optional[str] = ""
+
+class NotificationsRead(BaseModel):
+    ids: Optional[List[int]] = None  # None marks everything read
 
 # Helper functions
 def hash_password(password: str) -> str:
@@ -100,6 +192,15 @@ def verify_jwt(token: str) -> Optional[str]:
     except jwt.InvalidTokenError:
         return None
 
+def _json_response(envelope: dict, **raw: str) -> Response:
+    """
+    JSON response whose raw members are JSON text straight from the database,
+    spliced in as-is instead of being decoded and re-encoded
+    """
+    body = json.dumps(envelope, ensure_ascii=False, separators=(",", ":"))
+    members = "".join(f",{json.dumps(key)}:{value}" for key, value in raw.items())
+    return Response(body[:-1] + members + "}", media_type="application/json")
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
     token = credentials.credentials
     user_id = verify_jwt(token)
@@ -107,6 +208,11 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     return user_id
 
+async def get_admin_user(user_id: str = Depends(get_current_user)) -> str:
+    if user_id not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail="Admins only")
+    return user_id
+
 # Auth endpoints
 @app.post("/api/auth/register")
 def register(user: UserRegister):
@@ -150,30 +256,26 @@ def login(credentials: UserLogin):
     
     db.update_last_login(user["id"])
     token = create_jwt(user["id"])
-    profile = db.get_profile(user["id"])
     
-    return {
-        "success": True,
-        "token": token,
-        "user_id": user["id"],
-        "email": user["email"],
-        "profile": profile
-    }
+    return _json_response(
+        {"success": True, "token": token, "user_id": user["id"], "email": user["email"]},
+        profile=db.get_profile_json(user["id"]) or "null",
+    )
 
 @app.get("/api/auth/me")
 def get_me(user_id: str = Depends(get_current_user)):
-    profile = db.get_profile(user_id)
+    profile = db.get_profile_json(user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
-    return {"success": True, "user_id": user_id, "profile": profile}
+    return _json_response({"success": True, "user_id": user_id}, profile=profile)
 
 # Profile endpoints
 @app.get("/api/profile")
 def get_profile(user_id: str = Depends(get_current_user)):
-    profile = db.get_profile(user_id)
+    profile = db.get_profile_json(user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
-    return {"success": True, "profile": profile}
+    return _json_response({"success": True}, profile=profile)
 
 @app.put("/api/profile")
 def update_profile(data: ProfileUpdate, user_id: str = Depends(get_current_user)):
@@ -188,6 +290,28 @@ def create_profile(data: ProfileUpdate, user_id: str = Depends(get_current_user)
     db.save_profile(user_id, profile_data)
     return {"success": True, "message": "Profile saved"}
 
+# Resume upload; parsed in the resume process pool (cached by content hash)
+@app.post("/api/profile/resume")
+def upload_resume(file: UploadFile = File(...), user_id: str = Depends(get_current_user)):
+    data = file.file.read(MAX_RESUME_BYTES + 1)
+    if len(data) > MAX_RESUME_BYTES:
+        raise HTTPException(status_code=413, detail=f"Resume must be under {MAX_RESUME_BYTES // (1024 * 1024)} MB")
+    if not data.strip():
+        raise HTTPException(status_code=400, detail="Resume file is empty")
+    try:
+        parsed, cached = resume_pool.parse(data)
+    except UnsupportedResume as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ResumePoolBusy:
+        raise HTTPException(status_code=503, detail="Resume parsing is busy, try again shortly",
+                            headers={"Retry-After": "5"})
+    except ResumeParseFailed as e:
+        raise HTTPException(status_code=422, detail=f"{e}; try a smaller or text-based PDF")
+    db.save_resume(user_id, file.filename or "", parsed)
+    resume = {k: v for k, v in parsed.items() if k not in ("text", "parser_version")}
+    return {"success": True, "cached": cached, "resume": {**resume, "fileName": file.filename,
+                                                          "characters": len(parsed["text"])}}
+
 # Saved jobs endpoints
 @app.post("/api/jobs/save")
 def save_job(req: SaveJobRequest, user_id: str = Depends(get_current_user)):
@@ -196,20 +320,35 @@ def save_job(req: SaveJobRequest, user_id: str = Depends(get_current_user)):
 
 @app.get("/api/jobs/saved")
 def get_saved_jobs(user_id: str = Depends(get_current_user)):
-    jobs = db.get_saved_jobs(user_id)
-    return {"success": True, "jobs": jobs}
+    return _json_response({"success": True}, jobs=db.get_saved_jobs_json(user_id))
 
 @app.delete("/api/jobs/saved/{job_id}")
 def delete_saved_job(job_id: str, user_id: str = Depends(get_current_user)):
     db.delete_saved_job(user_id, job_id)
     return {"success": True, "message": "Job removed"}
 
+def _export_response(chunks, name: str, fmt: str) -> StreamingResponse:
+    # Chunks are generated lazily, so the format has to be checked before streaming starts
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {fmt}")
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'}
+    )
+
+@app.get("/api/jobs/saved/export")
+def export_saved(format: str = "csv", user_id: str = Depends(get_current_user)):
+    return _export_response(export_saved_jobs(db, user_id, format), "saved_jobs", format)
+
 # Application tracking endpoints
 @app.post("/api/applications")
 def create_application(app_data: ApplicationCreate, user_id: str = Depends(get_current_user)):
+    if app_data.doc_id is not None and not db.get_generated_doc(user_id, app_data.doc_id):
+        raise HTTPException(status_code=404, detail="Document not found")
     app_id = db.create_application(
         user_id, app_data.job_id, app_data.company, app_data.role,
-        app_data.cover_letter, app_data.email_sent
+        app_data.cover_letter, app_data.email_sent, app_data.doc_id
     )
     return {"success": True, "application_id": app_id}
 
@@ -218,14 +357,357 @@ def get_applications(user_id: str = Depends(get_current_user)):
     apps = db.get_applications(user_id)
     return {"success": True, "applications": apps}
 
+@app.get("/api/applications/export")
+def export_applications_endpoint(format: str = "csv", user_id: str = Depends(get_current_user)):
+    return _export_response(export_applications(db, user_id, format), "applications", format)
+
+@app.get("/api/applications/stats")
+def get_application_stats(user_id: str = Depends(get_current_user)):
+    """Funnel counts, conversion and time in stage, from counters kept with each status change (funnel.py)"""
+    return {"success": True, **summarise_funnel(db.get_application_stats(user_id))}
+
+@app.get("/api/applications/{app_id}")
+def get_application(app_id: int, user_id: str = Depends(get_current_user)):
+    application = db.get_application(user_id, app_id)
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
+    return {"success": True, "application": application}
+
+@app.put("/api/applications/{app_id}/status")
+def update_application_status(app_id: int, update: ApplicationStatusUpdate, user_id: str = Depends(get_current_user)):
+    if update.status not in APPLICATION_STAGES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(APPLICATION_STAGES)}")
+    application = db.set_application_status(user_id, app_id, update.status)
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
+    return {"success": True, "application": application}
+
+# Cover letter / email drafts, rendered in batches and stored per profile version
+@app.post("/api/docs/generate")
+def generate_application_docs(req: DocsGenerate, user_id: str = Depends(get_current_user)):
+    if req.template not in DOC_TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"template must be one of: {', '.join(DOC_TEMPLATES)}")
+    if not req.job_ids or len(req.job_ids) > MAX_DOCS_BATCH:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {MAX_DOCS_BATCH} job ids")
+    try:
+        result = generate_docs(user_id, req.job_ids, req.template, req.hiring_manager or "")
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"success": True, **result}
+
+@app.get("/api/docs/{doc_id}")
+def get_application_doc(doc_id: int, user_id: str = Depends(get_current_user)):
+    doc = db.get_generated_doc(user_id, doc_id)
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"success": True, "doc": doc}
+
+# Job catalogue refresh (runs on the background task pool)
+def _refresh_jobs(task):
+    task.report(0.0, "Loading scraped jobs")
+    stats = ingest_jobs_file(
+        progress=lambda done, total: task.report(done / total if total else None, f"Ingested {done} of {total} jobs")
+    )
+    publish_snapshot()
+    publish_jobs_updated(stats)
+    return stats
+
+@app.post("/api/jobs/update", status_code=202)
+def update_jobs(user_id: str = Depends(get_admin_user)):
+    task, created = task_manager.submit("jobs_refresh", _refresh_jobs, dedupe_key="jobs_refresh")
+    return {"success": True, "task_id": task.id, "status": task.status, "deduplicated": not created}
+
+# Posting liveness: re-check job URLs, flag ghosts and drop expired jobs from the catalogue
+def _check_liveness(task):
+    task.report(0.0, "Selecting postings to check")
+    stats = run_liveness_checks(
+        progress=lambda done, total: task.report(done / total if total else None, f"Checked {done} of {total} postings")
+    )
+    if stats["flag_changes"]:
+        publish_snapshot()
+        publish_jobs_updated({"ingested": 0})
+    return stats
+
+def _submit_liveness_check():
+    return task_manager.submit("jobs_liveness", _check_liveness, dedupe_key="jobs_liveness")
+
+liveness_scheduler = LivenessScheduler(_submit_liveness_check)
+
+@app.post("/api/jobs/liveness", status_code=202)
+def check_jobs_liveness(user_id: str = Depends(get_admin_user)):
+    task, created = _submit_liveness_check()
+    return {"success": True, "task_id": task.id, "status": task.status, "deduplicated": not created}
+
+# Job catalogue, read from the shared mmap'd snapshot rather than the database
+def _current_index():
+    index = job_index.get()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Job index not published yet")
+    return index
+
+@app.get("/api/jobs")
+def list_jobs(skill: List[str] = Query([]), company: Optional[str] = None, remote_status: Optional[str] = None,
+              offset: int = 0, limit: int = 50, min_salary: Optional[float] = None,
+              max_salary: Optional[float] = None, currency: str = DEFAULT_CURRENCY, sort: str = "date",
+              country: List[str] = Query([]), region: List[str] = Query([]),
+              min_utc_offset: Optional[float] = None, max_utc_offset: Optional[float] = None):
+    if not 1 <= limit <= 200 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be 1-200 and offset non-negative")
+    if currency.upper() not in RATES_TO_AUD:
+        raise HTTPException(status_code=400, detail=f"currency must be one of {', '.join(RATES_TO_AUD)}")
+    if sort not in JOB_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(JOB_SORTS)}")
+    if not set(r.upper() for r in region) <= set(LOCATION_REGIONS):
+        raise HTTPException(status_code=400, detail=f"region must be one of {', '.join(LOCATION_REGIONS)}")
+    # Salary bounds are annual amounts in the given currency; UTC offsets are hours, as in the frontend
+    if min_salary is not None:
+        min_salary = to_aud(min_salary, currency)
+    if max_salary is not None:
+        max_salary = to_aud(max_salary, currency)
+    index = _current_index()
+    total, jobs = index.search(
+        skill, company, remote_status, offset, limit, min_salary, max_salary, sort, countries=country, regions=region,
+        min_utc_offset=None if min_utc_offset is None else round(min_utc_offset * 60),
+        max_utc_offset=None if max_utc_offset is None else round(max_utc_offset * 60))
+    return {"success": True, "version": index.version, "total": total, "jobs": jobs}
+
+@app.get("/api/jobs/similar")
+def similar_jobs(limit: int = 20, user_id: str = Depends(get_current_user)):
+    """Jobs nearest the user's resume, skills and preferred roles (vectors.py), most similar first"""
+    if not 1 <= limit <= 200:
+        raise HTTPException(status_code=400, detail="limit must be 1-200")
+    index = _current_index()
+    jobs = [{**index.job(row), "similarity": round(score, 4)}
+            for row, score in index.similar(db.get_resume_vector(user_id), limit)]
+    return {"success": True, "version": index.version, "jobs": jobs}
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    index = _current_index()
+    row = index.find(job_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "version": index.version, "job": index.job(row)}
+
+@app.get("/api/jobs/{job_id}/description")
+def get_job_description(job_id: str, if_none_match: Optional[str] = Header(None)):
+    """Full plain-text description; listings only carry description_summary"""
+    text = db.get_job_description(job_id)
+    if text is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    headers = {"Cache-Control": DESCRIPTION_CACHE_CONTROL,
+               "ETag": f'"{hashlib.blake2b(text.encode(), digest_size=8).hexdigest()}"'}
+    if if_none_match == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    body = json.dumps({"success": True, "id": job_id, "description": text}, ensure_ascii=False)
+    return Response(body, media_type="application/json", headers=headers)
+
+@app.get("/api/tasks/{task_id}")
+def get_task(task_id: str):
+    task = task_manager.get(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return {"success": True, "task": task.to_dict()}
+
+@app.get("/api/tasks/{task_id}/events")
+async def task_events(task_id: str):
+    task = task_manager.get(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    async def stream():
+        seen = -1
+        while True:
+            snapshot = task.to_dict()
+            if snapshot["version"] > seen:
+                seen = snapshot["version"]
+                event = "done" if task.finished else "progress"
+                yield f"id: {seen}\nevent: {event}\ndata: {json.dumps(snapshot)}\n\n"
+                if task.finished:
+                    return
+            if not await task.wait_for_change(seen, SSE_KEEPALIVE_SECONDS):
+                yield ": keepalive\n\n"
+    
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Job alerts (matched against postings as they are ingested)
+@app.post("/api/alerts/searches")
+def create_saved_search(search: SavedSearchCreate, user_id: str = Depends(get_current_user)):
+    if compile_subscription("search", user_id, search.roles, search.keywords, search.industries) is None:
+        raise HTTPException(status_code=400, detail="A saved search needs at least one role, keyword or industry")
+    search_id = db.create_saved_search(user_id, search.name, search.roles, search.keywords, search.industries)
+    return {"success": True, "search_id": search_id}
+
+@app.get("/api/alerts/searches")
+def get_saved_searches(user_id: str = Depends(get_current_user)):
+    return {"success": True, "searches": db.get_saved_searches(user_id)}
+
+@app.delete("/api/alerts/searches/{search_id}")
+def delete_saved_search(search_id: int, user_id: str = Depends(get_current_user)):
+    if not db.delete_saved_search(user_id, search_id):
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return {"success": True, "message": "Saved search removed"}
+
+@app.post("/api/alerts/companies")
+def watch_company(watch: CompanyWatch, user_id: str = Depends(get_current_user)):
+    today = datetime.now().strftime("%Y-%m-%d")
+    db.upsert_dream_companies(user_id, [(watch.company, "", watch.careers_url, "", "", "", "", today, today)])
+    return {"success": True, "message": "Company watched"}
+
+@app.get("/api/alerts/notifications")
+def get_notifications(unread_only: bool = False, limit: int = 100, user_id: str = Depends(get_current_user)):
+    notifications = db.get_notifications(user_id, unread_only, min(max(limit, 1), 500))
+    return {"success": True, "notifications": notifications}
+
+@app.post("/api/alerts/notifications/read")
+def mark_notifications_read(req: NotificationsRead, user_id: str = Depends(get_current_user)):
+    updated = db.mark_notifications_read(user_id, req.ids)
+    return {"success": True, "updated": updated}
+
+# Push stream of alert matches and catalogue updates, replacing client polling.
+# EventSource can't set headers, so the JWT may also be passed as ?token=
+def _parse_event_id(value: Optional[str]) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid last event id")
+
+@app.get("/api/push/events")
+async def push_events(token: Optional[str] = None, last_event_id: Optional[str] = None,
+                      last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+                      credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    user_id = verify_jwt(credentials.credentials if credentials else token or "")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    # A reconnecting EventSource sends Last-Event-ID; a fresh page load can pass ?last_event_id=
+    resume_from = _parse_event_id(last_event_id_header or last_event_id)
+    
+    async def stream():
+        PUSH_CONNECTIONS.inc("sse")
+        try:
+            async for item in user_events(user_id, resume_from, SSE_KEEPALIVE_SECONDS):
+                yield format_sse(*item) if item else ": keepalive\n\n"
+        finally:
+            PUSH_CONNECTIONS.dec("sse")
+    
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.websocket("/api/push/ws")
+async def push_websocket(websocket: WebSocket, token: str = "", last_event_id: Optional[int] = None):
+    user_id = verify_jwt(token)
+    if not user_id:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    
+    async def forward():
+        async for item in user_events(user_id, last_event_id, SSE_KEEPALIVE_SECONDS):
+            event_id, event, data = item or (None, "keepalive", {})
+            await websocket.send_json({"id": event_id, "event": event, "data": data})
+    
+    async def until_closed():
+        # Client messages are ignored; reading is how a disconnect is noticed
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    PUSH_CONNECTIONS.inc("websocket")
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(until_closed())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        PUSH_CONNECTIONS.dec("websocket")
+
+# CSV import (Job_Listings.csv, Dream_Companies.csv, search_config.csv)
+@app.post("/api/import/{kind}")
+def import_data(kind: str, file: UploadFile = File(...), user_id: str = Depends(get_current_user)):
+    if kind not in IMPORT_KINDS and kind != "auto":
+        raise HTTPException(status_code=404, detail=f"Unknown import kind: {kind}")
+    try:
+        report = import_csv(file.file, kind, user_id=user_id,
+                            authorize=lambda detected: detected != "jobs" or user_id in ADMIN_USER_IDS)
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="Only admins can import into the job catalogue")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if report.kind == "jobs" and report.imported:
+        publish_snapshot()
+        publish_jobs_updated({"ingested": report.imported})
+    return {"success": True, **report.to_dict()}
+
+# Company logos: resolved and thumbnailed once, then served from the disk cache
+@app.get("/api/assets/logo/{company}")
+def company_logo(company: str, size: int = 64):
+    if size not in THUMB_SIZES:
+        raise HTTPException(status_code=400, detail=f"size must be one of: {', '.join(map(str, THUMB_SIZES))}")
+    name = logo_cache.thumbnail(company, size)
+    headers = {"Cache-Control": REDIRECT_CACHE_CONTROL}
+    if name is None:
+        raise HTTPException(status_code=404, detail="No logo for this company", headers=headers)
+    return RedirectResponse(f"/api/assets/thumbs/{name}", status_code=302, headers=headers)
+
+@app.get("/api/assets/thumbs/{name}")
+def logo_thumbnail(name: str, if_none_match: Optional[str] = Header(None)):
+    stat = logo_cache.cached_file(name)
+    if stat is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    stem, ext = name.rsplit(".", 1)
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": f'"{stem}"',
+               "Content-Security-Policy": ASSET_CSP, "X-Content-Type-Options": "nosniff"}
+    if if_none_match == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return ZeroCopyFileResponse(logo_cache.disk.path(name), media_type=ASSET_MEDIA_TYPES[ext],
+                                headers=headers, stat_result=stat)
+
 # Health check
 @app.get("/api/health")
 def health():
     return {"status": "healthy", "version": "2.0.0", "timestamp": datetime.now().isoformat()}
 
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.on_event("startup")
+def open_job_index():
+    # The first worker up publishes the catalogue if nothing has yet
+    try:
+        index = job_index.refresh()
+    except ValueError:  # written by an older format version
+        index = None
+    if index is None:
+        publish_snapshot()
+        job_index.refresh()
+
+@app.on_event("startup")
+async def start_push_broker():
+    await push_broker.start()
+
+@app.on_event("shutdown")
+async def stop_push_broker():
+    await push_broker.stop()
+
+@app.on_event("startup")
+async def start_liveness_scheduler():
+    await liveness_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_liveness_scheduler():
+    await liveness_scheduler.stop()
+
+@app.on_event("shutdown")
+def shutdown_tasks():
+    task_manager.shutdown()
+    resume_pool.shutdown()
+
 # Run server
 if __name__ == "__main__":
     import uvicorn
     print("🚀 Starting JobHunt AI API Server...")
-    print(f"📁 Database: {db.db_path}")
+    print(f"📁 Database: {db.backend.describe()}")
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,514 @@
+"""
+Company logo thumbnails
+CompanyLogo.tsx used to resolve a logo on every render. The server now
+resolves it once. It looks in JOBHUNT_LOGO_DIR for <slug>.png|svg, then for
+<domain>.png|svg. The domain comes from the company's careers_url in
+Dream_Companies.csv or in users' imported dream companies.
+
+The first request for a logo renders every size in THUMB_SIZES. Each one is
+written to a content-addressed disk cache, named
+<slug>-<size>-<digest>.<ext>, where the digest covers the source bytes. The
+cache has an LRU size limit. GET /api/assets/logo/{company} redirects to
+that name, and the named URL can be cached as immutable: a new source file
+gives a new name.
+
+There is no imaging library in requirements.txt, so PNG is decoded and
+encoded with zlib here (8-bit, non-interlaced: what logo exports are). SVG
+is resized by rewriting its root element.
+"""
+
+import csv
+import hashlib
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from starlette.responses import FileResponse
+
+from metrics import record_cache
+from models import db as default_db
+
+logger = logging.getLogger(__name__)
+
+SERVER_DIR = Path(__file__).resolve().parent
+LOGO_DIR = Path(os.getenv("JOBHUNT_LOGO_DIR", SERVER_DIR / "data" / "logos"))
+ASSET_CACHE_DIR = Path(os.getenv("JOBHUNT_ASSET_CACHE_DIR", SERVER_DIR / "data" / "asset_cache"))
+ASSET_CACHE_BYTES = int(os.getenv("JOBHUNT_ASSET_CACHE_MB", "64")) * 1024 * 1024
+DREAM_COMPANIES_CSV = SERVER_DIR.parent / "public" / "data" / "Dream_Companies.csv"
+
+THUMB_SIZES = (32, 64, 128, 256)
+# Bump when thumbnail output changes so cached files are regenerated
+THUMB_VERSION = 1
+RESOLVE_TTL_SECONDS = 300
+# Companies whose resolution (logo or none) is remembered; least recently used go first
+MAX_RESOLVED = int(os.getenv("JOBHUNT_LOGO_RESOLVED", "10000"))
+# Logos are decoded in pure Python; a source past this is refused, not rendered
+MAX_SOURCE_PIXELS = 1024 * 1024
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REDIRECT_CACHE_CONTROL = f"public, max-age={RESOLVE_TTL_SECONDS}"
+# An SVG opened directly must not run scripts on the API's origin
+ASSET_CSP = "default-src 'none'; style-src 'unsafe-inline'"
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+_THUMB_NAME = re.compile(r"^([a-z0-9-]+)-(\d+)-([0-9a-f]{32})\.(png|svg)$")
+
+
+class UnsupportedImage(ValueError):
+    """Source logo this module cannot thumbnail"""
+
+
+def slugify(company: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-")
+
+
+def url_domain(url: str) -> Optional[str]:
+    host = urlparse(url if "//" in url else f"//{url}").hostname
+    if not host:
+        return None
+    return host[4:] if host.startswith("www.") else host
+
+
+# PNG
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+def _unfilter(raw: bytes, width: int, height: int, bpp: int) -> bytearray:
+    stride = width * bpp
+    out = bytearray(height * stride)
+    prev = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        kind = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        if kind == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif kind == 2:
+            line = bytearray((a + b) & 0xFF for a, b in zip(line, prev))
+        elif kind == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                a = line[i - bpp] if i >= bpp else 0
+                b = prev[i]
+                c = prev[i - bpp] if i >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                line[i] = (line[i] + (a if pa <= pb and pa <= pc else b if pb <= pc else c)) & 0xFF
+        elif kind != 0:
+            raise UnsupportedImage(f"bad PNG filter {kind}")
+        out[y * stride:(y + 1) * stride] = line
+        prev = line
+    return out
+
+
+def decode_png(data: bytes) -> Tuple[int, int, List[List[int]]]:
+    """(width, height, [R, G, B, A] channel lists) for an 8-bit non-interlaced PNG"""
+    if not data.startswith(_PNG_SIGNATURE):
+        raise UnsupportedImage("not a PNG")
+    pos, header, palette, alpha, idat = 8, None, None, None, []
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"PLTE":
+            palette = body
+        elif kind == b"tRNS":
+            alpha = body
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+    if header is None:
+        raise UnsupportedImage("PNG has no IHDR")
+    width, height, depth, color, _, _, interlace = header
+    if depth != 8 or interlace or color not in _CHANNELS:
+        raise UnsupportedImage("only 8-bit non-interlaced PNGs are supported")
+    if width * height > MAX_SOURCE_PIXELS:
+        raise UnsupportedImage("PNG is too large")
+    bpp = _CHANNELS[color]
+    # Inflate no more than the header promises, so a small IDAT cannot balloon
+    size = height * (1 + width * bpp)
+    raw = zlib.decompressobj().decompress(b"".join(idat), size)
+    if len(raw) < size:
+        raise UnsupportedImage("PNG image data is truncated")
+    pixels = _unfilter(raw, width, height, bpp)
+
+    if color == 3:
+        if palette is None:
+            raise UnsupportedImage("palette PNG has no PLTE")
+        table = [tuple(palette[i:i + 3]) + (alpha[i // 3] if alpha and i // 3 < len(alpha) else 255,)
+                 for i in range(0, len(palette), 3)]
+        rgba = [table[i] for i in pixels]
+        return width, height, [list(c) for c in zip(*rgba)] if rgba else [[], [], [], []]
+    channels = [list(pixels[c::bpp]) for c in range(bpp)]
+    opaque = [255] * (width * height)
+    if color == 0:
+        return width, height, [channels[0], channels[0], channels[0], opaque]
+    if color == 4:
+        return width, height, [channels[0], channels[0], channels[0], channels[1]]
+    if color == 2:
+        return width, height, channels + [opaque]
+    return width, height, channels
+
+
+def encode_png(width: int, height: int, channels: List[List[int]]) -> bytes:
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    interleaved = bytearray(width * height * 4)
+    for c, values in enumerate(channels):
+        interleaved[c::4] = bytes(values)
+    stride = width * 4
+    raw = b"".join(b"\x00" + interleaved[y * stride:(y + 1) * stride] for y in range(height))
+    return (_PNG_SIGNATURE + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 9)) + chunk(b"IEND", b""))
+
+
+def _bins(source: int, target: int) -> List[Tuple[int, int]]:
+    # Area bins when shrinking; each bin is at least one pixel, so enlarging repeats pixels
+    bins = []
+    for i in range(target):
+        start = i * source // target
+        bins.append((start, max(start + 1, (i + 1) * source // target)))
+    return bins
+
+
+def _premultiply(channels: List[List[int]]) -> List[List[int]]:
+    alpha = channels[3]
+    return [[v * a for v, a in zip(c, alpha)] for c in channels[:3]] + [alpha]
+
+
+def _fit(width: int, height: int, channels: List[List[int]], premultiplied: List[List[int]], size: int) -> bytes:
+    scale = size / max(width, height)
+    out_w, out_h = max(1, round(width * scale)), max(1, round(height * scale))
+    canvas = [[0] * (size * size) for _ in range(4)]
+    left, top = (size - out_w) // 2, (size - out_h) // 2
+    if (out_w, out_h) == (width, height):
+        # Already the right size: only centre it
+        for y in range(height):
+            offset = (top + y) * size + left
+            for c in range(4):
+                canvas[c][offset:offset + width] = channels[c][y * width:(y + 1) * width]
+        return encode_png(size, size, canvas)
+
+    # Average with premultiplied alpha, so transparent pixels don't darken edges.
+    # Sum each source row over the column bins, then the row bins over those.
+    cols, rows = _bins(width, out_w), _bins(height, out_h)
+    binned = [[[sum(c[y * width + x0:y * width + x1]) for x0, x1 in cols] for y in range(height)]
+              for c in premultiplied]
+    for j, (y0, y1) in enumerate(rows):
+        sums = [[sum(col) for col in zip(*c[y0:y1])] for c in binned]
+        offset = (top + j) * size + left
+        for i, (x0, x1) in enumerate(cols):
+            alpha_sum = sums[3][i]
+            if not alpha_sum:
+                continue
+            count = (x1 - x0) * (y1 - y0)
+            canvas[0][offset + i] = sums[0][i] // alpha_sum
+            canvas[1][offset + i] = sums[1][i] // alpha_sum
+            canvas[2][offset + i] = sums[2][i] // alpha_sum
+            canvas[3][offset + i] = alpha_sum // count
+    return encode_png(size, size, canvas)
+
+
+def thumbnail_png(width: int, height: int, channels: List[List[int]], size: int) -> bytes:
+    """Fit the image in a size x size transparent square"""
+    return _fit(width, height, channels, _premultiply(channels), size)
+
+
+# SVG
+_SVG_ROOT = re.compile(rb"<svg\b[^>]*>", re.IGNORECASE)
+_SVG_ATTR = re.compile(rb"""\s(width|height|viewBox|preserveAspectRatio)\s*=\s*(["'])(.*?)\2""", re.IGNORECASE)
+
+
+def thumbnail_svg(data: bytes, size: int) -> bytes:
+    """Give the root <svg> a size x size viewport, keeping (or deriving) its viewBox"""
+    root = _SVG_ROOT.search(data)
+    if root is None:
+        raise UnsupportedImage("not an SVG")
+    tag = root.group(0)
+    attrs = {m.group(1).lower(): m.group(3) for m in _SVG_ATTR.finditer(tag)}
+    view_box = attrs.get(b"viewbox")
+    if view_box is None:
+        try:
+            w, h = (float(re.match(rb"[\d.]+", attrs[k]).group(0)) for k in (b"width", b"height"))
+        except (KeyError, AttributeError, ValueError):
+            raise UnsupportedImage("SVG has neither a viewBox nor a numeric width and height")
+        view_box = b"0 0 %g %g" % (w, h)
+    bare = _SVG_ATTR.sub(b"", tag)[:-1].rstrip(b"/ ")
+    new_tag = bare + b' width="%d" height="%d" viewBox="%s" preserveAspectRatio="xMidYMid meet"' % (
+        size, size, view_box) + (b"/>" if tag.endswith(b"/>") else b">")
+    return data[:root.start()] + new_tag + data[root.end():]
+
+
+def render_thumbnails(data: bytes, kind: str) -> Dict[int, bytes]:
+    """Every THUMB_SIZES rendition of one source logo"""
+    if kind == "svg":
+        return {size: thumbnail_svg(data, size) for size in THUMB_SIZES}
+    width, height, channels = decode_png(data)
+    premultiplied = _premultiply(channels)
+    return {size: _fit(width, height, channels, premultiplied, size) for size in THUMB_SIZES}
+
+
+class DiskLRU:
+    """Files in one directory, evicted least recently used first past max_bytes"""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        directory.mkdir(parents=True, exist_ok=True)
+        files = sorted((p.stat().st_mtime, p.name, p.stat().st_size) for p in directory.iterdir()
+                       if _THUMB_NAME.match(p.name))
+        for _, name, size in files:
+            self._entries[name] = size
+            self._bytes += size
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, name: str) -> Optional[os.stat_result]:
+        """stat of the cached file, marking it recently used; None if absent"""
+        path = self.directory / name
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            # Evicted by another worker
+            with self._lock:
+                self._bytes -= self._entries.pop(name, 0)
+            return None
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = stat.st_size
+                self._bytes += stat.st_size
+            self._entries.move_to_end(name)
+        # mtime carries the LRU order across restarts
+        os.utime(path)
+        return stat
+
+    def put(self, name: str, data: bytes):
+        tmp = self.directory / f".{name}.{os.getpid()}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self.directory / name)
+        with self._lock:
+            self._bytes += len(data) - self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            evict = []
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old, size = self._entries.popitem(last=False)
+                self._bytes -= size
+                evict.append(old)
+        for old in evict:
+            try:
+                (self.directory / old).unlink()
+            except FileNotFoundError:
+                pass
+
+    def path(self, name: str) -> Path:
+        return self.directory / name
+
+
+class LogoCache:
+    """Resolves company logos and keeps their thumbnails in a DiskLRU"""
+
+    def __init__(self, logo_dir: Path = LOGO_DIR, cache_dir: Path = ASSET_CACHE_DIR,
+                 max_bytes: int = ASSET_CACHE_BYTES, database=None, max_resolved: int = MAX_RESOLVED):
+        self.logo_dir = logo_dir
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_resolved = max_resolved
+        self._database = database or default_db
+        self._disk: Optional[DiskLRU] = None
+        self._domains: Dict[str, List[str]] = {}
+        self._domains_loaded = 0.0
+        # slug -> (checked at, (source path, mtime_ns, size, {size: file name}) or None when there is no logo)
+        self._resolved: "OrderedDict[str, Tuple[float, Optional[tuple]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # slug -> [lock, threads using it]; only slugs being resolved right now have one
+        self._slug_locks: Dict[str, list] = {}
+
+    @property
+    def disk(self) -> DiskLRU:
+        if self._disk is None:
+            with self._lock:
+                if self._disk is None:
+                    self._disk = DiskLRU(self.cache_dir, self.max_bytes)
+        return self._disk
+
+    def _company_domains(self) -> Dict[str, List[str]]:
+        if time.monotonic() - self._domains_loaded < RESOLVE_TTL_SECONDS:
+            return self._domains
+        pairs = []
+        if DREAM_COMPANIES_CSV.exists():
+            with open(DREAM_COMPANIES_CSV, newline="", encoding="utf-8") as f:
+                pairs += [(row.get("company") or "", row.get("careers_url") or "") for row in csv.DictReader(f)]
+        pairs += self._database.get_company_careers_urls()
+        domains: Dict[str, List[str]] = {}
+        for company, url in pairs:
+            domain = url_domain(url.strip())
+            if company and domain and domain not in domains.setdefault(slugify(company), []):
+                domains[slugify(company)].append(domain)
+        self._domains, self._domains_loaded = domains, time.monotonic()
+        return domains
+
+    def find_source(self, slug: str) -> Optional[Path]:
+        for stem in [slug] + self._company_domains().get(slug, []):
+            for ext in ("svg", "png"):
+                path = self.logo_dir / f"{stem}.{ext}"
+                if path.is_file():
+                    return path
+        return None
+
+    def _render(self, slug: str, source: Path) -> Optional[tuple]:
+        data = source.read_bytes()
+        kind = source.suffix[1:]
+        stat = source.stat()
+        digest = hashlib.sha256(b"v%d:" % THUMB_VERSION + data).hexdigest()[:32]
+        names = {size: f"{slug}-{size}-{digest}.{kind}" for size in THUMB_SIZES}
+        if all(self.disk.get(name) for name in names.values()):
+            return source, stat.st_mtime_ns, stat.st_size, names
+        try:
+            thumbs = render_thumbnails(data, kind)
+        except (UnsupportedImage, zlib.error) as e:
+            logger.warning("Cannot thumbnail %s: %s", source, e)
+            return None
+        for size, thumb in thumbs.items():
+            self.disk.put(names[size], thumb)
+        return source, stat.st_mtime_ns, stat.st_size, names
+
+    def _recall(self, slug: str) -> Optional[Tuple[float, Optional[tuple]]]:
+        with self._lock:
+            resolved = self._resolved.get(slug)
+            if resolved is not None:
+                self._resolved.move_to_end(slug)
+            return resolved
+
+    def _remember(self, slug: str, entry: Optional[tuple]):
+        with self._lock:
+            self._resolved[slug] = (time.monotonic(), entry)
+            self._resolved.move_to_end(slug)
+            while len(self._resolved) > self.max_resolved:
+                self._resolved.popitem(last=False)
+
+    def _forget(self, slug: str):
+        with self._lock:
+            self._resolved.pop(slug, None)
+
+    def _acquire_slug(self, slug: str) -> threading.Lock:
+        with self._lock:
+            held = self._slug_locks.setdefault(slug, [threading.Lock(), 0])
+            held[1] += 1
+        held[0].acquire()
+        return held[0]
+
+    def _release_slug(self, slug: str):
+        with self._lock:
+            held = self._slug_locks[slug]
+            held[0].release()
+            held[1] -= 1
+            if not held[1]:
+                del self._slug_locks[slug]
+
+    def _cached(self, slug: str) -> Tuple[bool, Optional[tuple]]:
+        """(True, entry) when slug's remembered resolution still holds, else (False, None)"""
+        resolved = self._recall(slug)
+        if resolved is None:
+            return False, None
+        checked, entry = resolved
+        fresh = time.monotonic() - checked < RESOLVE_TTL_SECONDS
+        if entry is None:
+            return fresh, None
+        source, mtime_ns, size, _ = entry
+        try:
+            stat = source.stat()
+        except FileNotFoundError:
+            return False, None
+        return fresh and (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size), entry
+
+    def resolve(self, company: str) -> Optional[tuple]:
+        slug = slugify(company)
+        if not slug:
+            return None
+        hit, entry = self._cached(slug)
+        if hit:
+            return entry
+
+        # One render per company at a time; other companies don't wait for it
+        self._acquire_slug(slug)
+        try:
+            hit, entry = self._cached(slug)  # rendered while we waited
+            if not hit:
+                source = self.find_source(slug)
+                entry = self._render(slug, source) if source else None
+                self._remember(slug, entry)
+        finally:
+            self._release_slug(slug)
+        return entry
+
+    def thumbnail(self, company: str, size: int) -> Optional[str]:
+        """Cache file name of the company's logo at size, rendering it on first use"""
+        entry = self.resolve(company)
+        if entry is None:
+            record_cache("logo_thumbnail", False)
+            return None
+        name = entry[3][size]
+        hit = self.disk.get(name) is not None
+        record_cache("logo_thumbnail", hit)
+        if not hit:
+            # Evicted since it was rendered; render the source again
+            self._forget(slugify(company))
+            entry = self.resolve(company)
+            name = entry[3][size] if entry else None
+        return name
+
+    def cached_file(self, name: str) -> Optional[os.stat_result]:
+        """stat of a thumbnail by file name, re-rendering it if it was evicted"""
+        match = _THUMB_NAME.match(name)
+        if match is None or int(match.group(2)) not in THUMB_SIZES:
+            return None
+        stat = self.disk.get(name)
+        if stat is None:
+            slug, size = match.group(1), int(match.group(2))
+            if self.thumbnail(slug, size) != name:
+                return None
+            stat = self.disk.get(name)
+        return stat
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """
+    FileResponse that hands the open file to the server (ASGI zerocopy
+    extension, i.e. sendfile) when the server advertises it. Otherwise it
+    falls back to chunked reads. uvicorn does not advertise it.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if self.send_header_only or "http.response.zerocopy" not in scope.get("extensions", {}):
+            return await super().__call__(scope, receive, send)
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        with open(self.path, "rb") as f:
+            await send({"type": "http.response.zerocopy", "file": f, "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+logo_cache = LogoCache()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Admission control benchmark
+Starts api.py twice on the same seeded database and catalogue, with
+JOBHUNT_ADMISSION=0 and then =1, and overloads it the same way each time:
+--expensive-clients keep-alive clients send job searches (200 results,
+sorted by salary) and logins, and --export-clients stream saved-job
+exports, as fast as they are answered, waiting out any Retry-After.
+Meanwhile --cheap-clients read profiles, single jobs and health checks, and
+one client sends profile reads with a single token as fast as it can. It
+reports latency percentiles and throughput per group, shed requests by
+status, and how much of the single-token flood was refused.
+
+    python server/benchmarks/bench_admission.py --duration 20 --expensive-clients 48
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import generate_jobs
+from load_test import BENCH_PASSWORD, free_port, git_commit, percentiles, seed_api, start_server
+
+SKILLS = ["python", "react", "sql", "figma", "aws", "typescript"]
+
+
+class Client:
+    """Keep-alive client recording latency and status per request"""
+
+    def __init__(self, port: int, rng: random.Random, honour_retry_after: bool = True):
+        self.port = port
+        self.rng = rng
+        self.honour_retry_after = honour_retry_after
+        self.latencies = []
+        self.statuses = {}
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+    def request(self, method: str, path: str, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            status, retry_after = response.status, response.getheader("Retry-After")
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+            status, retry_after = 599, None
+        return status, retry_after, time.perf_counter() - start
+
+    def run(self, next_request, deadline: float, warmup_until: float):
+        while time.perf_counter() < deadline:
+            status, retry_after, elapsed = self.request(*next_request(self.rng))
+            if time.perf_counter() > warmup_until:
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+                if status < 400:
+                    self.latencies.append(elapsed)
+            if retry_after and self.honour_retry_after:
+                time.sleep(max(0.0, min(float(retry_after), 5.0, deadline - time.perf_counter())))
+        self.conn.close()
+
+
+def summarise(clients, seconds: float) -> dict:
+    samples = [s for c in clients for s in c.latencies]
+    statuses = {}
+    for c in clients:
+        for status, count in c.statuses.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    return {"ok_per_sec": round(len(samples) / seconds, 1), "latency_ms": percentiles(samples), "statuses": statuses}
+
+
+def run_mode(enabled: bool, port: int, accounts, jobs, args) -> dict:
+    env = dict(os.environ, JOBHUNT_ADMISSION="1" if enabled else "0", JOBHUNT_RATE_IP="0")
+    proc = start_server("api", port, 1, env)
+
+    def expensive(rng):
+        account = rng.choice(accounts)
+        if rng.random() < 0.75:
+            skill = rng.choice(SKILLS)
+            return "GET", f"/api/jobs?skill={skill}&sort=salary&limit=200", None, account["token"]
+        return "POST", "/api/auth/login", {"email": account["email"], "password": BENCH_PASSWORD}, None
+
+    def export(rng):
+        return "GET", "/api/jobs/saved/export?format=csv", None, rng.choice(accounts)["token"]
+
+    def cheap(rng):
+        account = rng.choice(accounts[1:])
+        op = rng.random()
+        if op < 0.4:
+            return "GET", "/api/profile", None, account["token"]
+        if op < 0.8:
+            return "GET", f"/api/jobs/{rng.choice(jobs)['id']}", None, None
+        return "GET", "/api/health", None, None
+
+    def flood(rng):
+        return "GET", "/api/profile", None, accounts[0]["token"]
+
+    try:
+        groups = {
+            "expensive": [Client(port, random.Random(args.seed + i)) for i in range(args.expensive_clients)],
+            "exports": [Client(port, random.Random(args.seed + 3000 + i)) for i in range(args.export_clients)],
+            "cheap": [Client(port, random.Random(args.seed + 1000 + i)) for i in range(args.cheap_clients)],
+            "single_token_flood": [Client(port, random.Random(args.seed + 2000), honour_retry_after=False)],
+        }
+        requests = {"expensive": expensive, "exports": export, "cheap": cheap, "single_token_flood": flood}
+        warmup_until = time.perf_counter() + args.warmup
+        deadline = warmup_until + args.duration
+        threads = [threading.Thread(target=c.run, args=(requests[name], deadline, warmup_until))
+                   for name, clients in groups.items() for c in clients]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        conn.request("GET", "/api/metrics")
+        shed = {}
+        for line in conn.getresponse().read().decode().splitlines():
+            if line.startswith("jobhunt_admission_shed_total{"):
+                labels, value = line.rsplit(" ", 1)
+                shed[labels[len("jobhunt_admission_shed_total"):]] = int(float(value))
+        conn.close()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return {**{name: summarise(clients, args.duration) for name, clients in groups.items()}, "shed": shed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--expensive-clients", type=int, default=48)
+    parser.add_argument("--export-clients", type=int, default=12)
+    parser.add_argument("--cheap-clients", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=23)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-admission-") as tmp:
+        os.environ["JOBHUNT_INDEX_DIR"] = str(Path(tmp) / "index")
+        seed_args = SimpleNamespace(users=args.users, saved_per_user=20, apps_per_user=5, jobs=args.jobs,
+                                    seed=args.seed, database_url="")
+        accounts = seed_api(Path(tmp), seed_args)
+        from ingest import ingest_jobs
+        from job_index import publish_snapshot
+
+        jobs = list(generate_jobs(args.jobs, seed=args.seed))
+        ingest_jobs(jobs)
+        publish_snapshot()
+
+        results = {}
+        for mode, enabled in (("admission_off", False), ("admission_on", True)):
+            results[mode] = run_mode(enabled, free_port(), accounts, jobs, args)
+
+    print(json.dumps({
+        "benchmark": "admission",
+        "commit": git_commit(),
+        "jobs": len(jobs),
+        "expensive_clients": args.expensive_clients,
+        "export_clients": args.export_clients,
+        "cheap_clients": args.cheap_clients,
+        "duration_s": args.duration,
+        **results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Job alert percolator benchmark
+Builds an index of N generated subscriptions (saved searches, search-config
+roles and company watches), matches generated postings against it and
+compares against checking every subscription per posting.
+
+    python server/benchmarks/bench_alerts.py --subscriptions 100000 --jobs 10000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from alerts import Percolator, compile_subscription, job_terms
+from generators import COMPANIES, INDUSTRIES, ROLES, SKILLS, generate_jobs
+from load_test import percentiles
+
+EXTRA_ROLES = ["Product Designer", "UX Designer", "UI Designer", "Product Manager", "Design Lead",
+               "Content Designer", "Service Designer", "Interaction Designer", "Visual Designer",
+               "Software Engineer", "Data Scientist", "Marketing Manager", "Illustrator"]
+
+
+def make_subscriptions(n: int, seed: int):
+    rng = random.Random(seed)
+    roles = sorted(set(ROLES) | set(EXTRA_ROLES))
+    # Most watched companies don't post often; pad with names that never match
+    companies = list(COMPANIES) + [f"Company {i}" for i in range(5000)]
+    for i in range(n):
+        user_id = f"user{i}"
+        kind = rng.random()
+        if kind < 0.5:
+            yield compile_subscription(f"search:{i}", user_id,
+                                       roles=rng.sample(roles, rng.randint(1, 3)),
+                                       keywords=rng.sample(SKILLS, rng.randint(0, 2)),
+                                       industries=rng.sample(INDUSTRIES, 1) if rng.random() < 0.2 else [])
+        elif kind < 0.8:
+            yield compile_subscription("config", user_id, roles=rng.sample(roles, rng.randint(1, 4)))
+        else:
+            company = rng.choice(companies)
+            yield compile_subscription(f"company:{company.lower()}", user_id, companies=[company])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscriptions", type=int, default=100_000)
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--naive-sample", type=int, default=200, help="Jobs to time with the O(subscriptions) scan")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    subs = list(make_subscriptions(args.subscriptions, args.seed))
+    percolator = Percolator()
+    start = time.perf_counter()
+    for sub in subs:
+        percolator.add(sub)
+    build_seconds = time.perf_counter() - start
+
+    jobs = list(generate_jobs(args.jobs, seed=args.seed))
+    latencies, matched = [], 0
+    start = time.perf_counter()
+    for job in jobs:
+        t = time.perf_counter()
+        matched += len(percolator.match(job))
+        latencies.append(time.perf_counter() - t)
+    indexed_seconds = time.perf_counter() - start
+
+    naive_jobs = jobs[:args.naive_sample]
+    start = time.perf_counter()
+    naive_matched = 0
+    for job in naive_jobs:
+        terms = job_terms(job)
+        naive_matched += sum(1 for sub in subs if sub.matches(terms, skip_anchor=False))
+    naive_per_job = (time.perf_counter() - start) / max(len(naive_jobs), 1)
+    indexed_sample = sum(len(percolator.match(job)) for job in naive_jobs)
+
+    print(json.dumps({
+        "benchmark": "alerts_percolator",
+        "subscriptions": len(percolator),
+        "index_terms": len(percolator._index),
+        "build_seconds": round(build_seconds, 2),
+        "jobs": args.jobs,
+        "matches": matched,
+        "matches_per_job": round(matched / args.jobs, 1),
+        "jobs_per_sec": round(args.jobs / indexed_seconds),
+        "match_latency_ms": percentiles(latencies),
+        "naive_ms_per_job": round(naive_per_job * 1000, 2),
+        "speedup": round(naive_per_job / (indexed_seconds / args.jobs), 1),
+        "naive_agrees": naive_matched == indexed_sample,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Job description benchmark
+Generates --jobs postings with full-length HTML descriptions (headed
+sections, paragraphs, bullet lists; a fifth escaped twice). It times
+descriptions.description_columns on them, then ingests them into a temporary
+database, publishes a job_index snapshot and starts api.py. It reports:
+
+- Payload: bytes (plain and gzipped) of /api/jobs pages of --page-size,
+  against the same pages with each job's scraped HTML added back, as list
+  responses carried it before.
+- Render path: per page, the work a client did before (strip the HTML and
+  truncate it for every card), with to_text + summarise standing in for the
+  browser's stripHtml, against reading description_summary as it is.
+- GET /api/jobs/{id}/description latency, fresh (200) and revalidated with
+  If-None-Match (304), and its size.
+
+    python server/benchmarks/bench_descriptions.py --jobs 20000 --page-size 50
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import generate_jobs, long_description
+from load_test import free_port, git_commit, percentiles, start_server
+
+
+def jobs_with_descriptions(n: int, seed: int):
+    rng = random.Random(seed)
+    for job in generate_jobs(n, seed):
+        job["job_description_summary"] = long_description(rng, rng.randint(150, 900))
+        yield job
+
+
+def get(conn: http.client.HTTPConnection, path: str, headers=None):
+    start = time.perf_counter()
+    conn.request("GET", path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    return response, body, time.perf_counter() - start
+
+
+def sizes(body: bytes) -> dict:
+    return {"bytes": len(body), "gzip_bytes": len(gzip.compress(body, 6))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=46)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-descriptions-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        os.environ["JOBHUNT_INDEX_DIR"] = str(Path(tmp) / "index")
+        from descriptions import description_columns, summarise, to_text
+        from ingest import ingest_jobs
+        from job_index import publish_snapshot
+        from models import db
+
+        raw = [job["job_description_summary"] for job in jobs_with_descriptions(args.jobs, args.seed)]
+        start = time.perf_counter()
+        for description in raw:
+            description_columns(description)
+        normalise_seconds = time.perf_counter() - start
+
+        ingest_jobs(jobs_with_descriptions(args.jobs, args.seed), total=args.jobs)
+        publish_snapshot()
+        conn = db.get_conn()
+        scraped = dict(conn.execute("SELECT id, job_description_summary FROM jobs").fetchall())
+        conn.close()
+
+        env = dict(os.environ, JOBHUNT_RATE_IP="0")
+        port = free_port()
+        proc = start_server("api", port, 1, env)
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            after, before, strip, read, ids = [], [], [], [], []
+            for page in range(args.pages):
+                _, body, _ = get(conn, f"/api/jobs?offset={page * args.page_size}&limit={args.page_size}")
+                data = json.loads(body)
+                after.append(sizes(body))
+                old = dict(data, jobs=[dict(job, job_description_summary=scraped[job["id"]]) for job in data["jobs"]])
+                before.append(sizes(json.dumps(old).encode()))
+                start = time.perf_counter()
+                cards = [summarise(to_text(job["job_description_summary"])) for job in old["jobs"]]
+                strip.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                cards = [job["description_summary"] for job in data["jobs"]]
+                read.append(time.perf_counter() - start)
+                ids += [job["id"] for job in data["jobs"]]
+
+            fresh, revalidated, description_sizes = [], [], []
+            for job_id in random.Random(args.seed).sample(ids, min(len(ids), 500)):
+                response, body, seconds = get(conn, f"/api/jobs/{job_id}/description")
+                fresh.append(seconds)
+                description_sizes.append(len(body))
+                response, _, seconds = get(conn, f"/api/jobs/{job_id}/description",
+                                           {"If-None-Match": response.getheader("ETag")})
+                assert response.status == 304
+                revalidated.append(seconds)
+            conn.close()
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    mean = lambda samples, key: round(sum(s[key] for s in samples) / len(samples))
+    print(json.dumps({
+        "benchmark": "descriptions",
+        "commit": git_commit(),
+        "jobs": args.jobs,
+        "scraped_html_bytes_per_job": round(sum(map(len, raw)) / len(raw)),
+        "normalise_per_sec": round(args.jobs / normalise_seconds),
+        "page_size": args.page_size,
+        "list_page": {
+            "before": {"bytes": mean(before, "bytes"), "gzip_bytes": mean(before, "gzip_bytes")},
+            "after": {"bytes": mean(after, "bytes"), "gzip_bytes": mean(after, "gzip_bytes")},
+        },
+        "render_page_ms": {"strip_html_per_card": percentiles(strip), "precomputed_summary": percentiles(read)},
+        "description_endpoint": {
+            "mean_bytes": round(sum(description_sizes) / len(description_sizes)),
+            "fresh_ms": percentiles(fresh),
+            "revalidated_304_ms": percentiles(revalidated),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Application document benchmark
+Renders cover letters and emails with the compiled docgen templates and
+with str.format_map on the raw template text. It then times
+docgen.generate_docs over batches of jobs, first on a cold cache (render
+and store) and then with the drafts already stored.
+
+    python server/benchmarks/bench_docgen.py --jobs 2000 --batch 100
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import generate_jobs, make_profile
+from load_test import git_commit, percentiles
+
+
+def render_throughput(jobs, profile, seconds: float):
+    import docgen
+
+    base = docgen.profile_context(profile)
+    contexts = []
+    for job in jobs:
+        context = dict(base, company=job["company"], role=job["role"], company_mission=docgen._mission(job))
+        context.update(why_fit="My skills in design make me well-suited for this position.",
+                       why_fit_short="My skills in design make me well-suited for this position.")
+        contexts.append(context)
+    raw = [text for _, text in docgen.COVER_LETTER_TEMPLATES.values()]
+    raw += [part for pair in docgen.EMAIL_TEMPLATES.values() for part in pair]
+    compiled = [render for _, render in docgen._COVERS.values()]
+    compiled += [render for _, subject, body in docgen._EMAILS for render in (subject, body)]
+
+    def run(render_all):
+        done, start = 0, time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            for context in contexts:
+                render_all(context)
+            done += len(contexts)
+        return done / (time.perf_counter() - start)
+
+    return {
+        "compiled_per_sec": round(run(lambda c: [r(c) for r in compiled])),
+        "format_map_per_sec": round(run(lambda c: [t.format_map(c) for t in raw])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--render-seconds", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-docgen-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        from docgen import generate_docs
+        from ingest import ingest_jobs
+        from models import db
+
+        rng = random.Random(args.seed)
+        jobs = list(generate_jobs(args.jobs, seed=args.seed))
+        ingest_jobs(jobs)
+        db.create_user("docgen-user", "docgen@bench.example", "x")
+        profile = make_profile(rng, "Jane Doe", "docgen@bench.example")
+        db.save_profile("docgen-user", profile)
+        stored_profile = db.get_profile("docgen-user")
+
+        render = render_throughput(jobs[:200], stored_profile, args.render_seconds)
+
+        batches = [[j["id"] for j in jobs[i:i + args.batch]] for i in range(0, len(jobs), args.batch)]
+
+        def timed():
+            times = []
+            for ids in batches:
+                start = time.perf_counter()
+                result = generate_docs("docgen-user", ids)
+                times.append(time.perf_counter() - start)
+            return times, result
+
+        cold, first = timed()
+        warm, second = timed()
+
+    print(json.dumps({
+        "benchmark": "docgen",
+        "commit": git_commit(),
+        "jobs": len(jobs),
+        "batch": args.batch,
+        "render": render,
+        "cold_batch_ms": percentiles(cold),
+        "cold_docs_per_sec": round(len(jobs) / sum(cold)),
+        "cached_batch_ms": percentiles(warm),
+        "cached_docs_per_sec": round(len(jobs) / sum(warm)),
+        "cached_on_second_pass": all(d["cached"] for d in second["docs"]),
+        "same_doc_ids": [d["doc_id"] for d in first["docs"]] == [d["doc_id"] for d in second["docs"]],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Export memory benchmark
+Seeds one user with N saved jobs and applications in a temporary database,
+streams /api/jobs/saved/export and /api/applications/export through the
+ASGI app and reports peak RSS growth while streaming. With --compare-list
+it also measures the list-building get_saved_jobs path for contrast.
+
+    python server/benchmarks/bench_export_memory.py --rows 1000000
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import APPLICATION_STATUSES, generate_jobs
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc; falls back to peak RSS elsewhere)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def seed(db, user_id: str, rows: int):
+    base = datetime(2026, 1, 1)
+    rng = random.Random(7)
+    conn = db.get_conn()
+    conn.execute("INSERT INTO users (id, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                 (user_id, "export@bench.example.com", "x", base.isoformat()))
+    saved = ((user_id, f"{job['id']}-{i}", json.dumps(job), "note", (base + timedelta(seconds=i)).isoformat())
+             for i, job in enumerate(generate_jobs(rows, seed=1)))
+    conn.executemany(
+        "INSERT INTO saved_jobs (user_id, job_id, job_data, notes, created_at) VALUES (?, ?, ?, ?, ?)", saved)
+    apps = ((user_id, f"job-{i}", "Canva", "Product Designer", "", "", rng.choice(APPLICATION_STATUSES),
+             (base + timedelta(seconds=i)).isoformat(), (base + timedelta(seconds=i)).isoformat())
+            for i in range(rows))
+    conn.executemany(
+        """INSERT INTO applications (user_id, job_id, company, role, cover_letter, email_sent, status,
+        created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", apps)
+    conn.commit()
+    conn.close()
+
+
+async def stream(app, path: str, token: str) -> dict:
+    """GET path through the ASGI app, discarding the body; track bytes and peak RSS"""
+    stats = {"bytes": 0, "chunks": 0, "peak_rss": rss_bytes(), "status": None}
+
+    async def receive():
+        await asyncio.sleep(3600)  # never disconnects
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            stats["bytes"] += len(message.get("body", b""))
+            stats["chunks"] += 1
+            if stats["chunks"] % 20 == 0:
+                stats["peak_rss"] = max(stats["peak_rss"], rss_bytes())
+
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "client": ("127.0.0.1", 1234), "server": ("127.0.0.1", 8000),
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    }
+    await app(scope, receive, send)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--compare-list", action="store_true",
+                        help="Also measure get_saved_jobs (loads every row into a list)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-export-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        from api import app, create_jwt
+        from models import db
+
+        user_id = "export-bench-user"
+        start = time.perf_counter()
+        seed(db, user_id, args.rows)
+        seed_seconds = time.perf_counter() - start
+        token = create_jwt(user_id)
+
+        results = {"benchmark": "export_memory", "rows": args.rows, "seed_seconds": round(seed_seconds, 1)}
+        for name, path in (("saved_jobs_csv", "/api/jobs/saved/export?format=csv"),
+                           ("saved_jobs_ndjson", "/api/jobs/saved/export?format=ndjson"),
+                           ("applications_csv", "/api/applications/export?format=csv")):
+            gc.collect()
+            before = rss_bytes()
+            start = time.perf_counter()
+            stats = asyncio.run(stream(app, path, token))
+            elapsed = time.perf_counter() - start
+            results[name] = {
+                "status": stats["status"],
+                "mb_streamed": round(stats["bytes"] / 1e6, 1),
+                "seconds": round(elapsed, 2),
+                "rows_per_sec": round(args.rows / elapsed),
+                "rss_growth_mb": round((stats["peak_rss"] - before) / 1e6, 1),
+            }
+
+        if args.compare_list:
+            gc.collect()
+            before = rss_bytes()
+            start = time.perf_counter()
+            jobs = db.get_saved_jobs(user_id)
+            body = json.dumps({"success": True, "jobs": jobs})
+            results["get_saved_jobs_list"] = {
+                "seconds": round(time.perf_counter() - start, 2),
+                "mb_serialised": round(len(body) / 1e6, 1),
+                "rss_growth_mb": round((rss_bytes() - before) / 1e6, 1),
+            }
+            del jobs, body
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
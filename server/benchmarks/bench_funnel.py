@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Application funnel benchmark
+Seeds --applications applications (1M by default) in a temporary database:
+one user holds --whale of them and --users others share the rest. Each
+application walks part of the funnel (draft, sent, phone screen, interview,
+offer, or rejected along the way) over a few weeks, with its events logged.
+It times rebuilding application_stats from scratch, then --changes status
+changes through Database.set_application_status, which updates the counters
+in the same transaction. It then reads the stats of the biggest user and of a
+typical one --reads times each, from the counters (funnel.summarise) and by
+scanning their applications and events as before. Finally it runs
+funnel.check over everything and reports any drift, which should be none.
+
+    python server/benchmarks/bench_funnel.py --applications 1000000 --whale 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import APPLICATION_STATUSES
+from load_test import git_commit, percentiles
+
+# Chance of moving on from each stage; otherwise an application stays or is rejected
+ADVANCE = {"draft": 0.8, "sent": 0.35, "phone_screen": 0.5, "interview": 0.3}
+REJECT = 0.5
+BATCH = 20_000
+
+
+def history(rng: random.Random, start: datetime) -> list:
+    """[(status, entered_at)] of one application's walk through the funnel"""
+    steps, at = [("draft", start)], start
+    for status, following in zip(APPLICATION_STATUSES, APPLICATION_STATUSES[1:5]):
+        at += timedelta(days=rng.uniform(0.5, 20))
+        if rng.random() < ADVANCE[status]:
+            steps.append((following, at))
+        else:
+            if rng.random() < REJECT:
+                steps.append(("rejected", at))
+            break
+    return steps
+
+
+def seed(db, users: list, counts: list, seed: int):
+    """Applications with their event log, inserted the way the API would have left them"""
+    from funnel import REACHED, epoch
+
+    rng = random.Random(seed)
+    base = datetime.now() - timedelta(days=180)
+    conn = db.get_conn()
+    conn.executemany("INSERT INTO users (id, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                     [(user, f"{user}@bench.example.com", "x", base.isoformat()) for user in users])
+    next_id = 1
+    apps, events = [], []
+    for user, count in zip(users, counts):
+        for _ in range(count):
+            steps = history(rng, base + timedelta(days=rng.uniform(0, 150)))
+            status, changed = steps[-1]
+            reached = 0
+            for step, _ in steps:
+                reached |= REACHED[step]
+            created = steps[0][1].isoformat()
+            applied = next((at.isoformat() for step, at in steps if step == "sent"), None)
+            apps.append((next_id, user, f"job-{next_id}", "Canva", "Product Designer", status, applied,
+                         created, changed.isoformat(), changed.isoformat(), reached))
+            previous = None
+            for step, at in steps:
+                seconds = None if previous is None else epoch(at.isoformat()) - epoch(previous[1].isoformat())
+                events.append((next_id, user, previous and previous[0], step, seconds, at.isoformat()))
+                previous = (step, at)
+            next_id += 1
+            if len(apps) >= BATCH:
+                _insert(conn, apps, events)
+    _insert(conn, apps, events)
+    conn.close()
+
+
+def _insert(conn, apps: list, events: list):
+    conn.executemany(
+        """INSERT INTO applications (id, user_id, job_id, company, role, status, applied_at, created_at,
+        updated_at, status_changed_at, reached) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", apps)
+    conn.executemany(
+        """INSERT INTO application_events (application_id, user_id, from_status, to_status, seconds_in_stage,
+        created_at) VALUES (?, ?, ?, ?, ?, ?)""", events)
+    conn.commit()
+    apps.clear()
+    events.clear()
+
+
+def scan_stats(db, user_id: str, now=None) -> dict:
+    """The stats payload computed by reading every application and event of the user"""
+    from funnel import counters, summarise
+    from models import APPLICATION_EXITS_SQL, APPLICATION_STATES_SQL
+
+    conn = db.get_conn()
+    states = conn.execute(APPLICATION_STATES_SQL + " WHERE user_id = ?", (user_id,)).fetchall()
+    exits = conn.execute(APPLICATION_EXITS_SQL + " AND user_id = ? GROUP BY user_id, from_status",
+                         (user_id,)).fetchall()
+    conn.close()
+    stages = counters(states, exits)[user_id]
+    return summarise([(user_id, status, *values) for status, values in stages.items()], now)
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--applications", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--whale", type=int, default=100_000, help="Applications held by the biggest user")
+    parser.add_argument("--changes", type=int, default=5000)
+    parser.add_argument("--reads", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=45)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-funnel-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        from funnel import STAGES, check, summarise
+        from models import db
+
+        users = [f"funnel{i:06d}" for i in range(args.users + 1)]
+        whale = min(args.whale, args.applications)
+        rest = args.applications - whale
+        counts = [whale] + [rest // args.users + (i < rest % args.users) for i in range(args.users)]
+        start = time.perf_counter()
+        seed(db, users, counts, args.seed)
+        seed_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db.rebuild_application_stats()
+        rebuild_seconds = time.perf_counter() - start
+
+        rng = random.Random(args.seed + 1)
+        first_ids = list(accumulate(counts, initial=1))
+        samples = []
+        for _ in range(args.changes):
+            index = rng.randrange(len(users))
+            app_id = first_ids[index] + rng.randrange(max(1, counts[index]))
+            status = rng.choice(STAGES)
+            start = time.perf_counter()
+            db.set_application_status(users[index], app_id, status)
+            samples.append(time.perf_counter() - start)
+
+        reads = {}
+        for name, index in (("largest_user", 0), ("typical_user", 1)):
+            user, now = users[index], time.time()
+            assert scan_stats(db, user, now) == summarise(db.get_application_stats(user), now)
+            reads[name] = {
+                "applications": counts[index],
+                "counters_ms": timed(lambda: summarise(db.get_application_stats(user)), args.reads),
+                "scan_ms": timed(lambda: scan_stats(db, user), args.reads),
+            }
+
+        report = check(db)
+
+    print(json.dumps({
+        "benchmark": "funnel",
+        "commit": git_commit(),
+        "applications": args.applications,
+        "users": len(users),
+        "seed_seconds": round(seed_seconds, 1),
+        "rebuild_seconds": round(rebuild_seconds, 1),
+        "status_changes": {
+            "count": args.changes,
+            "per_sec": round(args.changes / sum(samples)),
+            "latency_ms": percentiles(samples),
+        },
+        "stats_reads": reads,
+        "check": {"seconds": report["seconds"], "users": report["users"], "drifted_users": len(report["drifted"])},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+CSV import benchmark
+Writes a Job_Listings.csv-shaped file with N generated rows (a small share of
+them invalid), imports it into a temporary database with importer.import_csv
+and reports rows/sec and peak RSS growth. It then reads the rows back: every
+imported job must be in the jobs table with its derived columns (summary,
+description text, text vector) filled in, as ingest.py would have left them.
+
+    python server/benchmarks/bench_import.py --rows 1000000 --batch-size 1000
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_export_memory import rss_bytes
+from generators import generate_jobs
+
+CSV_COLUMNS = ["id", "company", "role", "role_type", "location", "remote_status", "salary_range", "url",
+               "date_posted", "date_scraped", "source", "is_ghost_job", "skills", "industry",
+               "visa_sponsorship", "job_description_summary"]
+
+
+def write_csv(path: Path, rows: int, invalid_every: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for i, job in enumerate(generate_jobs(rows, seed=3)):
+            job["skills"] = str(job["skills"])  # Python list literal, as in Job_Listings.csv
+            if invalid_every and i % invalid_every == 0:
+                job["company"] = ""
+            writer.writerow(job)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--invalid-every", type=int, default=1000, help="Make every Nth row invalid (0 = none)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-import-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        from importer import import_csv
+        from models import db
+
+        csv_path = Path(tmp) / "Job_Listings.csv"
+        start = time.perf_counter()
+        write_csv(csv_path, args.rows, args.invalid_every)
+        write_seconds = time.perf_counter() - start
+
+        before = rss_bytes()
+        peak = [before]
+        report = import_csv(csv_path, "jobs", batch_size=args.batch_size,
+                            progress=lambda r: peak.__setitem__(0, max(peak[0], rss_bytes())))
+
+        conn = db.get_conn()
+        stored, missing = conn.execute(
+            """SELECT COUNT(*), SUM(description_text IS NULL OR description_summary IS NULL OR text_vector IS NULL
+            OR (description_text = '' AND job_description_summary != '')) FROM jobs""").fetchone()
+        conn.close()
+        assert stored == report.imported, f"{report.imported} imported but {stored} rows stored"
+        assert not missing, f"{missing} imported rows lack derived columns"
+
+        print(json.dumps({
+            "benchmark": "csv_import",
+            "rows": args.rows,
+            "file_mb": round(csv_path.stat().st_size / 1e6, 1),
+            "batch_size": args.batch_size,
+            "write_seconds": round(write_seconds, 2),
+            "import_seconds": round(report.seconds, 2),
+            "rows_per_sec": round(report.rows_per_sec),
+            "imported": report.imported,
+            "skipped": report.skipped,
+            "rss_growth_mb": round((peak[0] - before) / 1e6, 1),
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Job index snapshot benchmark
+Ingests --jobs generated postings into a temporary database, publishes a
+job_index snapshot, and starts api.py with --workers uvicorn workers.
+Clients then query /api/jobs and /api/jobs/{id} across many connections,
+so every worker maps and reads the snapshot. The benchmark reports each
+worker's RSS and PSS (proportional set size), and the snapshot mapping's
+shared and private pages. For contrast it measures the RSS of holding the
+same catalogue as Python dicts, which each worker would otherwise do. Last,
+it publishes a new snapshot and times how long the workers take to switch.
+
+    python server/benchmarks/bench_job_index.py --jobs 100000 --workers 8
+"""
+
+import argparse
+import gc
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_export_memory import rss_bytes
+from bench_push import _tree
+from generators import SKILLS, generate_jobs
+from load_test import BENCH_JWT_SECRET, free_port, git_commit, percentiles, start_server
+
+
+def memory(pid: int):
+    """RSS and PSS of a process plus its pages of the snapshot mapping; None if it maps no snapshot"""
+    rollup = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:"):
+                rollup[parts[0][:-1].lower()] = int(parts[1])
+    mapped = {"rss": 0, "pss": 0, "shared": 0, "private": 0}
+    in_snapshot = found = False
+    with open(f"/proc/{pid}/smaps") as f:
+        for line in f:
+            parts = line.split()
+            if "-" in parts[0] and len(parts) >= 5:
+                in_snapshot = parts[-1].endswith(".idx")
+                found = found or in_snapshot
+            elif in_snapshot and parts[0] in ("Rss:", "Pss:", "Shared_Clean:", "Private_Clean:"):
+                key = {"Rss:": "rss", "Pss:": "pss", "Shared_Clean:": "shared", "Private_Clean:": "private"}[parts[0]]
+                mapped[key] += int(parts[1])
+    if not found:
+        return None
+    return {"rss_kb": rollup["rss"], "pss_kb": rollup["pss"], "snapshot_kb": mapped}
+
+
+def query(port: int, requests: int, ids, seed: int, latencies):
+    rng = random.Random(seed)
+    conn = None
+    for i in range(requests):
+        if i % 20 == 0:
+            # Fresh connections spread the load over every worker
+            if conn:
+                conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        if rng.random() < 0.5:
+            path = f"/api/jobs/{rng.choice(ids)}"
+        else:
+            params = {"skill": rng.sample(SKILLS, rng.randint(0, 2)), "limit": 50, "offset": rng.randrange(0, 500, 50)}
+            path = "/api/jobs?" + urlencode(params, doseq=True)
+        start = time.perf_counter()
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def version_seen(port: int) -> int:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/api/jobs?limit=1")
+    version = json.loads(conn.getresponse().read())["version"]
+    conn.close()
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-index-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        os.environ["JOBHUNT_INDEX_DIR"] = str(Path(tmp) / "index")
+        from ingest import ingest_jobs
+        from job_index import JobIndex, publish_snapshot
+        from models import db
+
+        ingest_jobs(generate_jobs(args.jobs, seed=args.seed))
+        start = time.perf_counter()
+        path = publish_snapshot()
+        publish_seconds = time.perf_counter() - start
+        ids = [JobIndex(path).field(row, "id") for row in range(0, args.jobs, 7)]
+
+        # What one worker would hold with the catalogue loaded as dicts
+        gc.collect()
+        before = rss_bytes()
+        catalogue = list(db.iter_jobs())
+        dict_copy_mb = (rss_bytes() - before) / 1e6
+        del catalogue
+
+        port = free_port()
+        proc = start_server("api", port, args.workers, dict(os.environ, JWT_SECRET=BENCH_JWT_SECRET))
+        try:
+            deadline = time.time() + 60
+            while len(_tree(proc.pid)) - 1 < args.workers and time.time() < deadline:
+                time.sleep(0.2)
+            time.sleep(2)
+            latencies = []
+            threads = [threading.Thread(target=query, args=(port, args.requests // args.concurrency, ids, i, latencies))
+                       for i in range(args.concurrency)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            query_seconds = time.perf_counter() - start
+            # Children of the uvicorn supervisor that map the snapshot are the workers
+            workers = [m for m in map(memory, _tree(proc.pid)[1:]) if m]
+
+            # Hot swap: time until every one of 100 fresh connections sees the new version
+            new_version = JobIndex(publish_snapshot()).version
+            start = time.perf_counter()
+            while time.perf_counter() - start < 30:
+                if all(version_seen(port) == new_version for _ in range(100)):
+                    break
+            swap_seconds = time.perf_counter() - start
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+        snapshot_mb = path.stat().st_size / 1e6
+
+    print(json.dumps({
+        "benchmark": "job_index",
+        "commit": git_commit(),
+        "jobs": args.jobs,
+        "workers": len(workers),
+        "snapshot_mb": round(snapshot_mb, 1),
+        "publish_seconds": round(publish_seconds, 2),
+        "dict_catalogue_mb_per_worker": round(dict_copy_mb, 1),
+        "requests_per_sec": round(args.requests / query_seconds, 1),
+        "latency_ms": percentiles(latencies),
+        "worker_rss_mb": [round(w["rss_kb"] / 1024, 1) for w in workers],
+        "worker_pss_mb": [round(w["pss_kb"] / 1024, 1) for w in workers],
+        "snapshot_rss_mb_per_worker": [round(w["snapshot_kb"]["rss"] / 1024, 1) for w in workers],
+        "snapshot_pss_mb_total": round(sum(w["snapshot_kb"]["pss"] for w in workers) / 1024, 1),
+        "snapshot_private_mb_total": round(sum(w["snapshot_kb"]["private"] for w in workers) / 1024, 1),
+        "swap_seconds": round(swap_seconds, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
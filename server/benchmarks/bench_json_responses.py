@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Stored-JSON response benchmark
+Seeds a user with --saved-jobs saved jobs and a profile. It measures CPU
+per response for GET /api/jobs/saved and GET /api/profile two ways: building
+the body from the database's JSON text (the endpoints' path), and decoding
+every row into dicts for FastAPI's jsonable_encoder + JSONResponse (the
+previous path). It also reports uvicorn's CPU per request for the live
+endpoints.
+
+    python server/benchmarks/bench_json_responses.py --saved-jobs 1000 --requests 500
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import jwt
+
+from bench_export_memory import seed
+from bench_push import server_cpu_seconds
+from load_test import BENCH_JWT_SECRET, free_port, git_commit, start_server
+
+USER_ID = "json-bench-user"
+
+
+def cpu_per_call(fn, seconds: float) -> float:
+    """Mean process CPU seconds per call, repeated for about `seconds` of wall time"""
+    calls, start, cpu = 0, time.perf_counter(), time.process_time()
+    while time.perf_counter() - start < seconds:
+        fn()
+        calls += 1
+    return (time.process_time() - cpu) / calls
+
+
+def in_process(args) -> dict:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from api import _json_response
+    from models import db
+
+    paths = {
+        "saved_jobs": (
+            lambda: JSONResponse(jsonable_encoder({"success": True, "jobs": db.get_saved_jobs(USER_ID)})).body,
+            lambda: _json_response({"success": True}, jobs=db.get_saved_jobs_json(USER_ID)).body,
+        ),
+        "profile": (
+            lambda: JSONResponse(jsonable_encoder({"success": True, "profile": db.get_profile(USER_ID)})).body,
+            lambda: _json_response({"success": True}, profile=db.get_profile_json(USER_ID)).body,
+        ),
+    }
+    results = {}
+    for name, (decoded, spliced) in paths.items():
+        assert json.loads(decoded()) == json.loads(spliced()), f"{name} bodies differ"
+        before = cpu_per_call(decoded, args.seconds)
+        after = cpu_per_call(spliced, args.seconds)
+        results[name] = {
+            "decode_encode_cpu_ms": round(before * 1000, 3),
+            "spliced_cpu_ms": round(after * 1000, 3),
+            "speedup": round(before / after, 2),
+            "body_kb": round(len(spliced()) / 1024, 1),
+        }
+    return results
+
+
+def over_http(args, env) -> dict:
+    token = jwt.encode({"user_id": USER_ID}, BENCH_JWT_SECRET, algorithm="HS256")
+    port = free_port()
+    proc = start_server("api", port, 1, env)
+    results = {}
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        for path in ("/api/jobs/saved", "/api/profile"):
+            cpu = server_cpu_seconds(proc.pid)
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                conn.request("GET", path, headers={"Authorization": f"Bearer {token}"})
+                response = conn.getresponse()
+                response.read()
+                assert response.status == 200, response.status
+            results[path] = {
+                "server_cpu_ms_per_request": round((server_cpu_seconds(proc.pid) - cpu) / args.requests * 1000, 3),
+                "requests_per_sec": round(args.requests / (time.perf_counter() - start), 1),
+            }
+        conn.close()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--saved-jobs", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500, help="HTTP requests per endpoint")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Time per in-process measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-json-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        from generators import make_profile
+        from models import db
+
+        seed(db, USER_ID, args.saved_jobs)
+        db.save_profile(USER_ID, make_profile(random.Random(1), "Jane Doe", "export@bench.example.com"))
+
+        result = {
+            "benchmark": "json_responses",
+            "commit": git_commit(),
+            "saved_jobs": args.saved_jobs,
+            "in_process": in_process(args),
+            "http": over_http(args, dict(os.environ, JWT_SECRET=BENCH_JWT_SECRET)),
+        }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
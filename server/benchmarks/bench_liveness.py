@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Posting liveness benchmark
+Serves a stand-in job board on --hosts local ports (one "host" each). Each
+posting path behaves in one of several ways: live (with an ETag), 404, 410,
+a "position has been filled" page, a redirect to the board's front page,
+HEAD not allowed, 503 with Retry-After, or too slow to answer. It ingests
+--jobs generated postings pointing at the board, saves some for a few users,
+and runs liveness.run_liveness_checks. It reports checks/sec, verdicts
+against what the board serves, the most requests one host was answering
+at once (not counting ones the checker had already timed out on) and the
+shortest gap between requests to one host, as the board's thread saw them.
+A second run a day later shows how
+many checks were conditional GETs answered with 304. A sequential run
+(--concurrency 1, one request per host) gives the baseline rate.
+
+    python server/benchmarks/bench_liveness.py --jobs 2000 --hosts 20 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import generate_jobs
+from load_test import git_commit
+
+# (behaviour, share, expected verdict)
+BEHAVIOURS = [
+    ("live", 0.55, "live"), ("head_not_allowed", 0.05, "live"), ("not_found", 0.1, "expired"),
+    ("gone", 0.05, "expired"), ("filled", 0.1, "expired"), ("to_front_page", 0.05, "expired"),
+    ("unavailable", 0.05, "unknown"), ("slow", 0.05, "unknown"),
+]
+LIVE_PAGE = b"<html><body><h1>Senior Engineer</h1><p>Apply now.</p></body></html>"
+FILLED_PAGE = b"<html><body><h1>Senior Engineer</h1><p>This position has been filled.</p></body></html>"
+
+
+def behaviour(job_id: str) -> str:
+    """Deterministic behaviour for a posting, by hash of its id"""
+    point = int(hashlib.sha1(job_id.encode()).hexdigest()[:8], 16) / 0xFFFFFFFF
+    for name, share, _ in BEHAVIOURS:
+        if point < share:
+            return name
+        point -= share
+    return BEHAVIOURS[0][0]
+
+
+class StandInBoard:
+    """Job board on several local ports, recording per-host concurrency and request spacing"""
+
+    def __init__(self, hosts: int, latency: float, slow: float):
+        self.hosts = hosts
+        self.latency = latency
+        self.slow = slow
+        self.ports = []
+        self.in_flight = {}
+        self.max_in_flight = {}
+        self.last_start = {}
+        self.min_gap = {}
+        self.requests = {"HEAD": 0, "GET": 0, "304": 0}
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+
+    def _serve(self):
+        asyncio.set_event_loop(self.loop)
+
+        async def start():
+            for _ in range(self.hosts):
+                server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+                self.ports.append(server.sockets[0].getsockname()[1])
+
+        self.loop.run_until_complete(start())
+        self._ready.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader, writer):
+        port = writer.get_extra_info("sockname")[1]
+        now = time.perf_counter()
+        if port in self.last_start:
+            gap = now - self.last_start[port]
+            self.min_gap[port] = min(self.min_gap.get(port, gap), gap)
+        self.last_start[port] = now
+        counted = False
+        try:
+            request = (await reader.readline()).decode().split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            method, path = request[0], request[1]
+            self.requests[method] = self.requests.get(method, 0) + 1
+            if behaviour(path.rsplit("/", 1)[-1]) == "slow" and path != "/":
+                await asyncio.sleep(self.slow)
+            else:
+                counted = True
+                self.in_flight[port] = self.in_flight.get(port, 0) + 1
+                self.max_in_flight[port] = max(self.max_in_flight.get(port, 0), self.in_flight[port])
+                await asyncio.sleep(self.latency)
+            status, extra, body = self._respond(method, path, headers)
+            if status == 304:
+                self.requests["304"] += 1
+            head = [f"HTTP/1.1 {status} X", f"Content-Length: {len(body)}", "Connection: close"] + extra
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + (b"" if method == "HEAD" else body))
+            await writer.drain()
+        except (ConnectionError, IndexError):
+            pass
+        finally:
+            if counted:
+                self.in_flight[port] -= 1
+            writer.close()
+
+    def _respond(self, method: str, path: str, headers: dict):
+        if path == "/":
+            return 200, ["ETag: \"front\""], b"<html><body>All jobs</body></html>"
+        kind = behaviour(path.rsplit("/", 1)[-1])
+        etag = '"' + hashlib.sha1(path.encode()).hexdigest()[:12] + '"'
+        if kind == "live" or (kind == "head_not_allowed" and method == "GET"):
+            if headers.get("if-none-match") == etag:
+                return 304, [f"ETag: {etag}"], b""
+            return 200, [f"ETag: {etag}", "Content-Type: text/html"], LIVE_PAGE
+        if kind == "head_not_allowed":
+            return 405, ["Allow: GET"], b""
+        if kind == "not_found":
+            return 404, [], b"Not found"
+        if kind == "gone":
+            return 410, [], b"Gone"
+        if kind == "filled":
+            return 200, [f"ETag: {etag}", "Content-Type: text/html"], FILLED_PAGE
+        if kind == "to_front_page":
+            return 302, ["Location: /"], b""
+        if kind == "unavailable":
+            return 503, ["Retry-After: 1"], b""
+        return 200, [], LIVE_PAGE  # slow: sent after the client gave up
+
+    def stats(self) -> dict:
+        return {
+            "requests": dict(self.requests),
+            "max_in_flight_per_host": max(self.max_in_flight.values(), default=0),
+            "min_gap_per_host_ms": round(min(self.min_gap.values(), default=0) * 1000, 1),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--hosts", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Board response time")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--host-delay", type=float, default=0.05, help="Seconds between requests to one host")
+    parser.add_argument("--timeout", type=float, default=1.0)
+    parser.add_argument("--sequential-jobs", type=int, default=200, help="Postings in the sequential baseline")
+    parser.add_argument("--seed", type=int, default=17)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-liveness-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        os.environ["JOBHUNT_LIVENESS_ALLOW_PRIVATE"] = "1"  # the stand-in board is on 127.0.0.1
+        import liveness
+        from ingest import ingest_jobs
+        from job_index import JobIndex, publish_snapshot
+        from models import db
+
+        board = StandInBoard(args.hosts, args.latency_ms / 1000, args.timeout * 2)
+        rng = random.Random(args.seed)
+        jobs = list(generate_jobs(args.jobs, seed=args.seed))
+        for job in jobs:
+            job["url"] = f"http://127.0.0.1:{rng.choice(board.ports)}/jobs/{job['id']}"
+        ingest_jobs(jobs)
+        for i in range(20):
+            db.create_user(f"u{i}", f"u{i}@bench.example.com", "x")
+            for job in rng.sample(jobs, 10):
+                db.save_job(f"u{i}", job["id"], job)
+
+        start = time.perf_counter()
+        first = liveness.run_liveness_checks(limit=args.jobs, concurrency=args.concurrency,
+                                             host_delay=args.host_delay, timeout=args.timeout)
+        first_seconds = time.perf_counter() - start
+        politeness = board.stats()
+
+        expected = {job["id"]: next(v for name, _, v in BEHAVIOURS if name == behaviour(job["id"])) for job in jobs}
+        conn = db.get_conn()
+        verdicts = dict(conn.execute("SELECT job_id, verdict FROM job_checks").fetchall())
+        expired = {row[0] for row in conn.execute("SELECT id FROM jobs WHERE expired_at IS NOT NULL").fetchall()}
+        conn.close()
+        agree = sum(1 for job_id, verdict in verdicts.items() if verdict == expected[job_id])
+
+        # Re-ingesting keeps the checker's flags; the catalogue leaves expired jobs out
+        ingest_jobs(jobs)
+        kept = sum(1 for job in db.get_jobs(sorted(expired)).values() if job["is_ghost_job"])
+        index = JobIndex(publish_snapshot(directory=Path(tmp) / "index"))
+        catalogue, _ = index.search(limit=1)
+
+        before = dict(board.requests)
+        start = time.perf_counter()
+        second = liveness.run_liveness_checks(limit=args.jobs, concurrency=args.concurrency,
+                                              host_delay=args.host_delay, timeout=args.timeout,
+                                              now=datetime.now() + timedelta(hours=25))
+        second_seconds = time.perf_counter() - start
+        after = board.requests
+
+        conn = db.get_conn()
+        with conn:
+            conn.execute("DELETE FROM job_checks")
+            conn.execute("UPDATE jobs SET expired_at = NULL, is_ghost_job = 0")
+        conn.close()
+        start = time.perf_counter()
+        sequential = liveness.run_liveness_checks(limit=args.sequential_jobs, concurrency=1,
+                                                  host_delay=args.host_delay, timeout=args.timeout)
+        sequential_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "benchmark": "liveness",
+        "commit": git_commit(),
+        "jobs": len(jobs),
+        "hosts": args.hosts,
+        "board_latency_ms": args.latency_ms,
+        "first_run": {**first, "seconds": round(first_seconds, 2),
+                      "checks_per_sec": round(first["checked"] / first_seconds, 1)},
+        "verdicts_matching_board": round(agree / max(1, len(verdicts)), 3),
+        "politeness": {**politeness, "host_delay_ms": args.host_delay * 1000,
+                       "per_host_limit": liveness.PER_HOST_CONCURRENCY},
+        "flags_kept_after_reingest": f"{kept}/{len(expired)}",
+        "catalogue_after_expiry": catalogue,
+        "second_run": {**second, "seconds": round(second_seconds, 2),
+                       "requests": {k: after.get(k, 0) - before.get(k, 0) for k in after}},
+        "sequential": {"checked": sequential["checked"], "seconds": round(sequential_seconds, 2),
+                       "checks_per_sec": round(sequential["checked"] / sequential_seconds, 1)},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
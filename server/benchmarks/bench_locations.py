@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Location gazetteer benchmark
+Resolves --strings generated location strings with gazetteer.resolve_location,
+first uncached and then from the memo, and reports strings/sec and the share
+resolved to a country or region. It then ingests --jobs generated postings,
+publishes a job_index snapshot, and times country/region and UTC offset
+filters on the snapshot. As a baseline it times the same filter done with
+Python ports of getRegionFromLocation and getTimezoneFromLocation
+(src/lib/utils.ts) over every location on each query, as App.tsx does.
+
+    python server/benchmarks/bench_locations.py --jobs 100000 --strings 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import LOCATIONS, generate_jobs
+from load_test import git_commit, percentiles
+
+PLACES = ["Sydney", "Melbourne, VIC", "Perth, WA", "Auckland", "Singapore", "Tokyo, Japan", "Bangalore",
+          "San Francisco, CA", "Seattle, WA", "New York, NY", "Austin, TX", "Toronto, ON", "London, UK",
+          "Berlin, Germany", "Dublin", "Cambridge, MA", "Pyrmont, New South Wales, Australia", "Nowhere"]
+FORMATS = ["{p}", "Remote - {p}", "Hybrid ({p})", "{p} or Remote", "{p} / {q}", "On-site, {p}", "{p} - HQ #{n}"]
+APP_PRESET = {"regions": ["AU", "SG", "JP", "HK", "REMOTE"], "min": 7, "max": 12}
+
+_REGION_KEYWORDS = {
+    "AU": ["australia", "sydney", "melbourne", "brisbane", "perth", "adelaide"],
+    "NZ": ["new zealand", "auckland", "wellington"], "SG": ["singapore"], "JP": ["japan", "tokyo", "osaka"],
+    "HK": ["hong kong"], "US": ["united states", "usa", "america", "san francisco", "new york", "los angeles"],
+    "GB": ["united kingdom", "uk", "london"], "CA": ["canada", "toronto", "vancouver"],
+}
+
+
+def region_from_location(location: str):
+    """Port of getRegionFromLocation"""
+    loc = location.lower()
+    regions = [code for code, words in _REGION_KEYWORDS.items() if any(w in loc for w in words)]
+    if "remote" in loc:
+        regions.append("REMOTE")
+    return regions or ["REMOTE"]
+
+
+def timezone_from_location(location: str) -> float:
+    """Port of getTimezoneFromLocation (its first few branches cover the AU/Asia preset)"""
+    loc = location.lower()
+    for words, tz in [(["sydney", "melbourne", "brisbane", "canberra"], 11), (["adelaide"], 10.5), (["perth"], 8),
+                      (["darwin"], 9.5), (["australia"], 10),
+                      (["singapore", "hong kong", "taipei", "manila", "kuala lumpur"], 8),
+                      (["tokyo", "osaka", "seoul"], 9), (["bangkok", "ho chi minh", "hanoi", "jakarta"], 7),
+                      (["bangalore", "mumbai", "delhi", "india"], 5.5), (["auckland", "wellington", "new zealand"], 13),
+                      (["san francisco", "los angeles", "seattle", "california"], -8),
+                      (["new york", "boston", "miami", "east"], -5), (["chicago", "austin", "dallas"], -6),
+                      (["london", "uk", "ireland"], 0), (["paris", "berlin", "amsterdam"], 1)]:
+        if any(w in loc for w in words):
+            return tz
+    return 0
+
+
+def location_strings(n: int, seed: int):
+    rng = random.Random(seed)
+    return [rng.choice(FORMATS).format(p=rng.choice(PLACES), q=rng.choice(PLACES), n=rng.randrange(10_000))
+            for _ in range(n)]
+
+
+def resolve_rate(strings):
+    import gazetteer
+
+    gazetteer._memo.clear()
+    start = time.perf_counter()
+    resolved = [gazetteer.resolve_location(s) for s in strings]
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    for s in strings:
+        gazetteer.resolve_location(s)
+    warm = time.perf_counter() - start
+    return {
+        "uncached_per_sec": round(len(strings) / cold),
+        "memoised_per_sec": round(len(strings) / warm),
+        "resolved_share": round(sum(1 for r in resolved if r.country or r.region) / len(strings), 3),
+        "sample_locations_resolved": sum(1 for s in LOCATIONS if gazetteer.resolve_location(s).country),
+        "sample_locations": len(LOCATIONS),
+    }
+
+
+def timed(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return percentiles(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--strings", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    strings = location_strings(args.strings, args.seed)
+    resolving = resolve_rate(strings)
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-locations-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        from ingest import ingest_jobs
+        from job_index import JobIndex, publish_snapshot
+
+        rng = random.Random(args.seed)
+        jobs = list(generate_jobs(args.jobs, seed=args.seed))
+        for job in jobs:
+            job["location"] = rng.choice(LOCATIONS + strings[:500])
+        ingest_jobs(jobs)
+        index = JobIndex(publish_snapshot(directory=Path(tmp) / "index"))
+        preset = dict(countries=APP_PRESET["regions"], min_utc_offset=APP_PRESET["min"] * 60,
+                      max_utc_offset=APP_PRESET["max"] * 60, limit=50)
+
+        snapshot = {
+            "country": timed(lambda: index.search(countries=["AU"], limit=50), args.repeat),
+            "region": timed(lambda: index.search(regions=["APAC"], limit=50), args.repeat),
+            "utc_offset": timed(lambda: index.search(min_utc_offset=420, max_utc_offset=720, limit=50), args.repeat),
+            "app_preset": timed(lambda: index.search(**preset), args.repeat),
+        }
+        total, _ = index.search(**preset)
+
+        def substring_checks():
+            matches = []
+            for job in jobs:
+                if not any(r in APP_PRESET["regions"] for r in region_from_location(job["location"])):
+                    continue
+                if job["remote_status"] != "Remote":
+                    tz = timezone_from_location(job["location"])
+                    if tz < APP_PRESET["min"] or tz > APP_PRESET["max"]:
+                        continue
+                matches.append(job["id"])
+            return matches
+
+        baseline = timed(substring_checks, max(1, args.repeat // 5))
+
+    print(json.dumps({
+        "benchmark": "locations",
+        "commit": git_commit(),
+        "strings": len(strings),
+        "resolve": resolving,
+        "jobs": len(jobs),
+        "snapshot_query_ms": snapshot,
+        "app_preset_matches": total,
+        "substring_checks_per_query_ms": baseline,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Company logo benchmark
+Writes --logos generated PNG logos into a temporary JOBHUNT_LOGO_DIR and
+starts api.py under uvicorn. First it times each logo's first request, which
+resolves the source and renders every thumbnail size. Then --concurrency
+clients repeat GET /api/assets/logo/{company}: the redirect, then the cached
+thumbnail. Last, they revalidate thumbnails with If-None-Match.
+
+    python server/benchmarks/bench_logos.py --logos 200 --requests 20000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from load_test import BENCH_JWT_SECRET, free_port, git_commit, percentiles, start_server
+
+
+def make_logo(rng: random.Random, pixels: int) -> bytes:
+    from assets import encode_png
+
+    # A two-colour gradient disc on transparency, roughly what a logo export looks like
+    start, end = [rng.randrange(256) for _ in range(3)], [rng.randrange(256) for _ in range(3)]
+    half = pixels / 2
+    channels = [[], [], [], []]
+    for y in range(pixels):
+        for x in range(pixels):
+            t = x / pixels
+            for c in range(3):
+                channels[c].append(int(start[c] + (end[c] - start[c]) * t))
+            channels[3].append(255 if (x - half) ** 2 + (y - half) ** 2 < half ** 2 else 0)
+    return encode_png(pixels, pixels, channels)
+
+
+def fetch_logos(port: int, companies, size: int, results, revalidate: bool = False):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    for company in companies:
+        start = time.perf_counter()
+        conn.request("GET", f"/api/assets/logo/{quote(company)}?size={size}")
+        response = conn.getresponse()
+        response.read()
+        location = response.getheader("Location")
+        headers = {}
+        if revalidate:
+            conn.request("GET", location)
+            etag = conn.getresponse()
+            etag.read()
+            headers["If-None-Match"] = etag.getheader("ETag")
+            start = time.perf_counter()
+        conn.request("GET", location, headers=headers)
+        thumb = conn.getresponse()
+        body = thumb.read()
+        results.append((time.perf_counter() - start, thumb.status, len(body)))
+    conn.close()
+
+
+def run_clients(port: int, companies, size: int, concurrency: int, revalidate: bool = False):
+    results = []
+    threads = [threading.Thread(target=fetch_logos, args=(port, companies[i::concurrency], size, results, revalidate))
+               for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logos", type=int, default=200)
+    parser.add_argument("--pixels", type=int, default=256, help="Source logo width and height")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=128)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    companies = [f"Bench Company {i}" for i in range(args.logos)]
+    with tempfile.TemporaryDirectory(prefix="jobhunt-logos-") as tmp:
+        logo_dir = Path(tmp) / "logos"
+        logo_dir.mkdir()
+        for company in companies:
+            (logo_dir / f"{company.lower().replace(' ', '-')}.png").write_bytes(make_logo(rng, args.pixels))
+        env = dict(os.environ, JOBHUNT_DB_PATH=str(Path(tmp) / "jobhunt.db"), JWT_SECRET=BENCH_JWT_SECRET,
+                   JOBHUNT_LOGO_DIR=str(logo_dir), JOBHUNT_ASSET_CACHE_DIR=str(Path(tmp) / "cache"))
+        port = free_port()
+        proc = start_server("api", port, 1, env)
+        try:
+            cold, cold_seconds = run_clients(port, companies, args.size, args.concurrency)
+            repeated = [rng.choice(companies) for _ in range(args.requests)]
+            warm, warm_seconds = run_clients(port, repeated, args.size, args.concurrency)
+            revalidated, _ = run_clients(port, repeated[:args.requests // 10], args.size, args.concurrency,
+                                         revalidate=True)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+        cache_bytes = sum(p.stat().st_size for p in (Path(tmp) / "cache").iterdir())
+
+    print(json.dumps({
+        "benchmark": "logo_assets",
+        "commit": git_commit(),
+        "logos": args.logos,
+        "source_pixels": args.pixels,
+        "size": args.size,
+        "concurrency": args.concurrency,
+        "errors": sum(1 for r in cold + warm if r[1] != 200) + sum(1 for r in revalidated if r[1] != 304),
+        "cold_latency_ms": percentiles([r[0] for r in cold]),
+        "cold_logos_per_sec": round(len(cold) / cold_seconds, 1),
+        "warm_latency_ms": percentiles([r[0] for r in warm]),
+        "warm_logos_per_sec": round(len(warm) / warm_seconds, 1),
+        "revalidate_latency_ms": percentiles([r[0] for r in revalidated]),
+        "thumbnail_bytes": round(sum(r[2] for r in warm) / len(warm)),
+        "cache_mb": round(cache_bytes / 1e6, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
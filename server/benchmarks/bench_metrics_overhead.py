@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Metrics overhead benchmark
+Measures what MetricsMiddleware and the Database query hook add per request
+and per statement, by driving a FastAPI app in-process (no network).
+
+    python server/benchmarks/bench_metrics_overhead.py [--requests 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI
+
+from metrics import MetricsMiddleware, observe_db_query
+from models import QUERY_HOOKS, TracedConnection
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/ping/{item_id}")
+    async def ping(item_id: str):
+        return {"ok": True, "item": item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, n: int) -> float:
+    """Send n GET requests straight through the ASGI interface, return seconds"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(n):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "path": f"/api/ping/{i}",
+            "raw_path": f"/api/ping/{i}".encode(), "root_path": "", "query_string": b"",
+            "headers": [], "client": ("127.0.0.1", 1234), "server": ("127.0.0.1", 8000),
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+def bench_queries(n: int, traced: bool) -> float:
+    conn = sqlite3.connect(":memory:", factory=TracedConnection if traced else sqlite3.Connection)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.executemany("INSERT INTO t (v) VALUES (?)", [(str(i),) for i in range(1000)])
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    for i in range(n):
+        cursor.execute("SELECT v FROM t WHERE id = ?", (i % 1000 + 1,))
+        cursor.fetchone()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200000)
+    args = parser.parse_args()
+
+    plain, instrumented = build_app(False), build_app(True)
+    asyncio.run(drive(plain, 500))  # warm up routing/validation caches
+    asyncio.run(drive(instrumented, 500))
+    base = asyncio.run(drive(plain, args.requests))
+    with_mw = asyncio.run(drive(instrumented, args.requests))
+
+    QUERY_HOOKS.clear()
+    raw_q = bench_queries(args.queries, traced=False)
+    traced_no_hooks = bench_queries(args.queries, traced=True)
+    QUERY_HOOKS.append(observe_db_query)
+    traced_q = bench_queries(args.queries, traced=True)
+    QUERY_HOOKS.clear()
+
+    per_req = lambda s: s / args.requests * 1e6
+    per_q = lambda s: s / args.queries * 1e6
+    print(json.dumps({
+        "requests": args.requests,
+        "request_us": {"baseline": round(per_req(base), 2), "with_metrics": round(per_req(with_mw), 2)},
+        "middleware_overhead_us": round(per_req(with_mw - base), 2),
+        "middleware_overhead_pct": round((with_mw - base) / base * 100, 2),
+        "queries": args.queries,
+        "query_us": {
+            "sqlite3": round(per_q(raw_q), 3),
+            "traced_no_hooks": round(per_q(traced_no_hooks), 3),
+            "traced_with_metrics_hook": round(per_q(traced_q), 3),
+        },
+        "query_hook_overhead_us": round(per_q(traced_q - raw_q), 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Push stream load test
+Starts api.py under uvicorn with the SQLite push broker. It opens N idle SSE
+streams (/api/push/events), holds them open past the keepalive interval,
+then measures fan-out latency. Two kinds of message are sent from this
+process, as another worker would send them: a catalogue broadcast to every
+stream, and new-match wake-ups for a sample of users. Reports server RSS
+per connection and CPU use while idle.
+
+    python server/benchmarks/bench_push.py --connections 10000 --idle 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import jwt
+
+from load_test import BENCH_JWT_SECRET, free_port, git_commit, percentiles, start_server
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def _tree(pid: int):
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    return pids
+
+
+def server_rss(pid: int) -> int:
+    total = 0
+    for p in _tree(pid):
+        with open(f"/proc/{p}/statm") as f:
+            total += int(f.read().split()[1]) * PAGE_SIZE
+    return total
+
+
+def server_cpu_seconds(pid: int) -> float:
+    total = 0
+    for p in _tree(pid):
+        with open(f"/proc/{p}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        total += int(fields[11]) + int(fields[12])  # utime + stime
+    return total / CLOCK_TICKS
+
+
+class Stream:
+    """One raw SSE connection; records when each event type arrives"""
+
+    def __init__(self, port: int, user_id: str):
+        self.port = port
+        self.user_id = user_id
+        self.received = {}  # event -> [monotonic times]
+        self.keepalives = 0
+        self.ready = asyncio.Event()
+
+    async def run(self):
+        token = jwt.encode({"user_id": self.user_id}, BENCH_JWT_SECRET, algorithm="HS256")
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(f"GET /api/push/events?token={token} HTTP/1.1\r\nHost: bench\r\n"
+                     f"Accept: text/event-stream\r\n\r\n".encode())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                if line.startswith(b"event: "):
+                    event = line[7:].strip().decode()
+                    self.received.setdefault(event, []).append(time.monotonic())
+                    if event == "ready":
+                        self.ready.set()
+                elif line.startswith(b": keepalive"):
+                    self.keepalives += 1
+        finally:
+            writer.close()
+
+
+async def open_streams(port: int, n: int, concurrency: int):
+    streams = [Stream(port, f"push-user-{i}") for i in range(n)]
+    tasks = []
+    gate = asyncio.Semaphore(concurrency)
+    connect_times = []
+
+    async def connect(stream):
+        async with gate:
+            start = time.monotonic()
+            tasks.append(asyncio.create_task(stream.run()))
+            await asyncio.wait_for(stream.ready.wait(), 60)
+            connect_times.append(time.monotonic() - start)
+
+    start = time.monotonic()
+    await asyncio.gather(*(connect(s) for s in streams))
+    return streams, tasks, connect_times, time.monotonic() - start
+
+
+async def wait_for_event(streams, event: str, count: int, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(len(s.received.get(event, ())) >= count for s in streams):
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+async def bench(args, db, port: int, pid: int) -> dict:
+    baseline_rss = server_rss(pid)
+    streams, tasks, connect_times, connect_seconds = await open_streams(port, args.connections, args.connect_concurrency)
+    connected_rss = server_rss(pid)
+
+    cpu_before = server_cpu_seconds(pid)
+    await asyncio.sleep(args.idle)
+    idle_cpu = server_cpu_seconds(pid) - cpu_before
+
+    # Catalogue broadcast to every stream
+    published = time.monotonic()
+    db.add_push_events([("*", json.dumps({"type": "jobs", "ingested": 1}))])
+    delivered = await wait_for_event(streams, "jobs", 1, 60)
+    broadcast = [s.received["jobs"][0] - published for s in streams if s.received.get("jobs")]
+
+    # New matches for a sample of users: notification rows plus one wake-up each
+    sample = streams[:args.match_users]
+    now = datetime.now().isoformat()
+    db.add_notifications([(s.user_id, "bench-job", "search:1", now) for s in sample])
+    published = time.monotonic()
+    db.add_push_events([(s.user_id, json.dumps({"type": "notifications"})) for s in sample])
+    matched = await wait_for_event(sample, "match", 1, 60)
+    matches = [s.received["match"][0] - published for s in sample if s.received.get("match")]
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "benchmark": "push_streams",
+        "commit": git_commit(),
+        "connections": len(streams),
+        "connect_seconds": round(connect_seconds, 2),
+        "connect_latency_ms": percentiles(connect_times),
+        "server_rss_mb": {"baseline": round(baseline_rss / 1e6, 1), "connected": round(connected_rss / 1e6, 1)},
+        "rss_per_connection_kb": round((connected_rss - baseline_rss) / len(streams) / 1024, 1),
+        "idle_seconds": args.idle,
+        "idle_cpu_percent": round(idle_cpu / args.idle * 100, 1),
+        "keepalives_received": sum(s.keepalives for s in streams),
+        "poll_seconds": args.poll_seconds,
+        "broadcast_delivered": delivered,
+        "broadcast_latency_ms": percentiles(broadcast),
+        "match_users": len(sample),
+        "matches_delivered": matched,
+        "match_latency_ms": percentiles(matches),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--connect-concurrency", type=int, default=500)
+    parser.add_argument("--idle", type=float, default=20.0, help="Seconds to hold streams open before publishing")
+    parser.add_argument("--match-users", type=int, default=1000)
+    parser.add_argument("--poll-seconds", type=float, default=0.05, help="SQLite broker poll interval")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-push-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        from models import Database
+        db = Database()
+
+        env = dict(os.environ, JWT_SECRET=BENCH_JWT_SECRET, JOBHUNT_PUSH_BROKER="sqlite",
+                   JOBHUNT_PUSH_POLL_SECONDS=str(args.poll_seconds))
+        port = args.port or free_port()
+        proc = start_server("api", port, args.workers, env)
+        try:
+            result = asyncio.run(bench(args, db, port, proc.pid))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
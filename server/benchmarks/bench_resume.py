@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Resume upload benchmark
+Starts api.py under uvicorn and has --concurrency clients upload generated
+PDF resumes to POST /api/profile/resume. A share of the uploads repeat
+earlier files, so they are served from the content-hash cache. Meanwhile a
+prober times GET /api/health, to show whether parsing stalls the rest of the
+API. The same files are also parsed inline, one after another, as a baseline.
+
+    python server/benchmarks/bench_resume.py --uploads 2000 --concurrency 16 --resume-workers 4
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import make_resume, resume_pdf
+from load_test import BENCH_JWT_SECRET, free_port, git_commit, percentiles, start_server
+
+
+def multipart(filename: str, data: bytes):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: application/pdf\r\n\r\n").encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def register(port: int, index: int) -> str:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("POST", "/api/auth/register", json.dumps({
+        "email": f"resume{index}@bench.example", "password": "benchmark-password", "full_name": f"Resume {index}",
+    }), {"Content-Type": "application/json"})
+    token = json.loads(conn.getresponse().read())["token"]
+    conn.close()
+    return token
+
+
+def uploader(port: int, token: str, files, results):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    for name, data in files:
+        body, content_type = multipart(name, data)
+        start = time.perf_counter()
+        conn.request("POST", "/api/profile/resume", body, {"Content-Type": content_type,
+                                                          "Authorization": f"Bearer {token}"})
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+        results.append((time.perf_counter() - start, response.status, payload.get("cached")))
+    conn.close()
+
+
+def prober(port: int, stop: threading.Event, samples):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    while not stop.is_set():
+        start = time.perf_counter()
+        conn.request("GET", "/api/health")
+        conn.getresponse().read()
+        samples.append(time.perf_counter() - start)
+        stop.wait(0.02)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duplicate-share", type=float, default=0.3, help="Fraction of uploads repeating a file")
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--resume-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    unique = [resume_pdf(make_resume(rng, i, args.pages)) for i in range(int(args.uploads * (1 - args.duplicate_share)))]
+    files = [(f"resume-{i}.pdf", data) for i, data in enumerate(unique)]
+    files += [rng.choice(files) for _ in range(args.uploads - len(files))]
+    rng.shuffle(files)
+
+    from resume_parser import parse_resume
+    start = time.perf_counter()
+    for data in unique:
+        parse_resume(data)
+    inline_per_sec = len(unique) / (time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-resume-") as tmp:
+        env = dict(os.environ, JOBHUNT_DB_PATH=str(Path(tmp) / "jobhunt.db"), JWT_SECRET=BENCH_JWT_SECRET,
+                   JOBHUNT_RESUME_WORKERS=str(args.resume_workers))
+        port = free_port()
+        proc = start_server("api", port, 1, env)
+        try:
+            tokens = [register(port, i) for i in range(args.concurrency)]
+            # Warm the process pool so worker start-up isn't timed
+            uploader(port, tokens[0], [("warmup.pdf", resume_pdf(make_resume(rng, -1, 1)))], [])
+
+            results, health = [], []
+            stop = threading.Event()
+            probe = threading.Thread(target=prober, args=(port, stop, health))
+            probe.start()
+            threads = [threading.Thread(target=uploader, args=(port, tokens[i], files[i::args.concurrency], results))
+                       for i in range(args.concurrency)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            seconds = time.perf_counter() - start
+            stop.set()
+            probe.join()
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    ok = [r for r in results if r[1] == 200]
+    print(json.dumps({
+        "benchmark": "resume_upload",
+        "commit": git_commit(),
+        "uploads": len(results),
+        "unique_files": len(unique),
+        "avg_file_kb": round(sum(len(d) for d in unique) / len(unique) / 1024, 1),
+        "concurrency": args.concurrency,
+        "resume_workers": args.resume_workers,
+        "cpus": os.cpu_count(),
+        "errors": len(results) - len(ok),
+        "cached": sum(1 for r in ok if r[2]),
+        "uploads_per_sec": round(len(results) / seconds, 1),
+        "upload_latency_ms": percentiles([r[0] for r in ok]),
+        "cached_latency_ms": percentiles([r[0] for r in ok if r[2]]),
+        "parsed_latency_ms": percentiles([r[0] for r in ok if not r[2]]),
+        "health_latency_ms": percentiles(health),
+        "inline_parses_per_sec": round(inline_per_sec, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Salary normaliser benchmark
+Parses --strings generated salary_range values in many formats with
+salary.parse_salary and reports strings/sec and how many had a salary. It
+then ingests --jobs generated postings, publishes a job_index snapshot, and
+times salary range filters and sort-by-salary on the snapshot and on the
+indexed SQLite columns. As a baseline it times the same filter done by
+re-parsing every salary_range on each query, as calculateSalaryMatch does in
+the browser.
+
+    python server/benchmarks/bench_salary.py --jobs 100000 --strings 100000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import SALARIES, SKILLS, generate_jobs
+from load_test import git_commit, percentiles
+
+# (template, scale) pairs; the number stands for an annual amount divided by scale
+FORMATS = [
+    ("${a:,} - ${b:,}", 1), ("AUD {ak}k-{bk}k", 1), ("${h}/hr", 2080), ("USD {a:,} - {b:,} per year", 1),
+    ("£{a:,} - £{b:,}", 1), ("{ak}k", 1), ("${a:,} + super", 1), ("${d} per day", 260),
+    ("SGD {m:,} monthly", 12), ("Up to ${a:,} p.a.", 1), ("€{a_dotted}", 1), ("${ak}-{bk}k + 11% super", 1),
+    ("CA${a:,}", 1), ("${h} - ${h2} an hour", 2080),
+    ("Not disclosed", 0), ("Competitive", 0), ("DOE", 0), ("", 0),
+]
+
+
+def salary_strings(n: int, seed: int):
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        template, scale = rng.choice(FORMATS)
+        a = rng.randrange(60, 250) * 1000
+        b = a + rng.randrange(0, 60) * 1000
+        out.append(template.format(a=a, b=b, ak=a // 1000, bk=b // 1000, h=a // 2080, h2=b // 2080,
+                                   d=a // 260, m=a // 12, a_dotted=f"{a:,}".replace(",", ".")))
+    return out
+
+
+def parse_rate(strings, seconds: float):
+    from salary import parse_salary
+
+    done, parsed, start = 0, 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for text in strings:
+            parsed += parse_salary(text) is not None
+        done += len(strings)
+    elapsed = time.perf_counter() - start
+    return {"strings_per_sec": round(done / elapsed), "parsed_share": round(parsed / done, 3)}
+
+
+def timed(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return percentiles(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--strings", type=int, default=100_000)
+    parser.add_argument("--parse-seconds", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+
+    strings = salary_strings(args.strings, args.seed)
+    parsing = parse_rate(strings, args.parse_seconds)
+    expected = sum(1 for text in strings if any(c.isdigit() for c in text)) / len(strings)
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-salary-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        from ingest import ingest_jobs
+        from job_index import JobIndex, publish_snapshot
+        from models import db
+        from salary import parse_salary
+
+        rng = random.Random(args.seed)
+        jobs = list(generate_jobs(args.jobs, seed=args.seed))
+        extra = [s for s in strings[:1000] if s not in SALARIES]
+        for job in jobs:
+            job["salary_range"] = rng.choice(SALARIES + extra)
+        start = time.perf_counter()
+        ingest_jobs(jobs)
+        ingest_seconds = time.perf_counter() - start
+        index = JobIndex(publish_snapshot(directory=Path(tmp) / "index"))
+        texts = [(job["salary_range"], job["location"]) for job in jobs]
+        skill = SKILLS[0]
+
+        snapshot = {
+            "no_filter": timed(lambda: index.search(limit=50), args.repeat),
+            "min_salary": timed(lambda: index.search(min_salary=150_000, limit=50), args.repeat),
+            "range": timed(lambda: index.search(min_salary=120_000, max_salary=180_000, limit=50), args.repeat),
+            "sort_salary": timed(lambda: index.search(sort="salary", limit=50), args.repeat),
+            "min_salary_sort_salary": timed(lambda: index.search(min_salary=150_000, sort="salary", limit=50),
+                                            args.repeat),
+            "skill_min_salary_sort_salary": timed(
+                lambda: index.search([skill], min_salary=150_000, sort="salary", limit=50), args.repeat),
+        }
+
+        conn = db.get_conn()
+        sql = {
+            "min_salary_sort_salary": timed(lambda: conn.execute(
+                "SELECT id FROM jobs WHERE salary_max_aud >= ? ORDER BY salary_max_aud DESC LIMIT 50",
+                (150_000,)).fetchall(), args.repeat),
+            "range_count": timed(lambda: conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE salary_max_aud >= ? AND salary_min_aud <= ?",
+                (120_000, 180_000)).fetchone(), args.repeat),
+        }
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM jobs WHERE salary_max_aud >= ? "
+                            "ORDER BY salary_max_aud DESC LIMIT 50", (150_000,)).fetchall()
+        conn.close()
+
+        def reparse():
+            matches = [i for i, (text, location) in enumerate(texts)
+                       if (s := parse_salary(text, location)) is not None and s.max_aud >= 150_000]
+            return matches[:50]
+
+        baseline = timed(reparse, max(1, args.repeat // 10))
+
+    print(json.dumps({
+        "benchmark": "salary",
+        "commit": git_commit(),
+        "strings": len(strings),
+        "parse": {**parsing, "with_digits_share": round(expected, 3)},
+        "jobs": len(jobs),
+        "ingest_jobs_per_sec": round(len(jobs) / ingest_seconds),
+        "snapshot_query_ms": snapshot,
+        "sqlite_query_ms": sql,
+        "sqlite_plan": [row[-1] for row in plan],
+        "reparse_per_query_ms": baseline,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Storage write throughput benchmark
+Runs a write-heavy mix of Database calls (saving jobs, creating
+applications, updating profiles, inserting alert matches and catalogue
+upserts) from --processes worker processes with --threads threads each, as
+several uvicorn workers with their threadpools would. Reports writes/sec,
+rows/sec, latency per operation and errors such as SQLite's "database is
+locked". It uses a temporary SQLite file by default. With --database-url it
+runs against PostgreSQL instead; each run adds its own users and jobs, so
+the database can be reused between runs.
+
+    python server/benchmarks/bench_storage.py --processes 4 --threads 4 --duration 20
+    python server/benchmarks/bench_storage.py --database-url postgresql://localhost/jobhunt_bench
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import generate_jobs, make_profile
+from load_test import git_commit, parse_mix, percentiles
+
+DEFAULT_MIX = "save_job=30,create_application=15,profile_update=10,notifications=30,upsert_jobs=2"
+NOTIFICATION_BATCH = 20
+
+
+def create_users(run_id: str, count: int):
+    from models import db
+
+    for i in range(count):
+        db.create_user(f"{run_id}-u{i}", f"{run_id}-u{i}@bench.example.com", "x")
+
+
+def worker(worker_id: int, args, run_id: str, results):
+    from ingest import clean_job, job_row
+    from models import db
+
+    now = datetime.now().isoformat()
+    jobs = [clean_job(job, now) for job in generate_jobs(args.jobs, seed=args.seed)]
+    for job in jobs:
+        job["id"] = f"{run_id}-{job['id']}"
+    users = [f"{run_id}-u{i}" for i in range(args.users)]
+    mix = parse_mix(args.mix)
+    ops, weights = list(mix), list(mix.values())
+    lock = threading.Lock()
+    latencies = {op: [] for op in ops}
+    rows = {op: 0 for op in ops}
+    errors = {}
+
+    def run(thread_id: int, deadline: float):
+        rng = random.Random(args.seed * 1000 + worker_id * 100 + thread_id)
+        while time.time() < deadline:
+            op = rng.choices(ops, weights)[0]
+            user = rng.choice(users)
+            job = rng.choice(jobs)
+            start = time.perf_counter()
+            try:
+                if op == "save_job":
+                    db.save_job(user, job["id"], job, "")
+                    n = 1
+                elif op == "create_application":
+                    db.create_application(user, job["id"], job["company"], job["role"], "Dear hiring team, ...")
+                    n = 1
+                elif op == "profile_update":
+                    db.save_profile(user, make_profile(rng, user, f"{user}@bench.example.com"))
+                    n = 1
+                elif op == "notifications":
+                    batch = [(user, rng.choice(jobs)["id"], "config", now) for _ in range(NOTIFICATION_BATCH)]
+                    db.add_notifications(batch)
+                    n = len(batch)
+                elif op == "upsert_jobs":
+                    start_at = rng.randrange(max(1, len(jobs) - args.batch))
+                    rows = [job_row(j) for j in jobs[start_at:start_at + args.batch]]
+                    db.upsert_jobs(rows)
+                    n = len(rows)
+                else:
+                    raise ValueError(f"unknown operation {op}")
+            except Exception as e:
+                with lock:
+                    key = f"{op}: {type(e).__name__}: {str(e)[:60]}"
+                    errors[key] = errors.get(key, 0) + 1
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[op].append(elapsed)
+                rows[op] += n
+
+    deadline = time.time() + args.duration
+    threads = [threading.Thread(target=run, args=(i, deadline)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.put({"latencies": latencies, "rows": rows, "errors": errors})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default="", help="postgresql://... (default: a temporary SQLite file)")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4, help="Threads per process")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=500, help="Jobs per catalogue upsert")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    run_id = f"st{int(time.time())}"
+    with tempfile.TemporaryDirectory(prefix="jobhunt-storage-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        os.environ["JOBHUNT_DATABASE_URL"] = args.database_url
+        # Schema and users first, in a child so this process holds no connections
+        context = multiprocessing.get_context("spawn")
+        setup = context.Process(target=create_users, args=(run_id, args.users))
+        setup.start()
+        setup.join()
+
+        results = context.Queue()
+        start = time.perf_counter()
+        procs = [context.Process(target=worker, args=(i, args, run_id, results)) for i in range(args.processes)]
+        for p in procs:
+            p.start()
+        outcomes = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+    operations, total_calls, total_rows, errors = {}, 0, 0, {}
+    for op in parse_mix(args.mix):
+        samples = [s for o in outcomes for s in o["latencies"][op]]
+        op_rows = sum(o["rows"][op] for o in outcomes)
+        total_calls += len(samples)
+        total_rows += op_rows
+        operations[op] = {
+            "calls": len(samples),
+            "calls_per_sec": round(len(samples) / args.duration, 1),
+            "rows_per_sec": round(op_rows / args.duration, 1),
+            "latency_ms": percentiles(samples),
+        }
+    for o in outcomes:
+        for key, count in o["errors"].items():
+            errors[key] = errors.get(key, 0) + count
+
+    print(json.dumps({
+        "benchmark": "storage",
+        "commit": git_commit(),
+        "storage": "postgres" if args.database_url else "sqlite",
+        "processes": args.processes,
+        "threads_per_process": args.threads,
+        "duration_s": args.duration,
+        "wall_s": round(elapsed, 1),
+        "writes_per_sec": round(total_calls / args.duration, 1),
+        "rows_per_sec": round(total_rows / args.duration, 1),
+        "errors": errors,
+        "operations": operations,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
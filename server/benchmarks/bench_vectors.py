@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Resume similarity benchmark
+Generates postings with topical descriptions (generators.TopicalText), so
+that some jobs really are nearer a resume than others. It times
+vectors.job_vector on its own over --vector-jobs of them, then ingests --jobs into a temporary database and publishes a
+job_index snapshot. It reports vectors/sec, ingest rate, snapshot build
+time and peak RSS, and the size of the vector sections per job. Then
+--queries resume vectors, of topical text with skills and a role, are looked
+up with JobIndex.similar: approximate (the default budget) and exact
+(budget=None). It reports latency percentiles for both, and recall@10/@k
+of the approximate results against the exact.
+
+    python server/benchmarks/bench_vectors.py --jobs 1000000 --queries 200
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generators import ROLES, SKILLS, TopicalText, topical_jobs
+from load_test import git_commit, percentiles
+
+VECTOR_SECTIONS = ("vector_idf", "vector_offsets", "vector_buckets", "vector_weights",
+                   "run_offsets", "run_ends", "run_weights", "impact_rows")
+
+
+def resumes(n: int, seed: int, text: TopicalText):
+    """Resume vectors: topical text, skills and preferred roles, as a profile would have them"""
+    from vectors import profile_vector
+
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield profile_vector(text.text(rng, rng.randint(200, 600)), rng.sample(SKILLS, 5),
+                             rng.sample(ROLES, rng.randint(0, 2)))
+
+
+def section_sizes(path: Path) -> dict:
+    from job_index import HEADER, SECTION_TABLE, SECTIONS
+
+    with open(path, "rb") as f:
+        f.seek(HEADER.size)
+        table = SECTION_TABLE.unpack(f.read(SECTION_TABLE.size))
+    return {name: table[2 * i + 1] for i, name in enumerate(SECTIONS)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--vector-jobs", type=int, default=20_000, help="Postings vectorised on their own")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=44)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="jobhunt-vectors-") as tmp:
+        os.environ["JOBHUNT_DB_PATH"] = str(Path(tmp) / "jobhunt.db")
+        from ingest import ingest_jobs
+        from job_index import JobIndex, publish_snapshot
+        from vectors import job_vector
+
+        text = TopicalText(args.seed)
+        sample = list(topical_jobs(args.vector_jobs, args.seed, text))
+        start = time.perf_counter()
+        for job in sample:
+            job_vector(job)
+        vector_seconds = time.perf_counter() - start
+        del sample
+
+        start = time.perf_counter()
+        ingest_jobs(topical_jobs(args.jobs, args.seed, text), total=args.jobs)
+        ingest_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        path = publish_snapshot(directory=Path(tmp) / "index")
+        publish_seconds = time.perf_counter() - start
+        sizes = section_sizes(path)
+        snapshot_bytes = path.stat().st_size
+        index = JobIndex(path)
+        vector_terms = sizes["vector_buckets"] // 2
+
+        approximate, exact, recall = [], [], {10: [], args.k: []}
+        for vector in resumes(args.queries, args.seed + 1, text):
+            start = time.perf_counter()
+            found = index.similar(vector, args.k)
+            approximate.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            truth = index.similar(vector, args.k, budget=None)
+            exact.append(time.perf_counter() - start)
+            for at in recall:
+                relevant = {row for row, _ in truth[:at]}
+                if relevant:
+                    recall[at].append(len(relevant & {row for row, _ in found[:at]}) / len(relevant))
+
+    print(json.dumps({
+        "benchmark": "vectors",
+        "commit": git_commit(),
+        "jobs": len(index),
+        "vectors_per_sec": round(args.vector_jobs / vector_seconds),
+        "ingest_jobs_per_sec": round(args.jobs / ingest_seconds),
+        "snapshot": {
+            "publish_seconds": round(publish_seconds, 1),
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024,
+            "bytes": snapshot_bytes,
+            "vector_bytes_per_job": round(sum(sizes[name] for name in VECTOR_SECTIONS) / max(1, len(index)), 1),
+            "terms_per_job": round(vector_terms / max(1, len(index)), 1),
+        },
+        "queries": args.queries,
+        "k": args.k,
+        "approximate_ms": percentiles(approximate),
+        "exact_ms": percentiles(exact),
+        "recall_at_10": round(sum(recall[10]) / max(1, len(recall[10])), 4),
+        f"recall_at_{args.k}": round(sum(recall[args.k]) / max(1, len(recall[args.k])), 4),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Synthetic data generators for benchmarks
+Jobs follow the shape of public/data/jobs.json and reuse its companies,
+roles and locations as vocabulary; profiles follow the API's ProfileUpdate.
+Resumes are plain text lines, optionally wrapped in a minimal PDF.
+"""
+
+import hashlib
+import html
+import json
+import random
+import zlib
+from datetime import date, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterator, List
+
+JOBS_JSON = Path(__file__).resolve().parent.parent.parent / "public" / "data" / "jobs.json"
+
+_FALLBACK_COMPANIES = ["Atlassian", "Canva", "SafetyCulture", "Linktree", "Xero", "Stripe", "Figma"]
+_FALLBACK_ROLES = ["Product Designer", "Senior Product Designer", "UX Designer", "UI Designer",
+                   "UX Researcher", "Design Systems Designer", "Brand Designer"]
+_FALLBACK_LOCATIONS = ["Sydney, Australia", "Melbourne, Australia", "Remote - United States",
+                       "San Francisco, CA", "London, United Kingdom", "Australia"]
+SKILLS = ["Product Design", "UI Design", "UX Design", "Figma", "Design Systems", "User Research",
+          "Prototyping", "Brand Design", "Motion Design", "Graphic Design", "Accessibility", "Sketch"]
+SALARIES = ["Not disclosed", "$120,000 - $150,000", "AUD 140k-170k", "$85/hr",
+            "USD 160,000 - 210,000 per year", "£70,000 - £85,000", "150k", "Competitive"]
+INDUSTRIES = ["Design/Technology", "Design", "Fintech", "SaaS", "Health Tech", "E-commerce"]
+SOURCES = ["linkedin.com", "greenhouse.io/stripe", "greenhouse.io/figma", "seek.com.au", "indeed.com"]
+APPLICATION_STATUSES = ["draft", "sent", "phone_screen", "interview", "offer", "rejected"]
+_WORDS = ("design product team users research systems build craft collaborate engineers "
+          "experience ship iterate prototypes insights accessible scale brand visual motion").split()
+
+
+def load_sample_jobs() -> List[dict]:
+    """Jobs from public/data/jobs.json, or an empty list if it is missing"""
+    if not JOBS_JSON.exists():
+        return []
+    with open(JOBS_JSON, "r", encoding="utf-8") as f:
+        return json.load(f).get("jobs", [])
+
+
+_sample = load_sample_jobs()
+COMPANIES = sorted({j["company"] for j in _sample}) or _FALLBACK_COMPANIES
+ROLES = sorted({j["role"] for j in _sample}) or _FALLBACK_ROLES
+LOCATIONS = sorted({j["location"] for j in _sample}) or _FALLBACK_LOCATIONS
+
+
+def description(rng: random.Random, words: int = 60) -> str:
+    """Escaped-HTML description like job_description_summary"""
+    paras = []
+    remaining = words
+    while remaining > 0:
+        n = min(remaining, rng.randint(12, 30))
+        paras.append("<p>" + " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + ".&nbsp;</p>")
+        remaining -= n
+    return "<div class=\"content-intro\">" + "\n".join(paras) + "</div>"
+
+
+def long_description(rng: random.Random, words: int = 400) -> str:
+    """Full-length posting HTML: headed sections of paragraphs and bullet lists; escaped a second time now and then"""
+    sections = []
+    remaining = words
+    while remaining > 0:
+        heading = rng.choice(["About the role", "What you'll do", "About you", "Benefits &amp; perks"])
+        items = [" ".join(rng.choice(_WORDS) for _ in range(rng.randint(5, 14))).capitalize()
+                 for _ in range(rng.randint(3, 7))]
+        section = f"<h3>{heading}</h3>" + description(rng, min(remaining, rng.randint(40, 90)))
+        section += "<ul>" + "".join(f"<li><p>{item}</p></li>" for item in items) + "</ul>"
+        sections.append(section)
+        remaining -= 60 + sum(len(item.split()) for item in items)
+    text = "\n".join(sections)
+    return html.escape(text, quote=False) if rng.random() < 0.2 else text
+
+
+def make_job(rng: random.Random, index: int) -> dict:
+    company = rng.choice(COMPANIES)
+    posted = date(2026, 2, 18) - timedelta(days=rng.randint(0, 60))
+    return {
+        "id": hashlib.md5(f"job-{index}".encode()).hexdigest()[:12],
+        "company": company,
+        "role": rng.choice(ROLES),
+        "role_type": "Full-time",
+        "location": rng.choice(LOCATIONS),
+        "remote_status": rng.choice(["On-site", "Remote", "Hybrid"]),
+        "salary_range": rng.choice(SALARIES),
+        "url": f"https://job-boards.example.com/{company.lower().replace(' ', '')}/jobs/{index}",
+        "date_posted": posted.isoformat(),
+        "date_scraped": "2026-02-18",
+        "source": rng.choice(SOURCES),
+        "is_ghost_job": rng.random() < 0.05,
+        "skills": rng.sample(SKILLS, rng.randint(0, 4)),
+        "industry": rng.choice(INDUSTRIES),
+        "visa_sponsorship": None,
+        "job_description_summary": description(rng, rng.randint(30, 80)),
+    }
+
+
+def generate_jobs(n: int, seed: int = 0) -> Iterator[dict]:
+    rng = random.Random(seed)
+    for i in range(n):
+        yield make_job(rng, i)
+
+
+class TopicalText:
+    """
+    Text with the structure real postings and resumes have, unlike _WORDS: a
+    Zipf-distributed vocabulary of made-up words, and topics (a specialism,
+    a domain) that each favour topic_words of the rarer ones. A text mixes a
+    primary and a secondary topic with general vocabulary, so the texts most
+    alike are the ones sharing topics.
+    """
+
+    def __init__(self, seed: int = 0, vocabulary: int = 20_000, topics: int = 400, topic_words: int = 40):
+        rng = random.Random(seed)
+        syllables = [c + v for c in "bcdfghklmnprstvz" for v in "aeiou"]
+        words = set()
+        while len(words) < vocabulary:
+            words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+        self.words = sorted(words)
+        rng.shuffle(self.words)
+        self._word_weights = list(accumulate(1 / rank for rank in range(1, vocabulary + 1)))
+        self.topics = [rng.sample(self.words[vocabulary // 100:], topic_words) for _ in range(topics)]
+        self._topic_weights = list(accumulate(1 / rank for rank in range(1, topics + 1)))
+
+    def text(self, rng: random.Random, words: int) -> str:
+        primary, secondary = rng.choices(self.topics, cum_weights=self._topic_weights, k=2)
+        picks = rng.choices(self.words, cum_weights=self._word_weights, k=words)
+        for i in range(words):
+            point = rng.random()
+            if point < 0.4:
+                picks[i] = rng.choice(primary)
+            elif point < 0.55:
+                picks[i] = rng.choice(secondary)
+        return " ".join(picks).capitalize() + "."
+
+
+def topical_jobs(n: int, seed: int = 0, text: TopicalText = None) -> Iterator[dict]:
+    """generate_jobs with TopicalText descriptions of 80-250 words"""
+    text = text or TopicalText()
+    rng = random.Random(seed + 1)
+    for job in generate_jobs(n, seed):
+        job["job_description_summary"] = f"<div class=\"content-intro\"><p>{text.text(rng, rng.randint(80, 250))}</p></div>"
+        yield job
+
+
+def make_profile(rng: random.Random, full_name: str, email: str) -> dict:
+    """Profile payload in the camelCase shape accepted by PUT /api/profile"""
+    return {
+        "fullName": full_name,
+        "email": email,
+        "phone": f"04{rng.randint(10000000, 99999999)}",
+        "location": rng.choice(LOCATIONS),
+        "linkedinUrl": f"https://linkedin.com/in/{email.split('@')[0]}",
+        "experienceLevel": rng.choice(["junior", "mid", "senior", "lead"]),
+        "yearsOfExperience": rng.randint(0, 15),
+        "preferredRoles": rng.sample(ROLES, min(2, len(ROLES))),
+        "preferredIndustries": rng.sample(INDUSTRIES, 2),
+        "workStyle": rng.choice(["remote", "hybrid", "onsite", "flexible"]),
+        "salaryExpectation": rng.randrange(80000, 220000, 5000),
+        "resumeText": " ".join(rng.choice(_WORDS) for _ in range(200)),
+        "resumeFileName": "resume.pdf",
+        "extractedSkills": rng.sample(SKILLS, 5),
+    }
+
+
+_FIRST_NAMES = ["Jane", "Alex", "Priya", "Tom", "Mei", "Lucas", "Amara", "Noah", "Sofia", "Ravi"]
+_LAST_NAMES = ["Doe", "Nguyen", "Patel", "Smith", "Chen", "Garcia", "Okafor", "Brown", "Rossi", "Kim"]
+
+
+def make_resume(rng: random.Random, index: int, pages: int = 2) -> List[str]:
+    """Resume text lines: name, contact details, then roles with bullet points"""
+    first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+    handle = f"{first.lower()}-{last.lower()}-{index}"
+    lines = [f"{first} {last}", rng.choice(ROLES),
+             f"{handle}@example.com | +61 4{rng.randint(10000000, 99999999)} | linkedin.com/in/{handle}",
+             "Skills: " + ", ".join(rng.sample(SKILLS, 6))]
+    for _ in range(pages * 6):
+        lines.append(f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} ({rng.randint(2012, 2025)})")
+        lines.extend(" ".join(rng.choice(_WORDS) for _ in range(14)).capitalize() + "." for _ in range(5))
+    return lines
+
+
+def resume_pdf(lines: List[str], lines_per_page: int = 48) -> bytes:
+    """Minimal PDF with one Flate-compressed text stream per page"""
+    objects = []
+    for start in range(0, len(lines), lines_per_page):
+        shown = []
+        for line in lines[start:start + lines_per_page]:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            shown.append(f"({escaped}) Tj 0 -14 Td")
+        content = zlib.compress(("BT /F1 10 Tf 56 780 Td " + " ".join(shown) + " ET").encode("latin-1", "replace"))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream")
+    out = [b"%PDF-1.4\n"]
+    for number, body in enumerate(objects, 1):
+        out.append(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    out.append(b"%%EOF\n")
+    return b"".join(out)
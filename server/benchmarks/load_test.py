@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Load test for the JobHunt AI API servers
+
+Starts api.py (or user_api.py) under uvicorn against a temporary database,
+seeds users, profiles, saved jobs and applications, drives a weighted mix of
+realistic requests from concurrent keep-alive clients and prints throughput
+and latency percentiles as JSON.
+
+    python server/benchmarks/load_test.py run --users 1000 --duration 30 --output before.json
+    python server/benchmarks/load_test.py run --target user_api --concurrency 8
+    python server/benchmarks/load_test.py compare before.json after.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+SERVER_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(SERVER_DIR))
+
+from generators import APPLICATION_STATUSES, generate_jobs, make_profile
+
+BENCH_PASSWORD = "benchmark-password"
+BENCH_JWT_SECRET = "benchmark-jwt-secret"
+
+DEFAULT_MIX = {
+    "api": "login=4,register=1,profile_read=20,profile_update=5,save_job=10,"
+           "list_saved=25,create_application=5,list_applications=30",
+    "user_api": "login=10,register=2,profile_read=60,profile_update=28",
+}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def percentiles(samples: List[float]) -> dict:
+    """Latency summary in milliseconds (nearest-rank percentiles)"""
+    if not samples:
+        return {"p50": None, "p90": None, "p99": None, "max": None, "mean": None}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "p50": round(pick(0.50) * 1000, 3),
+        "p90": round(pick(0.90) * 1000, 3),
+        "p99": round(pick(0.99) * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+# Seeding
+def seed_api(workdir: Path, args) -> List[dict]:
+    """Seed the database used by api.py, return [{user_id, email, token}]"""
+    os.environ["JOBHUNT_DB_PATH"] = str(workdir / "jobhunt.db")
+    if args.database_url:
+        os.environ["JOBHUNT_DATABASE_URL"] = args.database_url
+    os.environ["JWT_SECRET"] = BENCH_JWT_SECRET
+    from api import create_jwt, hash_password
+    from models import db
+
+    rng = random.Random(args.seed)
+    jobs = list(generate_jobs(args.jobs, seed=args.seed))
+    password_hash = hash_password(BENCH_PASSWORD)
+    now = datetime.now().isoformat()
+    users, profiles, saved, apps = [], [], [], []
+    accounts = []
+    for i in range(args.users):
+        user_id = f"bench{i:08d}"
+        email = f"user{i}@bench.example.com"
+        p = make_profile(rng, f"Bench User {i}", email)
+        users.append((user_id, email, password_hash, now))
+        profiles.append((
+            user_id, p["fullName"], p["email"], p["phone"], p["location"], p["linkedinUrl"], "", "", "",
+            p["experienceLevel"], p["yearsOfExperience"], json.dumps(p["preferredRoles"]),
+            json.dumps(p["preferredIndustries"]), p["workStyle"], p["salaryExpectation"],
+            p["resumeText"], p["resumeFileName"], json.dumps(p["extractedSkills"]), now, now,
+        ))
+        for job in rng.sample(jobs, min(args.saved_per_user, len(jobs))):
+            saved.append((user_id, job["id"], json.dumps(job), "", now))
+        for job in rng.sample(jobs, min(args.apps_per_user, len(jobs))):
+            apps.append((user_id, job["id"], job["company"], job["role"], "Dear hiring team, ...", "",
+                         rng.choice(APPLICATION_STATUSES), now, now))
+        accounts.append({"user_id": user_id, "email": email, "token": create_jwt(user_id)})
+
+    conn = db.get_conn()
+    conn.executemany("INSERT INTO users (id, email, password_hash, created_at) VALUES (?, ?, ?, ?)", users)
+    conn.executemany(
+        """INSERT INTO profiles (user_id, full_name, email, phone, location, linkedin_url, github_url,
+        portfolio_url, twitter_url, experience_level, years_of_experience, preferred_roles,
+        preferred_industries, work_style, salary_expectation, resume_text, resume_file_name,
+        extracted_skills, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", profiles)
+    conn.executemany(
+        "INSERT INTO saved_jobs (user_id, job_id, job_data, notes, created_at) VALUES (?, ?, ?, ?, ?)", saved)
+    conn.executemany(
+        """INSERT INTO applications (user_id, job_id, company, role, cover_letter, email_sent, status,
+        created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""", apps)
+    conn.commit()
+    conn.close()
+    return accounts
+
+
+def seed_user_api(workdir: Path, args) -> List[dict]:
+    """Seed users.json and profile files used by user_api.py"""
+    os.environ["JOBHUNT_DATA_DIR"] = str(workdir)
+    from user_api import hash_password, save_user_profile, save_users
+
+    rng = random.Random(args.seed)
+    password_hash = hash_password(BENCH_PASSWORD)
+    now = datetime.now().isoformat()
+    users, accounts = {}, []
+    for i in range(args.users):
+        user_id = f"bench{i:08d}"
+        email = f"user{i}@bench.example.com"
+        users[email] = {"id": user_id, "email": email, "passwordHash": password_hash,
+                        "createdAt": now, "lastLogin": now}
+        profile = make_profile(rng, f"Bench User {i}", email)
+        profile.update({"id": user_id, "createdAt": now, "updatedAt": now})
+        save_user_profile(user_id, profile)
+        accounts.append({"user_id": user_id, "email": email, "token": None})
+    save_users(users)
+    return accounts
+
+
+# Server process
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(target: str, port: int, workers: int, env: dict) -> subprocess.Popen:
+    # Every client comes from 127.0.0.1, which the per-IP rate limit would throttle;
+    # admission control stays off unless the caller turns it on (bench_admission.py)
+    env = dict(env)
+    env.setdefault("JOBHUNT_ADMISSION", "0")
+    cmd = [sys.executable, "-m", "uvicorn", f"{target}:app", "--host", "127.0.0.1",
+           "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    proc = subprocess.Popen(cmd, cwd=SERVER_DIR, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{target} exited with code {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{target} did not become healthy on port {port}")
+
+
+# Workload
+class Client:
+    """One keep-alive connection issuing weighted random operations"""
+
+    def __init__(self, target: str, port: int, accounts: List[dict], jobs: List[dict],
+                 mix: Dict[str, float], seed: int, client_id: int):
+        self.target = target
+        self.port = port
+        self.accounts = accounts
+        self.jobs = jobs
+        self.rng = random.Random(seed * 1000 + client_id)
+        self.client_id = client_id
+        self.registered = 0
+        self.ops = list(mix)
+        self.weights = [mix[op] for op in self.ops]
+        self.latencies: Dict[str, List[float]] = {op: [] for op in self.ops}
+        self.errors: Dict[str, int] = {op: 0 for op in self.ops}
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+
+    def request(self, method: str, path: str, body=None, token=None) -> int:
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+            return 599
+
+    def new_email(self) -> str:
+        self.registered += 1
+        return f"new-{self.client_id}-{self.registered}-{self.rng.random():.8f}@bench.example.com"
+
+    def run_op(self, op: str) -> int:
+        account = self.rng.choice(self.accounts)
+        token = account["token"]
+        if self.target == "user_api":
+            uid = account["user_id"]
+            if op == "login":
+                return self.request("POST", "/api/auth/login", {"email": account["email"], "password": BENCH_PASSWORD})
+            if op == "register":
+                email = self.new_email()
+                return self.request("POST", "/api/auth/register", {
+                    "email": email, "password": BENCH_PASSWORD,
+                    "profile": make_profile(self.rng, "New User", email)})
+            if op == "profile_read":
+                return self.request("GET", f"/api/profile/{uid}")
+            if op == "profile_update":
+                return self.request("POST", f"/api/profile/{uid}", make_profile(self.rng, "Updated", account["email"]))
+        else:
+            if op == "login":
+                return self.request("POST", "/api/auth/login", {"email": account["email"], "password": BENCH_PASSWORD})
+            if op == "register":
+                return self.request("POST", "/api/auth/register", {
+                    "email": self.new_email(), "password": BENCH_PASSWORD, "full_name": "New User"})
+            if op == "profile_read":
+                return self.request("GET", "/api/profile", token=token)
+            if op == "profile_update":
+                return self.request("PUT", "/api/profile", make_profile(self.rng, "Updated", account["email"]), token)
+            if op == "save_job":
+                job = self.rng.choice(self.jobs)
+                return self.request("POST", "/api/jobs/save", {"job_id": job["id"], "job_data": job}, token)
+            if op == "list_saved":
+                return self.request("GET", "/api/jobs/saved", token=token)
+            if op == "create_application":
+                job = self.rng.choice(self.jobs)
+                return self.request("POST", "/api/applications", {
+                    "job_id": job["id"], "company": job["company"], "role": job["role"],
+                    "cover_letter": "Dear hiring team, ..."}, token)
+            if op == "list_applications":
+                return self.request("GET", "/api/applications", token=token)
+        raise ValueError(f"Unknown operation {op!r} for {self.target}")
+
+    def run(self, deadline: float, warmup_until: float):
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            op = self.rng.choices(self.ops, self.weights)[0]
+            start = time.perf_counter()
+            status = self.run_op(op)
+            elapsed = time.perf_counter() - start
+            if start < warmup_until:
+                continue
+            self.latencies[op].append(elapsed)
+            if status >= 400:
+                self.errors[op] += 1
+        self.conn.close()
+
+
+def run_benchmark(args) -> dict:
+    mix = parse_mix(args.mix or DEFAULT_MIX[args.target])
+    with tempfile.TemporaryDirectory(prefix="jobhunt-bench-") as tmp:
+        workdir = Path(tmp)
+        seed_start = time.perf_counter()
+        accounts = seed_api(workdir, args) if args.target == "api" else seed_user_api(workdir, args)
+        seed_seconds = time.perf_counter() - seed_start
+        jobs = list(generate_jobs(args.jobs, seed=args.seed))
+
+        env = dict(os.environ)
+        env.setdefault("JOBHUNT_RATE_IP", "0")  # every client shares 127.0.0.1
+        port = args.port or free_port()
+        proc = start_server(args.target, port, args.workers, env)
+        try:
+            clients = [Client(args.target, port, accounts, jobs, mix, args.seed, i)
+                       for i in range(args.concurrency)]
+            start = time.perf_counter()
+            warmup_until = start + args.warmup
+            deadline = warmup_until + args.duration
+            threads = [threading.Thread(target=c.run, args=(deadline, warmup_until)) for c in clients]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            measured = time.perf_counter() - warmup_until
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    operations = {}
+    all_samples = []
+    for op in mix:
+        samples = [s for c in clients for s in c.latencies[op]]
+        all_samples.extend(samples)
+        operations[op] = {
+            "count": len(samples),
+            "errors": sum(c.errors[op] for c in clients),
+            "rps": round(len(samples) / measured, 2),
+            "latency_ms": percentiles(samples),
+        }
+    return {
+        "benchmark": "load_test",
+        "target": args.target,
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "users": args.users, "saved_per_user": args.saved_per_user, "apps_per_user": args.apps_per_user,
+            "jobs": args.jobs, "concurrency": args.concurrency, "workers": args.workers,
+            "storage": "postgres" if args.database_url else "sqlite",
+            "duration_s": args.duration, "warmup_s": args.warmup, "seed": args.seed, "mix": mix,
+        },
+        "seed_seconds": round(seed_seconds, 3),
+        "total_requests": len(all_samples),
+        "errors": sum(o["errors"] for o in operations.values()),
+        "throughput_rps": round(len(all_samples) / measured, 2),
+        "latency_ms": percentiles(all_samples),
+        "operations": operations,
+    }
+
+
+def compare(args) -> int:
+    """Print per-operation deltas between two result files; non-zero exit on regression"""
+    with open(args.baseline) as f:
+        old = json.load(f)
+    with open(args.candidate) as f:
+        new = json.load(f)
+    regressions = 0
+    print(f"{'operation':<20} {'rps':>18} {'p50 ms':>20} {'p99 ms':>20}")
+
+    def row(name, a, b):
+        nonlocal regressions
+        cells = []
+        for key, higher_is_better in (("rps", True), ("p50", False), ("p99", False)):
+            va = a["rps"] if key == "rps" else a["latency_ms"][key]
+            vb = b["rps"] if key == "rps" else b["latency_ms"][key]
+            if not va or vb is None:
+                cells.append(f"{'-':>20}")
+                continue
+            change = (vb - va) / va * 100
+            worse = change < -args.tolerance if higher_is_better else change > args.tolerance
+            regressions += worse
+            cells.append(f"{vb:>9.1f} ({change:+6.1f}%){'!' if worse else ' '}")
+        print(f"{name:<20} " + " ".join(cells))
+
+    row("overall", {"rps": old["throughput_rps"], "latency_ms": old["latency_ms"]},
+        {"rps": new["throughput_rps"], "latency_ms": new["latency_ms"]})
+    for op, stats in new["operations"].items():
+        if op in old["operations"]:
+            row(op, old["operations"][op], stats)
+    print(f"\n{old.get('commit') or '?'} -> {new.get('commit') or '?'}: "
+          f"{regressions} metric(s) regressed by more than {args.tolerance}%")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JobHunt AI API load test")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Seed a temporary database and drive a mixed workload")
+    run.add_argument("--target", choices=["api", "user_api"], default="api")
+    run.add_argument("--users", type=int, default=500)
+    run.add_argument("--saved-per-user", type=int, default=20)
+    run.add_argument("--apps-per-user", type=int, default=5)
+    run.add_argument("--jobs", type=int, default=2000, help="Size of the generated job pool")
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    run.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    run.add_argument("--warmup", type=float, default=3.0)
+    run.add_argument("--mix", help="Weighted operations, e.g. login=1,list_saved=5")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--port", type=int, default=0)
+    run.add_argument("--database-url", default="", help="Run api.py on an empty PostgreSQL database instead of SQLite")
+    run.add_argument("--output", help="Also write results to this file")
+
+    cmp_ = sub.add_parser("compare", help="Compare two result files")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("candidate")
+    cmp_.add_argument("--tolerance", type=float, default=10.0, help="Allowed change in percent")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        sys.exit(compare(args))
+
+    result = run_benchmark(args)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
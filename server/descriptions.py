@@ -0,0 +1,83 @@
+"""
+Job description normalisation
+Scraped descriptions (job_description_summary) are HTML, sometimes escaped
+a second time, and often cut off with "...". The browser used to run
+stripHtml on them every time a job was shown, and every list response
+carried the whole blob. This converts each description once, at ingest:
+
+- description_text: plain text. Script and style blocks are dropped,
+  block elements become line breaks, list items become "• " lines, the
+  other tags go, and entities are decoded. No markup is left, so clients
+  render it as text and never as HTML.
+- description_summary: one line, the first SUMMARY_CHARS characters cut
+  at a word boundary, with "…" when there was more.
+- description_words / description_chars: size of the text, e.g. for
+  reading time, without loading it.
+
+job_index snapshots and list responses carry the summary and sizes. The
+text is served by GET /api/jobs/{id}/description. The original HTML stays
+in job_description_summary, so rows can be converted again if this
+changes.
+"""
+
+import html
+import re
+from typing import Optional
+
+SUMMARY_CHARS = 200
+# GET /api/jobs/{id}/description; text only changes when the job is re-ingested, and the ETag says when
+CACHE_CONTROL = "public, max-age=3600"
+# A cut shorter than this at a word boundary is cut mid-word instead
+MIN_SUMMARY_CHARS = SUMMARY_CHARS * 3 // 4
+
+# Stored on the jobs table, in this order
+DESCRIPTION_COLUMNS = ["description_text", "description_summary", "description_words", "description_chars"]
+
+_ESCAPED_TAG = re.compile(r"&lt;/?[a-zA-Z][^&]*?&gt;")
+_HIDDEN = re.compile(r"<(script|style|head|template)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_LIST_ITEM = re.compile(r"<li\b[^>]*>", re.IGNORECASE)
+# Block elements; a closing </li> is left to the next item or the end of the list
+_BREAK = re.compile(r"</?(?:p|div|br|hr|h[1-6]|ul|ol|tr|table|section|article|header|footer|blockquote|pre)\b[^>]*>",
+                    re.IGNORECASE)
+_TAG = re.compile(r"<[^>]*>")
+_BULLET = re.compile(r"•\s*")
+
+
+def to_text(raw: Optional[str]) -> str:
+    """Plain text of an HTML (or escaped-HTML, or plain) description"""
+    if not raw:
+        return ""
+    if "<" not in raw and _ESCAPED_TAG.search(raw):
+        raw = html.unescape(raw)
+    raw = _HIDDEN.sub(" ", _COMMENT.sub(" ", raw))
+    raw = _BREAK.sub("\n", _LIST_ITEM.sub("\n•", raw))
+    text = _BULLET.sub("• ", html.unescape(_TAG.sub("", raw)))
+    # One line per block; one blank line where the source had several breaks in a row
+    lines, blank = [], False
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if not line:
+            blank = bool(lines)
+        else:
+            if blank:
+                lines.append("")
+                blank = False
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def summarise(text: str, limit: int = SUMMARY_CHARS) -> str:
+    """First line-free `limit` characters of text, ending on a whole word"""
+    flat = " ".join(text.replace("• ", "").split())
+    if len(flat) <= limit:
+        return flat
+    cut = flat.rfind(" ", 0, limit + 1)
+    cut = cut if cut >= MIN_SUMMARY_CHARS else limit
+    return flat[:cut].rstrip(" ,;:-–—.…") + "…"
+
+
+def description_columns(raw: Optional[str]) -> tuple:
+    """DESCRIPTION_COLUMNS values for a job's job_description_summary"""
+    text = to_text(raw)
+    return text, summarise(text), len(text.split()), len(text)
@@ -0,0 +1,291 @@
+"""
+Application document generator
+Server-side version of generateApplicationDocs (src/lib/applicationHelper.ts):
+one cover letter, three outreach emails and tips per job.
+
+Templates are compiled once at import into literal/field parts; a bad field
+name fails at start-up, not on a user's click. Drafts for a batch of jobs
+are rendered in one call. They are stored in generated_docs, keyed by
+(user, profile version, job id, template, hiring manager). Rendering the
+same key again returns the stored draft by id, and applications keep that
+id instead of a copy of the text. A profile edit bumps its version, so the
+next batch renders fresh drafts.
+"""
+
+import hashlib
+import json
+from string import Formatter
+from typing import Callable, Dict, List, Optional
+
+from metrics import record_cache
+from models import db as default_db
+
+MAX_BATCH = 100
+
+COVER_LETTER_TEMPLATES = {
+    "professional": ("Professional", """Dear Hiring Manager,
+
+I am writing to express my strong interest in the {role} position at {company}. With {experience} of experience in {user_title_lower}, I am excited about the opportunity to contribute to your team.
+
+Throughout my career, I have developed expertise in {skills_4}, and more. {why_fit}
+
+What draws me to {company} is {company_mission}. I am particularly impressed by your recent work and would love to contribute my skills in {skills_2_and} to help drive continued success.
+
+I would welcome the opportunity to discuss how my background in {user_title_lower} and passion for creating exceptional user experiences can benefit your team. Thank you for considering my application.
+
+Sincerely,
+{user_name}"""),
+    "enthusiastic": ("Enthusiastic", """Hi there!
+
+I'm thrilled to apply for the {role} role at {company}! As a {user_title_lower} with {experience}, I've been following {company}'s work for a while and have been consistently impressed by your innovative approach.
+
+{why_fit}
+
+My toolkit includes {skills_5}, and I'm always eager to learn new technologies and methodologies. What excites me most about this opportunity is {company_mission}.
+
+I'd love the chance to chat about how my passion for design and my experience with {skills_3} could contribute to your team's upcoming projects.
+
+Looking forward to hearing from you!
+
+Best,
+{user_name}"""),
+    "concise": ("Concise", """Dear Hiring Manager,
+
+I'm applying for the {role} position at {company}. With {experience} in {user_title_lower}, I bring expertise in {skills_3}.
+
+{why_fit}
+
+I'm drawn to {company} because of {company_mission}. I'm confident my skills in {first_skill} would add value to your team.
+
+I'd welcome an interview to discuss this opportunity further.
+
+Regards,
+{user_name}"""),
+}
+
+EMAIL_TEMPLATES = {
+    "initial": ("Application: {role} - {user_name}", """Dear {hiring_manager},
+
+I hope this email finds you well. I recently came across the {role} position at {company} and wanted to reach out directly to express my interest.
+
+With {experience} as a {user_title_lower}, I've developed strong skills in {skills_3}. {why_fit}
+
+I've attached my resume and portfolio for your review. I would love the opportunity to discuss how my background aligns with your team's needs.
+
+Thank you for your time and consideration.
+
+Best regards,
+{user_name}"""),
+    "followUp": ("Following up: {role} Application", """Dear {hiring_manager},
+
+I hope you're doing well. I wanted to follow up on my application for the {role} position at {company} that I submitted recently.
+
+I'm very excited about the opportunity to bring my experience in {skills_2_and} to your team. I understand you likely have many applications to review, but I wanted to reiterate my strong interest in this role.
+
+Please let me know if you need any additional information from me. I'd be happy to provide work samples, references, or anything else that might be helpful.
+
+Thank you again for your consideration.
+
+Best,
+{user_name}"""),
+    "linkedin": ("{role} at {company}", """Hi {hiring_manager_or_there},
+
+I came across the {role} opening at {company} and was immediately drawn to the opportunity. With {experience} in {user_title_lower}, I believe I could make a meaningful contribution to your team.
+
+My background includes:
+• {skills_bullets}
+
+{why_fit_short}...
+
+I'd love to connect and learn more about the role. Would you be open to a brief conversation?
+
+Thanks,
+{user_name}"""),
+}
+
+WHY_FIT = [
+    "I have extensive experience with {skills_2_and}, which aligns perfectly with the requirements outlined in your job description.",
+    "My background has given me hands-on experience with {skills_2_and}, skills that are directly transferable to this role.",
+    "I've successfully leveraged {skills_2_and} in previous roles to deliver exceptional results, and I'm eager to bring this expertise to {company}.",
+]
+
+COMPANY_MISSIONS = {
+    "figma": "your mission to make design accessible to all and your innovative approach to collaborative design tools",
+    "stripe": "your commitment to simplifying online payments and empowering businesses of all sizes",
+    "notion": "your vision of creating a connected workspace that brings together notes, docs, and wikis",
+    "linear": "your focus on building exceptional tools that help teams ship better products faster",
+    "vercel": "your dedication to making the web faster and more accessible for developers everywhere",
+    "anthropic": "your commitment to developing AI systems that are safe, beneficial, and understandable",
+    "airbnb": "your mission to create a world where anyone can belong anywhere",
+    "shopify": "your goal of making commerce better for everyone",
+    "duolingo": "your mission to make education free and accessible to everyone in the world",
+}
+
+TEMPLATE_FIELDS = {
+    "user_name", "user_title_lower", "company", "role", "experience", "why_fit", "why_fit_short",
+    "company_mission", "skills_2_and", "skills_3", "skills_4", "skills_5", "skills_bullets", "first_skill",
+    "hiring_manager", "hiring_manager_or_there",
+}
+
+
+def compile_template(text: str) -> Callable[[dict], str]:
+    """Split a {field} template into pieces once; rendering is one join (~2x str.format_map)"""
+    pieces: List[Optional[str]] = []  # literals, with None where a field goes
+    names: List[str] = []
+    for literal, field, spec, conversion in Formatter().parse(text):
+        if literal:
+            pieces.append(literal)
+        if field is not None:
+            if field not in TEMPLATE_FIELDS or spec or conversion:
+                raise ValueError(f"Unknown template field {{{field}}}")
+            pieces.append(None)
+            names.append(field)
+
+    def render(context: dict) -> str:
+        values = iter([context[name] for name in names])
+        return "".join([piece if piece is not None else next(values) for piece in pieces])
+
+    return render
+
+
+def _compile_all():
+    covers = {style: (name, compile_template(text)) for style, (name, text) in COVER_LETTER_TEMPLATES.items()}
+    emails = [(kind, compile_template(subject), compile_template(body))
+              for kind, (subject, body) in EMAIL_TEMPLATES.items()]
+    why_fit = [compile_template(text) for text in WHY_FIT]
+    return covers, emails, why_fit
+
+
+_COVERS, _EMAILS, _WHY_FIT = _compile_all()
+TEMPLATES = list(COVER_LETTER_TEMPLATES)
+
+
+def _title(profile: dict) -> str:
+    if profile.get("preferred_roles"):
+        return profile["preferred_roles"][0]
+    skills = [s.lower() for s in profile.get("extracted_skills") or []]
+    if any("product" in s for s in skills):
+        return "Product Designer"
+    if any("ux" in s for s in skills):
+        return "UX Designer"
+    return "Designer"
+
+
+def _experience(profile: dict) -> str:
+    years = profile.get("years_of_experience") or 0
+    if years == 0:
+        return "several years"
+    if years == 1:
+        return "1 year"
+    return f"{years}+ years"
+
+
+def _mission(job: dict) -> str:
+    company = job["company"].lower()
+    for name, mission in COMPANY_MISSIONS.items():
+        if name in company:
+            return mission
+    return f"your company's innovative approach and commitment to excellence in {job.get('industry') or 'the industry'}"
+
+
+def _matched_skills(job_skills: List[str], user_skills: List[str]) -> List[str]:
+    lowered = [u.lower() for u in user_skills]
+    return [s for s in job_skills if any(s.lower() in u or u in s.lower() for u in lowered)]
+
+
+def _tips(job: dict, profile: dict) -> List[str]:
+    user_skills = [u.lower() for u in profile.get("extracted_skills") or []]
+    missing = [s for s in job.get("skills") or [] if not any(s.lower() in u for u in user_skills)]
+    tips = []
+    if missing:
+        tips.append(f"💡 Consider highlighting any experience with {' or '.join(missing[:2])} if you've used similar tools.")
+    if job.get("remote_status") == "Remote":
+        tips.append("💡 For remote roles, emphasize your experience with async communication and self-directed work.")
+    if profile.get("portfolio_url"):
+        tips.append("💡 Include a link to relevant case studies in your portfolio that demonstrate similar work.")
+    tips.append(f"💡 Research {job['company']}'s recent product launches and mention one that genuinely interests you.")
+    tips.append("💡 Keep your cover letter under 400 words - hiring managers appreciate conciseness.")
+    return tips
+
+
+def profile_context(profile: dict, hiring_manager: str = "") -> dict:
+    """Fields that depend only on the profile; computed once per batch"""
+    skills = (profile.get("extracted_skills") or [])[:8]
+    title = _title(profile)
+    return {
+        "user_name": profile.get("full_name") or "",
+        "user_title_lower": title.lower(),
+        "experience": _experience(profile),
+        "skills_2_and": " and ".join(skills[:2]),
+        "skills_3": ", ".join(skills[:3]),
+        "skills_4": ", ".join(skills[:4]),
+        "skills_5": ", ".join(skills[:5]),
+        "skills_bullets": "\n• ".join(skills[:3]),
+        "first_skill": skills[0] if skills else "design",
+        "hiring_manager": hiring_manager or "Hiring Manager",
+        "hiring_manager_or_there": hiring_manager or "there",
+    }
+
+
+def render_docs(job: dict, profile: dict, template: str = "professional", base: Optional[dict] = None) -> dict:
+    """Cover letter, emails and tips for one job, in GeneratedApplication shape"""
+    context = dict(base if base is not None else profile_context(profile))
+    matched = _matched_skills(job.get("skills") or [], profile.get("extracted_skills") or [])
+    context.update(company=job["company"], role=job["role"], company_mission=_mission(job))
+    if matched:
+        # The browser picks a phrasing at random; a stable pick keeps drafts reproducible
+        variant = int(hashlib.md5(job["id"].encode()).hexdigest(), 16) % len(_WHY_FIT)
+        why_fit = _WHY_FIT[variant]({**context, "skills_2_and": " and ".join(matched[:2])})
+    else:
+        why_fit = f"My skills in {context['skills_2_and']} make me well-suited for this position."
+    context.update(why_fit=why_fit, why_fit_short=why_fit[:150])
+    name, cover = _COVERS.get(template, _COVERS["professional"])
+    return {
+        "coverLetter": {"text": cover(context), "templateName": name},
+        "emails": [{"type": kind, "subject": subject(context), "body": body(context)}
+                   for kind, subject, body in _EMAILS],
+        "tips": _tips(job, profile),
+    }
+
+
+def generate_docs(user_id: str, job_ids: List[str], template: str = "professional",
+                  hiring_manager: str = "", database=None) -> dict:
+    """
+    Drafts for a batch of jobs. Stored drafts for the current profile version
+    are returned as they are; only the rest are rendered, then saved in one
+    transaction. Raises LookupError without a profile.
+    """
+    database = database or default_db
+    profile = database.get_profile(user_id)
+    if profile is None:
+        raise LookupError("Create a profile before generating documents")
+    version = profile["updated_at"] or ""
+    job_ids = list(dict.fromkeys(job_ids))
+    stored = database.get_generated_docs(user_id, version, job_ids, template, hiring_manager)
+    missing = [job_id for job_id in job_ids if job_id not in stored]
+    for _ in stored:
+        record_cache("generated_docs", True)
+
+    rendered: Dict[str, dict] = {}
+    unknown: List[str] = []
+    if missing:
+        jobs = database.get_jobs(missing)
+        base = profile_context(profile, hiring_manager)
+        for job_id in missing:
+            record_cache("generated_docs", False)
+            job = jobs.get(job_id)
+            if job is None:
+                unknown.append(job_id)
+            else:
+                rendered[job_id] = render_docs(job, profile, template, base)
+        ids = database.add_generated_docs(user_id, version, template, hiring_manager,
+                                          [(job_id, json.dumps(doc)) for job_id, doc in rendered.items()])
+        for job_id, doc in rendered.items():
+            stored[job_id] = (ids[job_id], doc)
+
+    docs = []
+    for job_id in job_ids:
+        if job_id in stored:
+            doc_id, doc = stored[job_id]
+            docs.append({"job_id": job_id, "doc_id": doc_id, "cached": job_id not in rendered, **doc})
+    return {"docs": docs, "unknown_jobs": unknown, "profile_version": version}
@@ -0,0 +1,80 @@
+"""
+Streaming CSV / NDJSON export of a user's pipeline
+Rows come from Database.iter_* generators and are encoded a chunk at a time,
+so memory stays flat no matter how many rows a user has.
+"""
+
+import csv
+import io
+import json
+from typing import Iterable, Iterator, List
+
+# Same vocabulary as Job_Listings.csv, plus the pipeline fields stored per user
+SAVED_JOB_COLUMNS = [
+    "id", "company", "role", "role_type", "location", "remote_status", "salary_range",
+    "url", "date_posted", "source", "industry", "skills", "status", "notes", "saved_at",
+]
+APPLICATION_COLUMNS = [
+    "id", "job_id", "company", "role", "status", "applied_at", "notes", "created_at", "updated_at",
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",  # Starlette appends the charset for text/* types
+    "ndjson": "application/x-ndjson",
+}
+
+ROWS_PER_CHUNK = 500
+
+
+def saved_job_row(job: dict) -> dict:
+    """Flatten a saved job (job_data + saved_* fields) into export columns"""
+    row = {column: job.get(column, "") for column in SAVED_JOB_COLUMNS}
+    row["status"] = job.get("saved_status", "")
+    row["notes"] = job.get("saved_notes", "")
+    row["saved_at"] = job.get("saved_at", "")
+    if isinstance(row["skills"], list):
+        row["skills"] = ";".join(row["skills"])
+    return row
+
+
+def _csv_chunks(rows: Iterable[dict], columns: List[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= ROWS_PER_CHUNK:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows: Iterable[dict], columns: List[str]) -> Iterator[str]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({column: row.get(column) for column in columns}))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def encode_rows(rows: Iterable[dict], columns: List[str], fmt: str) -> Iterator[bytes]:
+    """Encode rows as CSV or NDJSON byte chunks of ROWS_PER_CHUNK rows"""
+    chunks = _csv_chunks(rows, columns) if fmt == "csv" else _ndjson_chunks(rows, columns)
+    for chunk in chunks:
+        yield chunk.encode("utf-8")
+
+
+def export_saved_jobs(db, user_id: str, fmt: str) -> Iterator[bytes]:
+    rows = (saved_job_row(job) for job in db.iter_saved_jobs(user_id, batch_size=ROWS_PER_CHUNK))
+    return encode_rows(rows, SAVED_JOB_COLUMNS, fmt)
+
+
+def export_applications(db, user_id: str, fmt: str) -> Iterator[bytes]:
+    return encode_rows(db.iter_applications(user_id, batch_size=ROWS_PER_CHUNK), APPLICATION_COLUMNS, fmt)
@@ -0,0 +1,175 @@
+"""
+Application funnel analytics
+Funnel counts and time-in-stage used to mean reading every application a
+user had. Instead, each status change updates per-user counters in the
+same transaction that moves the application (Database.create_application,
+Database.set_application_status), so /api/applications/stats reads one
+application_stats row per stage:
+
+- active: applications in the stage now. active_since is the sum of the
+  times (epoch seconds) they entered it, so the time they have spent
+  there so far is active * now - active_since.
+- exits / exit_seconds: stays in the stage that have ended, and their
+  total length.
+- reached: applications that ever got this far. Reaching a stage of
+  FUNNEL_STAGES counts every earlier one too, so a draft moved straight
+  to interview has also been sent and phone screened. Moving back never
+  un-counts anything. Each application keeps a bitmask of what it has
+  reached (applications.reached).
+
+Every change is also logged in application_events, and the counters can
+always be recomputed from applications plus application_events. check()
+does that and compares, and with repair=True rewrites the users that
+drifted (e.g. rows written with raw SQL). A check running alongside live
+status changes can flag a user spuriously; repairing one is still safe,
+since it recomputes under the write lock.
+
+    python funnel.py            # report drift
+    python funnel.py --repair   # and fix it
+"""
+
+import argparse
+import json
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+FUNNEL_STAGES = ("draft", "sent", "phone_screen", "interview", "offer")
+STAGES = FUNNEL_STAGES + ("rejected",)  # rejected can follow any stage
+STAGE_BITS = {status: 1 << i for i, status in enumerate(STAGES)}
+# applications.reached bits set on entering a status: it and every earlier funnel stage
+REACHED = {status: (2 << i) - 1 for i, status in enumerate(FUNNEL_STAGES)}
+REACHED["rejected"] = STAGE_BITS["rejected"] | STAGE_BITS["draft"]
+
+STATS_COLUMNS = ["user_id", "status", "active", "active_since", "reached", "exits", "exit_seconds"]
+COUNTERS = STATS_COLUMNS[2:]
+
+
+def epoch(timestamp: str) -> int:
+    """Whole epoch seconds of a stored ISO timestamp"""
+    return int(datetime.fromisoformat(timestamp).timestamp())
+
+
+def reached_mask(status: Optional[str]) -> int:
+    """applications.reached for an application found in status with no history (backfills)"""
+    return REACHED.get(status, STAGE_BITS["draft"])
+
+
+def transition(user_id: str, old_status: Optional[str], old_since: Optional[int], old_reached: int,
+               new_status: str, now: int) -> List[tuple]:
+    """
+    application_stats deltas (STATS_COLUMNS order) for one application
+    moving from old_status (None when just created) into new_status at now
+    """
+    deltas = defaultdict(lambda: [0, 0, 0, 0, 0])
+    if old_status is not None:
+        old = deltas[old_status]
+        old[0] -= 1
+        old[1] -= old_since
+        old[3] += 1
+        old[4] += max(0, now - old_since)
+    new = deltas[new_status]
+    new[0] += 1
+    new[1] += now
+    gained = (old_reached | reached_mask(new_status)) & ~old_reached
+    for status, bit in STAGE_BITS.items():
+        if gained & bit:
+            deltas[status][2] += 1
+    return [(user_id, status, *counters) for status, counters in deltas.items()]
+
+
+def summarise(rows: Iterable[tuple], now: Optional[float] = None) -> dict:
+    """/api/applications/stats payload from a user's application_stats rows"""
+    now = time.time() if now is None else now
+    stats = {row[1]: row[2:] for row in rows}
+    started = stats.get("draft", (0, 0, 0))[2]
+    stages, previous = [], None
+    for status in STAGES + tuple(sorted(set(stats) - set(STAGES))):
+        active, active_since, reached, exits, exit_seconds = stats.get(status, (0, 0, 0, 0, 0))
+        stays = active + exits
+        stage = {
+            "status": status,
+            "count": active,
+            "reached": reached,
+            "reached_rate": round(reached / started, 4) if started else None,
+            "step_rate": round(reached / previous, 4) if previous else None,
+            "avg_days_in_stage": (round((exit_seconds + active * now - active_since) / stays / 86400, 2)
+                                  if stays else None),
+        }
+        stages.append(stage)
+        previous = reached if status in FUNNEL_STAGES[:-1] else None
+    return {"total": started, "active": sum(stage["count"] for stage in stages), "stages": stages}
+
+
+def counters(states: Iterable[tuple], exit_totals: Iterable[tuple]) -> Dict[str, Dict[str, list]]:
+    """
+    Counters recomputed from (user_id, status, status_changed_at, reached)
+    application rows and (user_id, status, exits, exit_seconds) event
+    totals: user -> status -> COUNTERS
+    """
+    expected = defaultdict(lambda: defaultdict(lambda: [0, 0, 0, 0, 0]))
+    for user_id, status, changed_at, reached in states:
+        user = expected[user_id]
+        user[status][0] += 1
+        user[status][1] += epoch(changed_at)
+        for stage, bit in STAGE_BITS.items():
+            if reached & bit:
+                user[stage][2] += 1
+    for user_id, status, exits, exit_seconds in exit_totals:
+        user = expected[user_id][status]
+        user[3] += exits
+        user[4] += exit_seconds
+    return expected
+
+
+def _drift(expected: Dict[str, list], stored: Dict[str, list]) -> Dict[str, dict]:
+    drift = {}
+    for status in set(expected) | set(stored):
+        want, have = expected.get(status, [0] * 5), stored.get(status, [0] * 5)
+        if list(want) != list(have):
+            drift[status] = {column: [h, w] for column, h, w in zip(COUNTERS, have, want) if h != w}
+    return drift
+
+
+def check(db, repair: bool = False) -> dict:
+    """
+    Compare application_stats with counters recomputed from scratch.
+    Drifted users are listed with {status: {column: [stored, expected]}},
+    and rebuilt with repair=True.
+    """
+    start = time.perf_counter()
+    expected = counters(db.iter_application_states(), db.get_application_exit_totals())
+    stored = defaultdict(dict)
+    for user_id, status, *values in db.iter_application_stats():
+        stored[user_id][status] = values
+    drifted = {}
+    for user_id in set(expected) | set(stored):
+        drift = _drift(expected.get(user_id, {}), stored.get(user_id, {}))
+        if drift:
+            drifted[user_id] = drift
+    if repair:
+        for user_id in drifted:
+            db.rebuild_application_stats(user_id)
+    return {
+        "users": len(set(expected) | set(stored)),
+        "drifted": drifted,
+        "repaired": len(drifted) if repair else 0,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check application_stats against applications and their events")
+    parser.add_argument("--repair", action="store_true", help="Rebuild the counters of users that drifted")
+    args = parser.parse_args()
+
+    from models import db
+
+    report = check(db, args.repair)
+    print(json.dumps(report, indent=2))
+    raise SystemExit(1 if report["drifted"] and not args.repair else 0)
+
+
+if __name__ == "__main__":
+    main()
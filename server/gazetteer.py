@@ -0,0 +1,274 @@
+"""
+Location gazetteer
+Resolves free-text location strings ("Sydney, NSW", "Remote - US",
+"Cambridge, MA", "Hybrid (Auckland)") to a city, an ISO country code, a broad
+region (APAC, AMER, EMEA), a UTC offset in minutes and a remote flag. The
+offline tables below replace getRegionFromLocation/getTimezoneFromLocation
+(src/lib/utils.ts), which run substring checks on every scoring pass.
+
+Ingest and profile saves store the result as LOCATION_COLUMNS, so location
+filters and timezone overlap compare integers. Offsets are standard time
+(no daylight saving), which is enough to compare working hours. Resolved
+strings are memoised per process, since a catalogue repeats a few hundred
+distinct locations.
+"""
+
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from metrics import record_cache
+
+MEMO_SIZE = 50_000
+WORKDAY_MINUTES = 8 * 60
+
+# Stored on the jobs and profiles tables, in this order
+LOCATION_COLUMNS = [
+    "location_city", "location_country", "location_region", "location_utc_offset", "location_remote",
+]
+REGIONS = ("APAC", "AMER", "EMEA")
+
+# ISO code: (names, region, offset in minutes of the main business centre)
+COUNTRIES: Dict[str, Tuple[List[str], str, int]] = {
+    "AU": (["australia"], "APAC", 600),
+    "NZ": (["new zealand", "aotearoa"], "APAC", 720),
+    "SG": (["singapore"], "APAC", 480),
+    "JP": (["japan"], "APAC", 540),
+    "HK": (["hong kong"], "APAC", 480),
+    "KR": (["south korea", "korea"], "APAC", 540),
+    "TW": (["taiwan"], "APAC", 480),
+    "PH": (["philippines"], "APAC", 480),
+    "MY": (["malaysia"], "APAC", 480),
+    "ID": (["indonesia"], "APAC", 420),
+    "TH": (["thailand"], "APAC", 420),
+    "VN": (["vietnam", "viet nam"], "APAC", 420),
+    "IN": (["india"], "APAC", 330),
+    "CN": (["china"], "APAC", 480),
+    "US": (["united states", "united states of america", "america"], "AMER", -300),
+    "CA": (["canada"], "AMER", -300),
+    "MX": (["mexico"], "AMER", -360),
+    "BR": (["brazil", "brasil"], "AMER", -180),
+    "AR": (["argentina"], "AMER", -180),
+    "GB": (["united kingdom", "england", "scotland", "wales", "great britain", "britain"], "EMEA", 0),
+    "IE": (["ireland"], "EMEA", 0),
+    "DE": (["germany", "deutschland"], "EMEA", 60),
+    "FR": (["france"], "EMEA", 60),
+    "NL": (["netherlands", "the netherlands", "holland"], "EMEA", 60),
+    "ES": (["spain"], "EMEA", 60),
+    "PT": (["portugal"], "EMEA", 0),
+    "IT": (["italy"], "EMEA", 60),
+    "SE": (["sweden"], "EMEA", 60),
+    "DK": (["denmark"], "EMEA", 60),
+    "NO": (["norway"], "EMEA", 60),
+    "FI": (["finland"], "EMEA", 120),
+    "CH": (["switzerland"], "EMEA", 60),
+    "AT": (["austria"], "EMEA", 60),
+    "BE": (["belgium"], "EMEA", 60),
+    "PL": (["poland"], "EMEA", 60),
+    "IL": (["israel"], "EMEA", 120),
+    "AE": (["united arab emirates"], "EMEA", 240),
+    "ZA": (["south africa"], "EMEA", 120),
+}
+
+# City: (country, offset in minutes, other names)
+CITIES: Dict[str, Tuple[str, int, List[str]]] = {
+    "Sydney": ("AU", 600, []), "Melbourne": ("AU", 600, []), "Brisbane": ("AU", 600, []),
+    "Canberra": ("AU", 600, []), "Gold Coast": ("AU", 600, []), "Newcastle": ("AU", 600, []),
+    "Hobart": ("AU", 600, []), "Adelaide": ("AU", 570, []), "Darwin": ("AU", 570, []),
+    "Perth": ("AU", 480, []),
+    "Auckland": ("NZ", 720, []), "Wellington": ("NZ", 720, []), "Christchurch": ("NZ", 720, []),
+    "Singapore": ("SG", 480, []), "Hong Kong": ("HK", 480, []),
+    "Tokyo": ("JP", 540, []), "Osaka": ("JP", 540, []), "Seoul": ("KR", 540, []),
+    "Taipei": ("TW", 480, []), "Manila": ("PH", 480, []), "Kuala Lumpur": ("MY", 480, []),
+    "Jakarta": ("ID", 420, []), "Bali": ("ID", 480, []), "Bangkok": ("TH", 420, []),
+    "Ho Chi Minh City": ("VN", 420, ["ho chi minh", "saigon"]), "Hanoi": ("VN", 420, []),
+    "Bengaluru": ("IN", 330, ["bangalore"]), "Mumbai": ("IN", 330, []), "Delhi": ("IN", 330, ["new delhi"]),
+    "Hyderabad": ("IN", 330, []), "Pune": ("IN", 330, []), "Chennai": ("IN", 330, []),
+    "Shanghai": ("CN", 480, []), "Beijing": ("CN", 480, []), "Shenzhen": ("CN", 480, []),
+    "San Francisco": ("US", -480, ["sf bay area", "bay area", "silicon valley"]),
+    "Los Angeles": ("US", -480, []), "Seattle": ("US", -480, []), "San Jose": ("US", -480, []),
+    "San Diego": ("US", -480, []), "Portland": ("US", -480, []), "Palo Alto": ("US", -480, []),
+    "Mountain View": ("US", -480, []), "Menlo Park": ("US", -480, []), "Oakland": ("US", -480, []),
+    "Denver": ("US", -420, []), "Boulder": ("US", -420, []), "Phoenix": ("US", -420, []),
+    "Salt Lake City": ("US", -420, []),
+    "Chicago": ("US", -360, []), "Austin": ("US", -360, []), "Dallas": ("US", -360, []),
+    "Houston": ("US", -360, []), "Minneapolis": ("US", -360, []),
+    "New York": ("US", -300, ["new york city", "nyc", "brooklyn", "manhattan"]), "Boston": ("US", -300, []),
+    "Washington": ("US", -300, ["washington dc", "washington d.c."]), "Miami": ("US", -300, []),
+    "Atlanta": ("US", -300, []), "Philadelphia": ("US", -300, []), "Pittsburgh": ("US", -300, []),
+    "Raleigh": ("US", -300, []),
+    "Vancouver": ("CA", -480, []), "Calgary": ("CA", -420, []), "Toronto": ("CA", -300, []),
+    "Montreal": ("CA", -300, []), "Ottawa": ("CA", -300, []), "Waterloo": ("CA", -300, []),
+    "Mexico City": ("MX", -360, []), "Sao Paulo": ("BR", -180, []), "Buenos Aires": ("AR", -180, []),
+    "London": ("GB", 0, []), "Manchester": ("GB", 0, []), "Edinburgh": ("GB", 0, []),
+    "Cambridge": ("GB", 0, []), "Oxford": ("GB", 0, []), "Bristol": ("GB", 0, []),
+    "Dublin": ("IE", 0, []), "Lisbon": ("PT", 0, []),
+    "Berlin": ("DE", 60, []), "Munich": ("DE", 60, ["munchen"]), "Hamburg": ("DE", 60, []),
+    "Paris": ("FR", 60, []), "Amsterdam": ("NL", 60, []), "Rotterdam": ("NL", 60, []),
+    "Madrid": ("ES", 60, []), "Barcelona": ("ES", 60, []), "Milan": ("IT", 60, []),
+    "Stockholm": ("SE", 60, []), "Copenhagen": ("DK", 60, []), "Oslo": ("NO", 60, []),
+    "Helsinki": ("FI", 120, []), "Zurich": ("CH", 60, []), "Geneva": ("CH", 60, []),
+    "Vienna": ("AT", 60, []), "Brussels": ("BE", 60, []), "Warsaw": ("PL", 60, []),
+    "Tel Aviv": ("IL", 120, []), "Dubai": ("AE", 240, []), "Cape Town": ("ZA", 120, []),
+}
+
+# States and provinces: (country, offset); full names match anywhere, codes only as a whole part
+STATES: Dict[str, List[Tuple[str, int]]] = {
+    "new south wales": [("AU", 600)], "nsw": [("AU", 600)], "victoria": [("AU", 600)], "vic": [("AU", 600)],
+    "queensland": [("AU", 600)], "qld": [("AU", 600)], "act": [("AU", 600)], "tasmania": [("AU", 600)],
+    "tas": [("AU", 600)], "south australia": [("AU", 570)], "sa": [("AU", 570)],
+    "northern territory": [("AU", 570)], "nt": [("AU", 570)], "western australia": [("AU", 480)],
+    "wa": [("US", -480), ("AU", 480)], "washington state": [("US", -480)],
+    "california": [("US", -480)], "ca": [("US", -480)], "oregon": [("US", -480)], "or": [("US", -480)],
+    "colorado": [("US", -420)], "co": [("US", -420)], "arizona": [("US", -420)], "az": [("US", -420)],
+    "utah": [("US", -420)], "ut": [("US", -420)],
+    "texas": [("US", -360)], "tx": [("US", -360)], "illinois": [("US", -360)], "il": [("US", -360)],
+    "minnesota": [("US", -360)], "mn": [("US", -360)],
+    "ny": [("US", -300)], "massachusetts": [("US", -300)], "ma": [("US", -300)], "dc": [("US", -300)],
+    "florida": [("US", -300)], "fl": [("US", -300)], "georgia": [("US", -300)], "ga": [("US", -300)],
+    "pennsylvania": [("US", -300)], "pa": [("US", -300)], "new jersey": [("US", -300)], "nj": [("US", -300)],
+    "north carolina": [("US", -300)], "nc": [("US", -300)], "virginia": [("US", -300)], "va": [("US", -300)],
+    "ontario": [("CA", -300)], "on": [("CA", -300)], "quebec": [("CA", -300)], "qc": [("CA", -300)],
+    "british columbia": [("CA", -480)], "bc": [("CA", -480)], "alberta": [("CA", -420)], "ab": [("CA", -420)],
+}
+_STATE_CODES = {name for name in STATES if len(name) <= 3}
+
+# Matched only as a whole part ("Sydney, AU", "Remote (US)"), never inside other words
+COUNTRY_CODES = {
+    "au": "AU", "aus": "AU", "nz": "NZ", "sg": "SG", "hk": "HK", "jp": "JP", "kr": "KR", "in": "IN",
+    "us": "US", "usa": "US", "u.s.": "US", "u.s.a.": "US", "uk": "GB", "u.k.": "GB", "gb": "GB",
+    "uae": "AE", "de": "DE", "nl": "NL", "ie": "IE", "sf": "US",
+}
+# Unambiguous enough to match as a word inside a part too ("US-remote", "Remote AU")
+_WORD_CODES = {"au", "nz", "sg", "hk", "us", "usa", "u.s.", "uk", "u.k.", "uae"}
+_WORDS = re.compile(r"[\s-]+")
+REGION_NAMES = {
+    "apac": "APAC", "asia pacific": "APAC", "asia-pacific": "APAC", "asia": "APAC", "anz": "APAC",
+    "oceania": "APAC", "emea": "EMEA", "europe": "EMEA", "eu": "EMEA", "americas": "AMER",
+    "north america": "AMER", "latam": "AMER", "latin america": "AMER",
+}
+
+_REMOTE = re.compile(r"\b(remote|anywhere|worldwide|global|distributed|work from home|wfh)\b")
+_PARTS = re.compile(r"[,/|;()\[\]]| - | – | or |\s-\s?|\s?-\s")
+
+
+@dataclass(frozen=True)
+class Location:
+    city: str = ""
+    country: str = ""  # ISO 3166 alpha-2, the frontend's region codes
+    region: str = ""  # APAC, AMER or EMEA
+    utc_offset: Optional[int] = None  # minutes, standard time
+    remote: bool = False
+
+    def columns(self) -> tuple:
+        """Values in LOCATION_COLUMNS order"""
+        return (self.city, self.country, self.region, self.utc_offset, int(self.remote))
+
+
+def _fold(text: str) -> str:
+    """Lowercase without accents, so "Montréal" and "São Paulo" match"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _build_names():
+    names: Dict[str, List[tuple]] = {}
+    for city, (country, offset, others) in CITIES.items():
+        for name in [city.lower()] + others:
+            names.setdefault(name, []).append(("city", city, country, offset))
+    for country, (aliases, _, _) in COUNTRIES.items():
+        for name in aliases:
+            names.setdefault(name, []).append(("country", country))
+    for name, candidates in STATES.items():
+        if name not in _STATE_CODES:
+            names.setdefault(name, []).append(("state", candidates))
+    for name, region in REGION_NAMES.items():
+        names.setdefault(name, []).append(("region", region))
+    # Longest first, so "new york city" wins over "new york" and "york"
+    alternation = "|".join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+    return names, re.compile(rf"(?<![\w.])({alternation})(?![\w])")
+
+
+_NAMES, _NAME_PATTERN = _build_names()
+
+
+def _resolve(text: str) -> Location:
+    folded = _fold(text)
+    cities, states, countries, regions, weak = [], [], [], [], []
+    # Codes first: "Victoria, BC" is in Canada
+    for part in _PARTS.split(folded):
+        part = part.strip()
+        if part in COUNTRY_CODES:
+            countries.append(("country", COUNTRY_CODES[part]))
+        elif part in _STATE_CODES:
+            states.append(("state", STATES[part]))
+        else:
+            weak.extend(COUNTRY_CODES[word] for word in _WORDS.split(part) if word in _WORD_CODES)
+    for match in _NAME_PATTERN.finditer(folded):
+        for entry in _NAMES[match.group(1)]:
+            {"city": cities, "state": states, "country": countries, "region": regions}[entry[0]].append(entry)
+
+    named = [entry[1] for entry in countries]
+    state = None
+    for _, candidates in states:
+        # "Perth, WA" is Western Australia, "Seattle, WA" Washington
+        wanted = named or [city[2] for city in cities]
+        state = next((c for c in candidates if c[0] in wanted), None if named else candidates[0])
+        if state:
+            break
+    mentioned = named + [state[0]] if state else named
+    if not mentioned and not cities:
+        mentioned = weak  # "US-remote", but not "Join us in Sydney"
+    # "Cambridge, MA" is not Cambridge, England
+    city = next((c for c in cities if not mentioned or c[2] in mentioned + weak), None)
+    if city:
+        _, name, country, offset = city
+    else:
+        name, country = "", mentioned[0] if mentioned else ""
+        offset = state[1] if state and state[0] == country else None
+
+    region = ""
+    if country:
+        region = COUNTRIES[country][1]
+        if offset is None:
+            offset = COUNTRIES[country][2]
+    elif regions:
+        region = regions[0][1]
+    return Location(name, country, region, offset, bool(_REMOTE.search(folded)))
+
+
+_memo: Dict[str, Location] = {}
+_memo_lock = threading.Lock()
+
+
+def resolve_location(text: Optional[str]) -> Location:
+    """Gazetteer entry for a location string; unknown places resolve to an empty Location"""
+    text = (text or "").strip()
+    location = _memo.get(text)
+    record_cache("locations", location is not None)
+    if location is None:
+        location = _resolve(text)
+        with _memo_lock:
+            if len(_memo) >= MEMO_SIZE:
+                _memo.clear()
+            _memo[text] = location
+    return location
+
+
+def location_columns(text: Optional[str], remote_status: str = "") -> tuple:
+    """LOCATION_COLUMNS values for a job or profile; a Remote remote_status sets the remote flag"""
+    location = resolve_location(text)
+    if remote_status.strip().lower() == "remote" and not location.remote:
+        location = Location(location.city, location.country, location.region, location.utc_offset, True)
+    return location.columns()
+
+
+def working_hours_overlap(offset_a: Optional[int], offset_b: Optional[int]) -> Optional[int]:
+    """Minutes two 9-to-5 days overlap given UTC offsets in minutes; None if either is unknown"""
+    if offset_a is None or offset_b is None:
+        return None
+    difference = abs(offset_a - offset_b) % (24 * 60)
+    difference = min(difference, 24 * 60 - difference)
+    return max(0, WORKDAY_MINUTES - difference)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Streaming CSV importer for Job_Listings.csv, Dream_Companies.csv and search_config.csv
+
+Rows are read one at a time, validated and normalised, and upserted in
+batched transactions, so memory stays bounded for multi-GB files. Jobs a
+batch adds to the catalogue go to INGEST_HOOKS, as with ingest.py.
+
+    python importer.py jobs ../public/data/Job_Listings.csv
+    python importer.py companies ../public/data/Dream_Companies.csv --user-id <id>
+    python importer.py auto ../public/data/search_config.csv --user-id <id>
+"""
+
+import argparse
+import ast
+import csv
+import hashlib
+import io
+import json
+import logging
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Union
+
+from models import DREAM_COMPANY_COLUMNS, db as default_db
+from descriptions import description_columns
+from gazetteer import location_columns
+from salary import salary_columns
+from vectors import job_vector
+
+logger = logging.getLogger(__name__)
+
+IMPORT_KINDS = ("jobs", "companies", "search_config")
+DEFAULT_BATCH_SIZE = 1000
+MAX_SKIPPED_DETAILS = 100
+
+_QUOTED = re.compile(r"'([^']*)'")
+
+# Descriptions can be long; the csv module's 128KB default would reject them
+csv.field_size_limit(16 * 1024 * 1024)
+
+# Called as hook(jobs) with the postings each batch added to the catalogue (normalised
+# dicts, ingest.clean_job shape), whether from jobs.json (ingest.py) or a CSV import
+INGEST_HOOKS: List[Callable[[List[dict]], None]] = []
+
+
+def add_ingest_hook(hook: Callable[[List[dict]], None]):
+    """Register a callback run with every batch of newly ingested jobs"""
+    if hook not in INGEST_HOOKS:
+        INGEST_HOOKS.append(hook)
+
+
+def run_ingest_hooks(batch: List[dict], new_ids: List[str]):
+    """Pass the jobs of batch whose ids upsert_jobs reported as new to INGEST_HOOKS"""
+    new_ids = set(new_ids)
+    # A job repeated within the batch was upserted last as its last copy
+    jobs = list({job["id"]: job for job in batch if job["id"] in new_ids}.values())
+    if not jobs:
+        return
+    for hook in INGEST_HOOKS:
+        try:
+            hook(jobs)
+        except Exception:
+            # A broken consumer must not stop the catalogue from updating
+            logger.exception("Ingest hook %r failed", hook)
+
+
+@dataclass
+class ImportReport:
+    kind: str
+    rows_read: int = 0
+    imported: int = 0
+    new: int = 0  # jobs that were not in the catalogue before
+    skipped: int = 0
+    bytes_read: int = 0
+    seconds: float = 0.0
+    skipped_rows: List[dict] = field(default_factory=list)  # first MAX_SKIPPED_DETAILS only
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+    def skip(self, line: int, reason: str):
+        self.skipped += 1
+        if len(self.skipped_rows) < MAX_SKIPPED_DETAILS:
+            self.skipped_rows.append({"line": line, "reason": reason})
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "rows_read": self.rows_read,
+            "imported": self.imported,
+            "new": self.new,
+            "skipped": self.skipped,
+            "bytes_read": self.bytes_read,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "skipped_rows": self.skipped_rows,
+        }
+
+
+# Normalisation
+def _text(value: Optional[str]) -> str:
+    return (value or "").strip()
+
+
+def normalize_date(value: Optional[str]) -> str:
+    """YYYY-MM-DD from ISO dates/timestamps or DD/MM/YYYY; blank stays blank"""
+    value = _text(value)
+    if not value:
+        return ""
+    try:
+        return date.fromisoformat(value[:10]).isoformat()  # fast path for the common case
+    except ValueError:
+        pass
+    for fmt in ("%d/%m/%Y", "%Y/%m/%d"):
+        try:
+            return datetime.strptime(value[:10], fmt).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date {value!r}")
+
+
+def normalize_bool(value: Optional[str]) -> Optional[bool]:
+    value = _text(value).lower()
+    if value in ("true", "yes", "y", "1"):
+        return True
+    if value in ("false", "no", "n", "0"):
+        return False
+    return None
+
+
+def normalize_remote(value: Optional[str]) -> str:
+    """Map free-text work arrangements onto Remote / Hybrid / On-site"""
+    lowered = _text(value).lower()
+    if not lowered:
+        return ""
+    if "hybrid" in lowered or "flexible" in lowered:
+        return "Hybrid"
+    if "remote" in lowered:
+        return "Remote"
+    if "site" in lowered or "office" in lowered or "person" in lowered:
+        return "On-site"
+    return _text(value)
+
+
+def normalize_skills(value: Optional[str]) -> List[str]:
+    """Skills stored as a Python/JSON list literal ("['Design']") or ';'-separated"""
+    value = _text(value)
+    if not value:
+        return []
+    if value.startswith("["):
+        if '"' not in value and "\\" not in value:
+            # ['a', 'b'] without escapes: cheaper than ast.literal_eval per row
+            return [s.strip() for s in _QUOTED.findall(value) if s.strip()]
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            parsed = value.strip("[]").replace("'", "").split(",")
+        return [str(s).strip() for s in parsed if str(s).strip()]
+    return [s.strip() for s in value.replace(",", ";").split(";") if s.strip()]
+
+
+def normalize_url(value: Optional[str]) -> str:
+    value = _text(value)
+    if value and not value.startswith(("http://", "https://")):
+        raise ValueError(f"invalid url {value!r}")
+    return value
+
+
+def job_id_for(row: Dict[str, str]) -> str:
+    """Stable 12-hex id (same width as jobs.json ids) when the CSV has none"""
+    key = _text(row.get("url")) or "|".join(_text(row.get(k)) for k in ("company", "role", "location"))
+    return hashlib.md5(key.encode("utf-8")).hexdigest()[:12]
+
+
+def job_row(job: dict) -> tuple:
+    """
+    Normalised job dict (ingest.clean_job shape) -> tuple in models.JOB_COLUMNS
+    order, derived columns included. CSV imports and ingest both build rows
+    here, so the two can't disagree on the columns.
+    """
+    return (
+        job["id"], job["company"], job["role"], job["role_type"], job["location"],
+        job["remote_status"], job["salary_range"], job["url"], job["date_posted"],
+        job["date_scraped"], job["source"], int(job["is_ghost_job"]), json.dumps(job["skills"]),
+        job["industry"], None if job["visa_sponsorship"] is None else int(job["visa_sponsorship"]),
+        job["job_description_summary"], job["updated_at"],
+    ) + salary_columns(job["salary_range"], job["location"]) + location_columns(job["location"], job["remote_status"]) \
+        + (job_vector(job),) + description_columns(job["job_description_summary"])
+
+
+def normalize_job(row: Dict[str, str], now: str) -> dict:
+    """Job dict in ingest.clean_job shape; job_row turns it into the stored row"""
+    company, role = _text(row.get("company")), _text(row.get("role"))
+    if not company or not role:
+        raise ValueError("company and role are required")
+    visa = normalize_bool(row.get("visa_sponsorship"))
+    return {
+        "id": _text(row.get("id")) or job_id_for(row),
+        "company": company,
+        "role": role,
+        "role_type": _text(row.get("role_type")) or "Full-time",
+        "location": _text(row.get("location")),
+        "remote_status": normalize_remote(row.get("remote_status")),
+        "salary_range": _text(row.get("salary_range")),
+        "url": normalize_url(row.get("url")),
+        "date_posted": normalize_date(row.get("date_posted") or row.get("date_found")),
+        "date_scraped": normalize_date(row.get("date_scraped")) or now[:10],
+        "source": _text(row.get("source")),
+        "is_ghost_job": bool(normalize_bool(row.get("is_ghost_job"))),
+        "skills": normalize_skills(row.get("skills")),
+        "industry": _text(row.get("industry")),
+        "visa_sponsorship": visa,
+        "job_description_summary": _text(row.get("job_description_summary")),
+        "updated_at": now,
+    }
+
+
+def normalize_company(row: Dict[str, str], now: str) -> tuple:
+    if not _text(row.get("company")):
+        raise ValueError("company is required")
+    values = []
+    for column in DREAM_COMPANY_COLUMNS:
+        if column == "careers_url":
+            values.append(normalize_url(row.get(column)))
+        elif column in ("date_added", "last_updated"):
+            values.append(normalize_date(row.get(column)) or now[:10])
+        else:
+            values.append(_text(row.get(column)))
+    return tuple(values)
+
+
+def normalize_config(row: Dict[str, str], now: str) -> tuple:
+    name = _text(row.get("field"))
+    if not name:
+        raise ValueError("field is required")
+    return (name, _text(row.get("value")))
+
+
+NORMALIZERS = {"jobs": normalize_job, "companies": normalize_company, "search_config": normalize_config}
+
+
+def detect_kind(fieldnames: List[str]) -> str:
+    names = {n.strip().lower() for n in fieldnames or []}
+    if {"field", "value"} <= names:
+        return "search_config"
+    if "careers_url" in names:
+        return "companies"
+    if {"company", "role"} <= names:
+        return "jobs"
+    raise ValueError(f"cannot detect import kind from header {sorted(names)}")
+
+
+# Import
+def _batches(reader: csv.DictReader, normalize, report: ImportReport, now: str,
+             batch_size: int) -> Iterator[List[tuple]]:
+    batch = []
+    for row in reader:
+        report.rows_read += 1
+        if None in row:  # more cells than header columns
+            report.skip(reader.line_num, "too many columns")
+            continue
+        try:
+            batch.append(normalize(row, now))
+        except ValueError as e:
+            report.skip(reader.line_num, str(e))
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_csv(source: Union[str, Path, BinaryIO], kind: str = "auto", user_id: Optional[str] = None,
+               batch_size: int = DEFAULT_BATCH_SIZE, progress: Optional[Callable[[ImportReport], None]] = None,
+               database=None, authorize: Optional[Callable[[str], bool]] = None) -> ImportReport:
+    """
+    Stream a CSV file (path or binary file object) into the database.
+    authorize(kind) is checked once the kind is known (after header detection)
+    and PermissionError raised if it returns False.
+    """
+    database = database or default_db
+    raw = open(source, "rb") if isinstance(source, (str, Path)) else source
+    start = time.perf_counter()
+    text = None
+    try:
+        text = io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+        reader = csv.DictReader(text)
+        if kind == "auto":
+            kind = detect_kind(reader.fieldnames)
+        if kind not in IMPORT_KINDS:
+            raise ValueError(f"unknown import kind {kind!r}")
+        if kind != "jobs" and not user_id:
+            raise ValueError(f"{kind} import needs a user id")
+        if authorize is not None and not authorize(kind):
+            raise PermissionError(kind)
+
+        report = ImportReport(kind=kind)
+        now = datetime.now().isoformat()
+        for batch in _batches(reader, NORMALIZERS[kind], report, now, batch_size):
+            if kind == "jobs":
+                new = database.upsert_jobs([job_row(job) for job in batch])
+                report.imported += len(batch)
+                report.new += len(new)
+                run_ingest_hooks(batch, new)
+            elif kind == "companies":
+                report.imported += database.upsert_dream_companies(user_id, batch)
+            else:
+                report.imported += database.upsert_search_config(user_id, batch)
+            report.bytes_read = raw.tell()
+            report.seconds = time.perf_counter() - start
+            if progress:
+                progress(report)
+        report.bytes_read = raw.tell()
+        report.seconds = time.perf_counter() - start
+        return report
+    finally:
+        if text is not None:
+            text.detach()  # leave a caller-supplied file open
+        if isinstance(source, (str, Path)):
+            raw.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a CSV into the JobHunt AI database")
+    parser.add_argument("kind", choices=("auto",) + IMPORT_KINDS)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--user-id", help="Owner for companies / search_config imports")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    total = args.path.stat().st_size
+
+    def show(report: ImportReport):
+        pct = report.bytes_read / total * 100 if total else 100
+        print(f"\r  {pct:5.1f}%  {report.rows_read:,} rows  {report.skipped:,} skipped  "
+              f"{report.rows_per_sec:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+    try:
+        report = import_csv(args.path, args.kind, args.user_id, args.batch_size,
+                            progress=None if args.quiet else show)
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
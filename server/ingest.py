@@ -0,0 +1,94 @@
+"""
+Job catalogue ingestion
+Loads scraped jobs (public/data/jobs.json shape) into the jobs table in
+batches and passes the new postings of each batch to INGEST_HOOKS
+(importer.py, shared with CSV imports) so derived data (alerts, indexes,
+...) can be maintained as postings arrive.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from importer import INGEST_HOOKS, add_ingest_hook, job_row, normalize_date, normalize_remote, normalize_url, \
+    run_ingest_hooks
+from models import db as default_db
+
+logger = logging.getLogger(__name__)
+
+JOBS_SOURCE = Path(os.getenv("JOBHUNT_JOBS_SOURCE", Path(__file__).parent.parent / "public" / "data" / "jobs.json"))
+INGEST_BATCH_SIZE = 500
+
+def clean_job(job: dict, now: str) -> dict:
+    """Clean a scraped job dict; raises ValueError if it can't be stored"""
+    company, role = (job.get("company") or "").strip(), (job.get("role") or "").strip()
+    if not job.get("id") or not company or not role:
+        raise ValueError("id, company and role are required")
+    skills = job.get("skills") or []
+    visa = job.get("visa_sponsorship")
+    return {
+        "id": str(job["id"]),
+        "company": company,
+        "role": role,
+        "role_type": job.get("role_type") or "Full-time",
+        "location": (job.get("location") or "").strip(),
+        "remote_status": normalize_remote(job.get("remote_status")),
+        "salary_range": (job.get("salary_range") or "").strip(),
+        "url": normalize_url(job.get("url")),
+        "date_posted": normalize_date(job.get("date_posted")),
+        "date_scraped": normalize_date(job.get("date_scraped")) or now[:10],
+        "source": job.get("source") or "",
+        "is_ghost_job": bool(job.get("is_ghost_job")),
+        "skills": [s for s in skills if isinstance(s, str)],
+        "industry": job.get("industry") or "",
+        "visa_sponsorship": None if visa is None else bool(visa),
+        "job_description_summary": job.get("job_description_summary") or "",
+        "updated_at": now,
+    }
+
+
+def ingest_jobs(jobs: Iterable[dict], total: Optional[int] = None,
+                progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                batch_size: int = INGEST_BATCH_SIZE, database=None) -> dict:
+    """Upsert jobs in batches; progress(done, total) is called after each batch"""
+    database = database or default_db
+    now = datetime.now().isoformat()
+    stats = {"read": 0, "ingested": 0, "new": 0, "skipped": 0}
+    batch: List[dict] = []
+
+    def flush():
+        new = database.upsert_jobs([job_row(job) for job in batch])
+        stats["ingested"] += len(batch)
+        stats["new"] += len(new)
+        run_ingest_hooks(batch, new)
+        if progress:
+            progress(stats["read"], total)
+
+    for raw in jobs:
+        stats["read"] += 1
+        try:
+            batch.append(clean_job(raw, now))
+        except (ValueError, TypeError, AttributeError):
+            stats["skipped"] += 1
+            continue
+        if len(batch) >= batch_size:
+            flush()
+            batch = []
+    if batch:
+        flush()
+    return stats
+
+
+def ingest_jobs_file(path: Path = JOBS_SOURCE, progress=None, database=None) -> dict:
+    """Ingest a scraper output file ({"jobs": [...], "last_scraped": ...})"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    jobs = data.get("jobs", []) if isinstance(data, dict) else data
+    stats = ingest_jobs(jobs, total=len(jobs), progress=progress, database=database)
+    stats["source"] = str(path)
+    if isinstance(data, dict):
+        stats["last_scraped"] = data.get("last_scraped")
+    return stats
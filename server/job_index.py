@@ -0,0 +1,559 @@
+"""
+Read-only job catalogue snapshot, shared by every API worker
+The ingesting process publishes the jobs table as one versioned binary
+file: fixed-width u32 columns, a deduplicated string table, and sorted
+postings lists per skill, company, remote status, country and region, plus
+parsed salaries (salary.py) with rows pre-sorted by annual AUD maximum,
+UTC offsets (gazetteer.py), description summaries and sizes
+(descriptions.py; the full text stays in the database) and text vectors
+(vectors.py). Workers mmap the
+current file read-only, so all of them share a single copy in the page
+cache, and a reload costs no copying or parsing. A new file is published by
+writing it in full and then swapping the CURRENT pointer with os.replace.
+Workers stat CURRENT at most once per CHECK_INTERVAL_SECONDS and switch to
+the new mapping; requests still holding the old one finish on it.
+
+Each database gets its own snapshot directory under INDEX_DIR, named after
+a hash of its identity (backend.identity()), so a server pointed at
+another database never serves the previous one's catalogue.
+
+Columns are in native byte order, so a snapshot is read on the machine that
+wrote it. Rows are ordered newest posting first.
+
+Text vectors are stored TF-IDF weighted and L2-normalised, as u8 weights
+(255 = 1.0), twice: per row, and as per-bucket postings in runs of equal
+weight, heaviest first. similar() reads the runs of every query bucket in
+order of what they add to a score (query weight x run weight), stops after
+SEARCH_BUDGET postings, then reranks the best candidates exactly against
+their per-row vectors.
+
+    python server/job_index.py        # publish a snapshot of the jobs table
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import accumulate, repeat
+from operator import mul
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models import db as default_db
+from vectors import DIMENSIONS, decode
+
+INDEX_DIR = Path(os.getenv("JOBHUNT_INDEX_DIR", Path(__file__).parent / "data" / "job_index"))
+CURRENT = "CURRENT"
+CHECK_INTERVAL_SECONDS = 1.0
+KEEP_SNAPSHOTS = 3
+# Publishes in this process swap CURRENT one at a time
+_publish_lock = threading.Lock()
+
+MAGIC = b"JHIX"
+FORMAT_VERSION = 5
+# magic, format, snapshot version, jobs, strings, terms
+HEADER = struct.Struct("<4sIQIII")
+SECTIONS = [
+    "string_offsets", "strings", "columns", "flags", "skill_offsets", "skill_ids",
+    "id_order", "term_offsets", "terms", "posting_offsets", "postings",
+    "salaries", "salary_annual", "salary_order", "utc_offsets", "description_sizes",
+    "vector_idf", "vector_offsets", "vector_buckets", "vector_weights",
+    "run_offsets", "run_ends", "run_weights", "impact_rows",
+]
+SECTION_TABLE = struct.Struct("<" + "QQ" * len(SECTIONS))
+
+STRING_FIELDS = [
+    "id", "company", "role", "role_type", "location", "remote_status", "salary_range", "url",
+    "date_posted", "date_scraped", "source", "industry", "description_summary", "updated_at",
+    "salary_currency", "salary_period", "location_city", "location_country", "location_region",
+]
+# u32 per row in the salary_annual section, 0 when the job states no salary
+ANNUAL_FIELDS = ["salary_min_aud", "salary_max_aud", "salary_min_usd", "salary_max_usd"]
+SORTS = ("date", "salary")
+# i32 per row in the utc_offsets section when the gazetteer has no offset
+NO_OFFSET = -(2 ** 31)
+# Country filter value for jobs whose location says remote (the frontend's REMOTE region)
+REMOTE_COUNTRY = "REMOTE"
+FLAGS = 3  # bytes per row: ghost job, visa sponsorship, remote location
+_FIELD = {name: i for i, name in enumerate(STRING_FIELDS)}
+_VISA = {None: 2, False: 0, True: 1}
+_VISA_VALUES = {0: False, 1: True, 2: None}
+# similar(): postings read per query, and candidates reranked (per result, at least)
+SEARCH_BUDGET = 128_000
+RERANK_FACTOR = 15
+MIN_RERANK = 3000
+
+
+def snapshot_dir(database=None, root: Path = INDEX_DIR) -> Path:
+    """Snapshot directory of a database: root/<hash of its identity>"""
+    identity = (database or default_db).backend.identity()
+    return root / hashlib.blake2b(identity.encode(), digest_size=8).hexdigest()
+
+
+def term(kind: str, value: str) -> bytes:
+    """Postings key, e.g. term("skill", "Figma") -> b"skill:figma" """
+    return f"{kind}:{value.strip().lower()}".encode()
+
+
+def job_terms(job: dict) -> List[bytes]:
+    terms = {term("skill", s) for s in job["skills"]}
+    terms.add(term("company", job["company"]))
+    if job["remote_status"]:
+        terms.add(term("remote", job["remote_status"]))
+    if job["location_country"]:
+        terms.add(term("country", job["location_country"]))
+    if job["location_region"]:
+        terms.add(term("region", job["location_region"]))
+    if job["location_remote"]:
+        terms.add(term("country", REMOTE_COUNTRY))
+    return sorted(terms)
+
+
+def _vector_sections(buckets: array, raw: bytearray, offsets: array) -> list:
+    """
+    idf, per-row weights, and postings in runs of one weight, heaviest
+    first per bucket, from every row's stored vectors (vectors.encode),
+    concatenated with row boundaries in offsets
+    """
+    count = len(offsets) - 1
+    df = Counter(buckets)
+    idf = array("f", [0.0]) * DIMENSIONS
+    for bucket, n in df.items():
+        idf[bucket] = math.log((1 + count) / (1 + n)) + 1
+    weights = bytearray(len(raw))
+    for row in range(count):
+        start, end = offsets[row], offsets[row + 1]
+        if start == end:
+            continue
+        weighted = [w * idf[b] for b, w in zip(buckets[start:end], raw[start:end])]
+        scale = 255 / math.sqrt(sum(w * w for w in weighted))
+        weights[start:end] = bytes([round(w * scale) or 1 for w in weighted])
+
+    # Counting sort on (bucket, 255 - weight); rows go in ascending, so newest first within a run.
+    # Each distinct key is a run of postings with one bucket and weight.
+    keys = array("I", (b << 8 | 255 - w for b, w in zip(buckets, weights)))
+    runs = sorted(Counter(keys).items())
+    run_ends = array("I", accumulate(n for _, n in runs))
+    run_weights = bytes(255 - (key & 255) for key, _ in runs)
+    runs_per_bucket = array("I", [0]) * DIMENSIONS
+    for key, _ in runs:
+        runs_per_bucket[key >> 8] += 1
+    run_offsets = array("I", accumulate(runs_per_bucket, initial=0))
+    position = dict(zip((key for key, _ in runs), accumulate((n for _, n in runs), initial=0)))
+    del runs
+    impact_rows = array("I", [0]) * len(keys)
+    for row in range(count):
+        for key in keys[offsets[row]:offsets[row + 1]]:
+            impact_rows[position[key]] = row
+            position[key] += 1
+    return [idf, offsets, buckets, weights, run_offsets, run_ends, run_weights, impact_rows]
+
+
+def write_snapshot(f, jobs: Iterable[dict], version: int):
+    """Serialise jobs (models.iter_jobs shape, newest first) into a snapshot, written to binary file f"""
+    strings: Dict[str, int] = {}
+    string_blob = bytearray()
+    string_offsets = array("I", [0])
+
+    def intern(value: str) -> int:
+        sid = strings.get(value)
+        if sid is None:
+            sid = strings[value] = len(string_offsets) - 1
+            string_blob.extend(value.encode())
+            string_offsets.append(len(string_blob))
+        return sid
+
+    columns = [array("I") for _ in STRING_FIELDS]
+    flags = bytearray()
+    skill_offsets, skill_ids = array("I", [0]), array("I")
+    postings: Dict[bytes, array] = {}
+    salaries, annual, utc_offsets = array("d"), array("I"), array("i")
+    description_sizes = array("I")
+    vector_offsets, vector_buckets, vector_raw = array("I", [0]), array("H"), bytearray()
+    ids = []
+    for row, job in enumerate(jobs):
+        for column, name in zip(columns, STRING_FIELDS):
+            column.append(intern(job[name] or ""))
+        flags += bytes((int(bool(job["is_ghost_job"])), _VISA[job["visa_sponsorship"]],
+                        int(bool(job["location_remote"]))))
+        skill_ids.extend(intern(s) for s in job["skills"])
+        skill_offsets.append(len(skill_ids))
+        for t in job_terms(job):
+            postings.setdefault(t, array("I")).append(row)
+        salaries.extend((job["salary_min"] or 0.0, job["salary_max"] or 0.0))
+        annual.extend(job[name] or 0 for name in ANNUAL_FIELDS)
+        utc_offsets.append(NO_OFFSET if job["location_utc_offset"] is None else job["location_utc_offset"])
+        description_sizes.extend((job["description_words"] or 0, job["description_chars"] or 0))
+        buckets, weights = decode(job.get("text_vector"))
+        vector_buckets.extend(buckets)
+        vector_raw += weights
+        vector_offsets.append(len(vector_buckets))
+        ids.append(job["id"].encode())
+    strings.clear()  # the blob and offsets are all that is written
+    count = len(ids)
+    id_order = array("I", sorted(range(count), key=ids.__getitem__))
+    # Highest annual AUD maximum first, newest first within a tie; no salary sorts last
+    salary_order = array("I", sorted(range(count), key=lambda row: (-annual[4 * row + 1], row)))
+
+    terms = sorted(postings)
+    term_blob, term_offsets = bytearray(), array("I", [0])
+    posting_offsets, posting_rows = array("I", [0]), array("I")
+    for t in terms:
+        term_blob += t
+        term_offsets.append(len(term_blob))
+        posting_rows.extend(postings[t])
+        posting_offsets.append(len(posting_rows))
+
+    # Written from the buffers as they are: a snapshot of a million jobs runs to a gigabyte or more
+    parts = [string_offsets, string_blob, b"".join(c.tobytes() for c in columns), flags,
+             skill_offsets, skill_ids, id_order, term_offsets, term_blob, posting_offsets, posting_rows,
+             salaries, annual, salary_order, utc_offsets, description_sizes]
+    parts += _vector_sections(vector_buckets, vector_raw, vector_offsets)
+    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, version, count, len(string_offsets) - 1, len(terms)))
+    f.write(bytes(SECTION_TABLE.size))
+    position, table = HEADER.size + SECTION_TABLE.size, []
+    for part in parts:
+        padding = -position % 8
+        f.write(bytes(padding))
+        size = memoryview(part).nbytes
+        table += [position + padding, size]
+        f.write(part)
+        position += padding + size
+    f.seek(HEADER.size)
+    f.write(SECTION_TABLE.pack(*table))
+
+
+class JobIndex:
+    """One mapped snapshot; every lookup reads straight from the mapping"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, fmt, self.version, self.count, self.string_count, self.term_count = HEADER.unpack_from(view)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} job index")
+        table = SECTION_TABLE.unpack_from(view, HEADER.size)
+        section = {name: view[table[2 * i]:table[2 * i] + table[2 * i + 1]] for i, name in enumerate(SECTIONS)}
+        self._string_offsets = section["string_offsets"].cast("I")
+        self._strings = section["strings"]
+        self._columns = section["columns"].cast("I")
+        self._flags = section["flags"]
+        self._skill_offsets = section["skill_offsets"].cast("I")
+        self._skill_ids = section["skill_ids"].cast("I")
+        self._id_order = section["id_order"].cast("I")
+        self._term_offsets = section["term_offsets"].cast("I")
+        self._terms = section["terms"]
+        self._posting_offsets = section["posting_offsets"].cast("I")
+        self._postings = section["postings"].cast("I")
+        self._salaries = section["salaries"].cast("d")
+        self._annual = section["salary_annual"].cast("I")
+        self._salary_order = section["salary_order"].cast("I")
+        self._utc_offsets = section["utc_offsets"].cast("i")
+        self._description_sizes = section["description_sizes"].cast("I")
+        self._idf = section["vector_idf"].cast("f")
+        self._vector_offsets = section["vector_offsets"].cast("I")
+        self._vector_buckets = section["vector_buckets"].cast("H")
+        self._vector_weights = section["vector_weights"]
+        self._run_offsets = section["run_offsets"].cast("I")
+        self._run_ends = section["run_ends"].cast("I")
+        self._run_weights = section["run_weights"]
+        self._impact_rows = section["impact_rows"].cast("I")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _string(self, sid: int) -> str:
+        return str(self._strings[self._string_offsets[sid]:self._string_offsets[sid + 1]], "utf-8")
+
+    def field(self, row: int, name: str) -> str:
+        return self._string(self._columns[_FIELD[name] * self.count + row])
+
+    def job(self, row: int) -> dict:
+        """Row as a jobs.json-shaped dict"""
+        job = {name: self._string(self._columns[i * self.count + row]) for i, name in enumerate(STRING_FIELDS)}
+        job["is_ghost_job"] = bool(self._flags[FLAGS * row])
+        job["visa_sponsorship"] = _VISA_VALUES[self._flags[FLAGS * row + 1]]
+        job["location_remote"] = bool(self._flags[FLAGS * row + 2])
+        utc_offset = self._utc_offsets[row]
+        job["location_utc_offset"] = None if utc_offset == NO_OFFSET else utc_offset
+        job["description_words"] = self._description_sizes[2 * row]
+        job["description_chars"] = self._description_sizes[2 * row + 1]
+        job["skills"] = [self._string(sid) for sid in
+                         self._skill_ids[self._skill_offsets[row]:self._skill_offsets[row + 1]]]
+        stated = bool(self._annual[4 * row + 1])
+        job["salary_min"] = self._salaries[2 * row] if stated else None
+        job["salary_max"] = self._salaries[2 * row + 1] if stated else None
+        for i, name in enumerate(ANNUAL_FIELDS):
+            job[name] = self._annual[4 * row + i] if stated else None
+        return job
+
+    def find(self, job_id: str) -> Optional[int]:
+        """Row of a job id, by binary search over the id-sorted row order"""
+        key, id_column = job_id.encode(), _FIELD["id"] * self.count
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            sid = self._columns[id_column + self._id_order[mid]]
+            if bytes(self._strings[self._string_offsets[sid]:self._string_offsets[sid + 1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.field(self._id_order[lo], "id") == job_id:
+            return self._id_order[lo]
+        return None
+
+    def postings(self, key: bytes) -> memoryview:
+        """Rows carrying a term, ascending (i.e. newest first); empty if the term is unknown"""
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(self._terms[self._term_offsets[mid]:self._term_offsets[mid + 1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.term_count and bytes(self._terms[self._term_offsets[lo]:self._term_offsets[lo + 1]]) == key:
+            return self._postings[self._posting_offsets[lo]:self._posting_offsets[lo + 1]]
+        return self._postings[0:0]
+
+    def _max_aud(self, row: int) -> int:
+        return self._annual[4 * row + 1]
+
+    def _any_of(self, keys: List[bytes]):
+        """Rows carrying at least one of the terms, ascending"""
+        if len(keys) == 1:
+            return self.postings(keys[0])
+        return sorted(set().union(*(self.postings(k) for k in keys)))
+
+    def search(self, skills: List[str] = (), company: Optional[str] = None,
+               remote_status: Optional[str] = None, offset: int = 0, limit: int = 50,
+               min_salary: Optional[int] = None, max_salary: Optional[int] = None,
+               sort: str = "date", countries: List[str] = (), regions: List[str] = (),
+               min_utc_offset: Optional[int] = None,
+               max_utc_offset: Optional[int] = None) -> Tuple[int, List[dict]]:
+        """
+        (total matches, one page of jobs) for jobs having every given term,
+        and any one of the given countries (REMOTE_COUNTRY for remote
+        locations) and regions.
+        min_salary/max_salary are annual AUD; a job matches when its range
+        overlaps them, and jobs without a salary never match a salary filter.
+        min_utc_offset/max_utc_offset are minutes; as in the frontend's
+        timezone filter, remote locations always match.
+        sort="salary" orders by annual AUD maximum, jobs without one last.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {', '.join(SORTS)}")
+        keys = [[term("skill", s)] for s in skills]
+        if company:
+            keys.append([term("company", company)])
+        if remote_status:
+            keys.append([term("remote", remote_status)])
+        if countries:
+            keys.append([term("country", c) for c in countries])
+        if regions:
+            keys.append([term("region", r) for r in regions])
+        salary_filter = min_salary is not None or max_salary is not None
+        by_salary = False
+        if not keys:
+            if salary_filter:
+                # Rows with a maximum of at least min_salary are a prefix of salary_order
+                floor = max(min_salary or 0, 1)
+                end = bisect_right(self._salary_order, -floor, key=lambda row: -self._max_aud(row))
+                rows = self._salary_order[:end]
+                by_salary = True
+            elif sort == "salary":
+                rows, by_salary = self._salary_order, True
+            else:
+                rows = range(self.count)
+        else:
+            lists = sorted((self._any_of(k) for k in keys), key=len)
+            smallest, others = lists[0], lists[1:]
+
+            def in_all(row):
+                for other in others:
+                    i = bisect_left(other, row)
+                    if i == len(other) or other[i] != row:
+                        return False
+                return True
+
+            rows = [row for row in smallest if in_all(row)] if others else smallest
+        annual = self._annual
+        if salary_filter and keys:
+            floor = max(min_salary or 0, 1)
+            rows = [row for row in rows if annual[4 * row + 1] >= floor
+                    and (max_salary is None or annual[4 * row] <= max_salary)]
+        elif max_salary is not None:
+            rows = [row for row in rows if annual[4 * row] <= max_salary]
+        if min_utc_offset is not None or max_utc_offset is not None:
+            low = NO_OFFSET + 1 if min_utc_offset is None else min_utc_offset
+            high = 2 ** 31 - 1 if max_utc_offset is None else max_utc_offset
+            offsets, flags = self._utc_offsets, self._flags
+            rows = [row for row in rows if flags[FLAGS * row + 2] or low <= offsets[row] <= high]
+        if sort == "salary" and not by_salary:
+            rows = sorted(rows, key=lambda row: (-self._max_aud(row), row))
+        elif sort == "date" and by_salary:
+            rows = sorted(rows)
+        return len(rows), [self.job(row) for row in rows[offset:offset + limit]]
+
+    def similar(self, vector: bytes, k: int = 20, budget: Optional[int] = SEARCH_BUDGET) -> List[Tuple[int, float]]:
+        """
+        (row, cosine similarity) of the k jobs nearest a stored vector
+        (vectors.encode), most similar first. budget=None reads every posting
+        of every query bucket: exact, and the baseline for the approximate
+        default.
+        """
+        buckets, raw = decode(vector)
+        weighted = [(b, w * self._idf[b]) for b, w in zip(buckets, raw) if self._idf[b]]
+        if not weighted:
+            return []
+        norm = math.sqrt(sum(w * w for _, w in weighted)) * 255
+        query = {b: w / norm for b, w in weighted}
+
+        # (contribution, start, end) per run; every posting in a run adds the same
+        run_ends, run_weights = self._run_ends, self._run_weights
+        runs = []
+        for b, q in query.items():
+            first, last = self._run_offsets[b], self._run_offsets[b + 1]
+            start = run_ends[first - 1] if first else 0
+            for run in range(first, last):
+                runs.append((q * run_weights[run], start, run_ends[run]))
+                start = run_ends[run]
+        runs.sort(reverse=True)
+        rows, scores = self._impact_rows, {}
+        get = scores.get
+        left = math.inf if budget is None else budget
+        for contribution, start, end in runs:
+            if left <= 0:
+                break
+            end = min(end, start + left)
+            left -= end - start
+            for row in rows[start:end]:
+                scores[row] = get(row, 0.0) + contribution
+        if left > 0:  # read every run, so the scores are exact
+            return heapq.nsmallest(k, scores.items(), key=lambda rs: (-rs[1], rs[0]))
+
+        # Scores so far miss the lighter runs; rerank the best exactly
+        offsets, vector_buckets, vector_weights = self._vector_offsets, self._vector_buckets, self._vector_weights
+        exact, weight_of, zero = [], query.get, repeat(0.0)
+        for row in heapq.nlargest(max(MIN_RERANK, RERANK_FACTOR * k), scores, key=get):
+            start, end = offsets[row], offsets[row + 1]
+            exact.append((row, sum(map(mul, map(weight_of, vector_buckets[start:end], zero),
+                                       vector_weights[start:end]))))
+        return heapq.nsmallest(k, exact, key=lambda rs: (-rs[1], rs[0]))
+
+class JobIndexReader:
+    """A worker's handle on the current snapshot; switches when CURRENT changes"""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = directory or snapshot_dir()
+        self._index: Optional[JobIndex] = None
+        self._pointer = None  # (st_ino, st_mtime_ns) of CURRENT when last read
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> Optional[JobIndex]:
+        """Map the snapshot CURRENT names, if it changed since the last refresh"""
+        self._checked = time.monotonic()
+        pointer_path = self.directory / CURRENT
+        try:
+            stat = pointer_path.stat()
+        except FileNotFoundError:
+            return self._index
+        pointer = (stat.st_ino, stat.st_mtime_ns)
+        if pointer == self._pointer:
+            return self._index
+        with self._lock:
+            if pointer != self._pointer:
+                name = pointer_path.read_text().strip()
+                index = JobIndex(self.directory / name)
+                if self._index is None or index.version >= self._index.version:
+                    self._index = index
+                self._pointer = pointer
+        return self._index
+
+    def get(self) -> Optional[JobIndex]:
+        if time.monotonic() - self._checked >= CHECK_INTERVAL_SECONDS:
+            return self.refresh()
+        return self._index
+
+
+def _catalogue(database) -> Iterable[dict]:
+    for job in database.iter_jobs():
+        job["is_ghost_job"] = bool(job["is_ghost_job"])
+        job["visa_sponsorship"] = None if job["visa_sponsorship"] is None else bool(job["visa_sponsorship"])
+        yield job
+
+
+def _snapshot_version(name: str) -> Optional[int]:
+    try:
+        return int(name.strip()[len("jobs-"):-len(".idx")])
+    except ValueError:
+        return None
+
+
+def publish_snapshot(database=None, directory: Optional[Path] = None) -> Path:
+    """
+    Write a snapshot of the jobs table and point CURRENT at it, unless
+    CURRENT already names a newer one (a publish that started later but
+    finished first); returns the snapshot CURRENT names afterwards.
+    """
+    database = database or default_db
+    directory = directory or snapshot_dir(database)
+    directory.mkdir(parents=True, exist_ok=True)
+    version = time.time_ns()
+    name = f"jobs-{version}.idx"
+    tmp = directory / f".{name}.tmp"
+    with open(tmp, "wb") as f:
+        write_snapshot(f, _catalogue(database), version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, directory / name)
+
+    with _publish_lock:
+        try:
+            current = (directory / CURRENT).read_text().strip()
+        except FileNotFoundError:
+            current = None
+        current_version = current and _snapshot_version(current)
+        if current_version and current_version > version:
+            name = current
+        else:
+            pointer = directory / f".{CURRENT}.{os.getpid()}.{version}.tmp"
+            pointer.write_text(name)
+            os.replace(pointer, directory / CURRENT)
+
+        # Workers that still map an older file keep it until they switch; unlinking is safe
+        snapshots = sorted(directory.glob("jobs-*.idx"), key=lambda p: _snapshot_version(p.name) or 0)
+        for old in snapshots[:-KEEP_SNAPSHOTS]:
+            if old.name != name:
+                old.unlink(missing_ok=True)
+    return directory / name
+
+
+job_index = JobIndexReader()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish a job index snapshot of the jobs table")
+    parser.add_argument("--dir", type=Path, help="Snapshot directory (default: the database's under INDEX_DIR)")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    path = publish_snapshot(directory=args.dir)
+    index = JobIndex(path)
+    print(json.dumps({"path": str(path), "version": index.version, "jobs": len(index),
+                      "terms": index.term_count, "bytes": path.stat().st_size,
+                      "seconds": round(time.perf_counter() - start, 2)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
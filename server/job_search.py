@@ -8,6 +8,8 @@ import http.server
 import socketserver
 import json
 import csv
+import os
+import shutil
 import urllib.request
 import urllib.parse
 import re
@@ -55,16 +57,19 @@ class JobSearchHandler(http.server.SimpleHTTPRequestHandler):
             self.end_headers()
 
     def serve_file(self, filepath):
+        """Stream a CSV to the client in fixed-size chunks instead of reading it whole"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/csv')
-            self.end_headers()
-            self.wfile.write(content.encode())
+            f = open(filepath, 'rb')
         except FileNotFoundError:
             self.send_response(404)
             self.end_headers()
+            return
+        with f:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv; charset=utf-8')
+            self.send_header('Content-Length', str(os.fstat(f.fileno()).st_size))
+            self.end_headers()
+            shutil.copyfileobj(f, self.wfile, 64 * 1024)
 
     def search_jobs(self, params):
         """Search for jobs using web search"""
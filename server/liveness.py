@@ -0,0 +1,423 @@
+"""
+Posting liveness checks
+Scraped jobs carry is_ghost_job, but nothing re-checked a posting once it
+was stored. Filled or withdrawn jobs stayed in the catalogue, scored and
+shown. This module re-checks posting URLs on a schedule:
+
+- Which jobs: unexpired jobs whose next check is due, at most
+  JOBHUNT_LIVENESS_BATCH per run. Saved jobs come first (someone may be
+  about to apply), then older postings (the likeliest to be gone).
+- How: the first check of a URL GETs the first MAX_BODY_BYTES of the page
+  and scans them for "no longer accepting applications" style text. After
+  that, a page that sent an ETag or Last-Modified is re-checked with a
+  conditional GET, and an unchanged page is just a 304. Pages without
+  validators get a HEAD request.
+- Verdicts: 404/410, a closed-posting page, or a redirect from the posting
+  to the site root or a parent listing expire the job. It gets expired_at
+  and is_ghost_job, and leaves the job_index catalogue. Getting no
+  response GHOST_AFTER_FAILURES times in a row only sets is_ghost_job, and
+  a later answer clears it again. Flags set by the scraper are left alone.
+- Politeness: at most JOBHUNT_LIVENESS_CONCURRENCY checks in flight,
+  PER_HOST_CONCURRENCY to one host, and JOBHUNT_LIVENESS_HOST_DELAY seconds
+  between requests to one host, redirects included. Retry-After on a
+  429/503 pauses the host.
+- Safety: URLs come from scraped data, so the host of every request,
+  redirects included, is resolved first and refused unless all of its
+  addresses are public. That rules out loopback, private, link-local
+  (e.g. 169.254.169.254 metadata endpoints) and other reserved ranges. The
+  connection then goes to the checked address, so a second DNS answer
+  can't swap in another. JOBHUNT_LIVENESS_ALLOW_PRIVATE=1 lifts this for
+  local testing.
+- Writes: results are stored WRITE_BATCH at a time, one transaction each,
+  with the jobs flag changes.
+
+There is no HTTP client in requirements.txt, so requests go over asyncio
+streams: HTTP/1.1, one request per connection, bodies read only as far as
+the sniffing needs.
+
+A run is a background task (POST /api/jobs/liveness, admins only, or every
+JOBHUNT_LIVENESS_INTERVAL_MINUTES through LivenessScheduler). It runs its
+own event loop on the task pool thread. Jobs are leased for LEASE_MINUTES
+when a run picks them, so runs in other workers skip them.
+"""
+
+import asyncio
+import heapq
+import ipaddress
+import logging
+import os
+import re
+import socket
+import ssl
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+
+from metrics import LIVENESS_CHECKS
+from models import db as default_db
+
+logger = logging.getLogger(__name__)
+
+CONCURRENCY = int(os.getenv("JOBHUNT_LIVENESS_CONCURRENCY", "32"))
+HOST_DELAY = float(os.getenv("JOBHUNT_LIVENESS_HOST_DELAY", "1.0"))
+BATCH = int(os.getenv("JOBHUNT_LIVENESS_BATCH", "5000"))
+INTERVAL_MINUTES = float(os.getenv("JOBHUNT_LIVENESS_INTERVAL_MINUTES", "0"))  # 0: only on request
+ALLOW_PRIVATE = os.getenv("JOBHUNT_LIVENESS_ALLOW_PRIVATE", "") == "1"  # e.g. a stand-in board on 127.0.0.1
+PER_HOST_CONCURRENCY = 2
+REQUEST_TIMEOUT = 10.0
+MAX_REDIRECTS = 5
+MAX_BODY_BYTES = 32 * 1024
+MAX_RETRY_AFTER = 600.0
+WRITE_BATCH = 200
+GHOST_AFTER_FAILURES = 3
+RECHECK_HOURS = 24
+LEASE_MINUTES = 30
+SAVE_WEIGHT_DAYS = 30  # one save moves a job up as much as 30 days of age
+USER_AGENT = "JobHuntLivenessCheck/1.0"
+
+LIVE, EXPIRED, GHOST, UNKNOWN = "live", "expired", "ghost", "unknown"
+
+_CLOSED = re.compile(
+    rb"no longer (?:accepting applications|available|open|active)"
+    rb"|(?:job|position|posting|vacancy|role) (?:has (?:been )?|is |was )?(?:filled|closed|expired|removed)"
+    rb"|(?:job|posting|page) not found"
+    rb"|applications? (?:are |is )?(?:now )?closed",
+    re.I,
+)
+_REDIRECTS = (301, 302, 303, 307, 308)
+_ssl_context: Optional[ssl.SSLContext] = None
+
+
+class BlockedAddress(ValueError):
+    """A posting URL whose host resolves to a non-public address"""
+
+
+@dataclass
+class Probe:
+    """What one check of a posting URL found"""
+    status: int  # 0: no response
+    url: str  # after redirects
+    method: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    retry_after: Optional[float] = None
+    closed: bool = False  # the page says the posting is closed
+    error: Optional[str] = None
+
+
+def _context() -> ssl.SSLContext:
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+def _public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])  # drop an IPv6 zone
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def _resolve(host: str, port: int) -> str:
+    """An address to connect to for host; raises BlockedAddress unless every address is public"""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    addresses = [info[4][0] for info in infos]
+    if not addresses:
+        raise OSError(f"no address for {host!r}")
+    if not ALLOW_PRIVATE and not all(map(_public, addresses)):
+        raise BlockedAddress(f"{host!r} resolves to a non-public address")
+    return addresses[0]
+
+
+async def _request(method: str, url: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"not an http(s) URL: {url!r}")
+    https = parts.scheme == "https"
+    port = parts.port or (443 if https else 80)
+    address = await _resolve(parts.hostname, port)
+    reader, writer = await asyncio.open_connection(
+        address, port, ssl=_context() if https else None, server_hostname=parts.hostname if https else None)
+    try:
+        target = quote(parts.path or "/", safe="/%:@!$&'()*+,;=~-._")
+        if parts.query:
+            target += "?" + quote(parts.query, safe="/%:@!$&'()*+,;=~-._?")
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc.rsplit('@', 1)[-1]}",
+                 f"User-Agent: {USER_AGENT}", "Accept: text/html,*/*;q=0.5", "Accept-Encoding: identity",
+                 "Connection: close"] + [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        try:
+            status = int(status_line.split(None, 2)[1])
+        except (IndexError, ValueError):
+            raise ValueError(f"bad status line {status_line[:40]!r}")
+        response = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response[name.strip().lower()] = value.strip()
+        body = b""
+        if method == "GET" and status not in (204, 304) and status not in _REDIRECTS:
+            while len(body) < MAX_BODY_BYTES:
+                chunk = await reader.read(MAX_BODY_BYTES - len(body))
+                if not chunk:
+                    break
+                body += chunk
+        return status, response, body
+    finally:
+        writer.close()
+
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return min(max(float(value), 0.0), MAX_RETRY_AFTER)
+    except ValueError:  # an HTTP date; back off the longest
+        return MAX_RETRY_AFTER
+
+
+async def _follow(url: str, etag: Optional[str], last_modified: Optional[str], fetch_page: bool,
+                  limiter: Optional["HostLimiter"]) -> Probe:
+    conditional = {}
+    if etag:
+        conditional["If-None-Match"] = etag
+    if last_modified:
+        conditional["If-Modified-Since"] = last_modified
+    method = "GET" if conditional or fetch_page else "HEAD"
+    current = url
+    for attempt in range(MAX_REDIRECTS + 1):
+        if attempt and limiter is not None:  # follow-up requests keep the host's spacing too
+            await limiter.space(limiter.host(current))
+        headers = dict(conditional) if current == url else {}
+        if method == "GET":
+            headers["Range"] = f"bytes=0-{MAX_BODY_BYTES - 1}"
+        status, response, body = await _request(method, current, headers)
+        if method == "HEAD" and status in (405, 501):  # HEAD not supported: fetch the start of the page
+            method = "GET"
+            continue
+        if status in _REDIRECTS and response.get("location"):
+            current = urljoin(current, response["location"])
+            continue
+        return Probe(status, current, method, response.get("etag"), response.get("last-modified"),
+                     _retry_after(response), bool(_CLOSED.search(body)))
+    return Probe(0, current, method, error="TooManyRedirects")
+
+
+async def probe(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+                fetch_page: bool = False, timeout: float = REQUEST_TIMEOUT,
+                limiter: Optional["HostLimiter"] = None) -> Probe:
+    """Check one posting URL: a conditional GET when validators are known, else GET (fetch_page) or HEAD"""
+    try:
+        return await asyncio.wait_for(_follow(url, etag, last_modified, fetch_page, limiter), timeout)
+    except (OSError, ValueError, asyncio.TimeoutError) as e:
+        return Probe(0, url, "GET" if etag or last_modified or fetch_page else "HEAD", error=type(e).__name__)
+
+
+def _generic_redirect(original: str, final: str) -> bool:
+    """A posting that now redirects to the site root or a listing above it"""
+    before, after = urlsplit(original), urlsplit(final)
+    old_path, new_path = before.path.rstrip("/"), after.path.rstrip("/")
+    if old_path == new_path or not old_path:
+        return False
+    return not new_path or old_path.startswith(new_path + "/")
+
+
+def classify(url: str, result: Probe) -> str:
+    """live, expired, or unknown (no usable answer)"""
+    if result.status in (404, 410) or result.closed:
+        return EXPIRED
+    if 200 <= result.status < 300 or result.status == 304:
+        return EXPIRED if _generic_redirect(url, result.url) else LIVE
+    return UNKNOWN  # no response, 5xx, 429, or a bot wall (401/403)
+
+
+class HostLimiter:
+    """Caps concurrent requests per host and spaces out their starts"""
+
+    def __init__(self, concurrency: int = PER_HOST_CONCURRENCY, delay: float = HOST_DELAY):
+        self.concurrency = concurrency
+        self.delay = delay
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @staticmethod
+    def host(url: str) -> str:
+        return urlsplit(url).netloc.lower()
+
+    async def acquire(self, host: str):
+        slots = self._slots.get(host)
+        if slots is None:
+            slots = self._slots[host] = asyncio.Semaphore(self.concurrency)
+        await slots.acquire()
+
+    async def space(self, host: str):
+        """Wait until delay seconds after the previous request to host started"""
+        loop = asyncio.get_running_loop()
+        while True:  # re-check after sleeping; another request may have gone first
+            now = loop.time()
+            start = self._next_start.get(host, 0.0)
+            if now >= start:
+                self._next_start[host] = now + self.delay
+                return
+            await asyncio.sleep(start - now)
+
+    def release(self, host: str):
+        self._slots[host].release()
+
+    def pause(self, host: str, seconds: float):
+        until = asyncio.get_running_loop().time() + seconds
+        self._next_start[host] = max(self._next_start.get(host, 0.0), until)
+
+
+async def check_urls(jobs: List[dict], concurrency: int = CONCURRENCY, limiter: Optional[HostLimiter] = None,
+                     timeout: float = REQUEST_TIMEOUT) -> AsyncIterator[Tuple[dict, Probe]]:
+    """
+    Probe every job's url, yielding (job, probe) as checks finish. Jobs
+    carry the stored etag/last_modified, and fetch_page for a first check.
+    """
+    limiter = limiter or HostLimiter()
+    slots = asyncio.Semaphore(concurrency)
+
+    async def check(job: dict) -> Tuple[dict, Probe]:
+        # Wait for the host first, so jobs queued behind a slow host don't hold global slots.
+        # Spacing comes last: a wait for a global slot would otherwise undo it.
+        host = limiter.host(job["url"])
+        await limiter.acquire(host)
+        try:
+            async with slots:
+                await limiter.space(host)
+                result = await probe(job["url"], job.get("etag"), job.get("last_modified"),
+                                     job.get("fetch_page", False), timeout, limiter)
+        finally:
+            limiter.release(host)
+        if result.retry_after:
+            limiter.pause(host, result.retry_after)
+        return job, result
+
+    pending = [asyncio.ensure_future(check(job)) for job in jobs]
+    try:
+        for finished in asyncio.as_completed(pending):
+            yield await finished
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def priority(job: dict, now: datetime) -> float:
+    """Days since posting plus SAVE_WEIGHT_DAYS per save; checked highest first"""
+    try:
+        age = (now - datetime.fromisoformat((job["date_posted"] or "")[:10])).days
+    except ValueError:
+        age = 0
+    return max(age, 0) + SAVE_WEIGHT_DAYS * job["saves"]
+
+
+def outcome(job: dict, result: Probe, now: datetime) -> Tuple[str, tuple, Optional[tuple]]:
+    """(verdict, job_checks row, (is_ghost_job, expired_at, job_id) or None) for one check"""
+    verdict = classify(job["url"], result)
+    same_url = job["checked_url"] == job["url"]
+    failures = job["failures"] if same_url else 0
+    flagged = bool(job["flagged"]) if same_url else False
+    checked_at = now.isoformat()
+    update = None
+    if verdict == UNKNOWN:
+        if result.status == 0 or result.status >= 500:
+            failures += 1
+        if failures >= GHOST_AFTER_FAILURES:
+            verdict = GHOST
+            if not job["is_ghost_job"]:
+                update, flagged = (1, None, job["id"]), True
+        next_check = now + timedelta(hours=min(2 ** failures, RECHECK_HOURS))
+    else:
+        failures = 0
+        next_check = now + timedelta(hours=RECHECK_HOURS)
+        if verdict == EXPIRED:
+            update, flagged, next_check = (1, checked_at, job["id"]), True, None
+        elif flagged:
+            update, flagged = (0, None, job["id"]), False
+    if result.status == 304:  # unchanged: the stored validators still apply
+        etag, last_modified = job["etag"], job["last_modified"]
+    else:
+        etag, last_modified = result.etag, result.last_modified
+    row = (job["id"], job["url"], checked_at, next_check.isoformat() if next_check else None, result.status,
+           verdict, etag, last_modified, failures, int(flagged))
+    return verdict, row, update
+
+
+async def _run(database, limit: int, concurrency: int, host_delay: float, timeout: float,
+               progress: Optional[Callable[[int, int], None]], now: datetime) -> dict:
+    candidates = await asyncio.to_thread(database.get_liveness_candidates, now.isoformat())
+    jobs = heapq.nlargest(limit, candidates, key=lambda job: priority(job, now))
+    for job in jobs:
+        if job["checked_url"] != job["url"]:  # validators belong to the old URL
+            job["etag"] = job["last_modified"] = None
+        job["fetch_page"] = job["checked_url"] != job["url"] or job["verdict"] is None
+    lease = (now + timedelta(minutes=LEASE_MINUTES)).isoformat()
+    await asyncio.to_thread(database.lease_job_checks, [(job["id"], job["url"], lease) for job in jobs])
+
+    stats = {"due": len(candidates), "checked": 0, LIVE: 0, EXPIRED: 0, GHOST: 0, UNKNOWN: 0,
+             "not_modified": 0, "flag_changes": 0}
+    rows, updates = [], []
+    limiter = HostLimiter(delay=host_delay)
+    async for job, result in check_urls(jobs, concurrency, limiter, timeout):
+        verdict, row, update = outcome(job, result, now)
+        LIVENESS_CHECKS.inc(result.method, verdict)
+        stats["checked"] += 1
+        stats[verdict] += 1
+        stats["not_modified"] += result.status == 304
+        rows.append(row)
+        if update:
+            updates.append(update)
+        if len(rows) >= WRITE_BATCH:
+            await asyncio.to_thread(database.record_job_checks, rows, updates)
+            stats["flag_changes"] += len(updates)
+            rows, updates = [], []
+        if progress:
+            progress(stats["checked"], len(jobs))
+    if rows:
+        await asyncio.to_thread(database.record_job_checks, rows, updates)
+        stats["flag_changes"] += len(updates)
+    return stats
+
+
+def run_liveness_checks(database=None, limit: int = BATCH, concurrency: int = CONCURRENCY,
+                        host_delay: float = HOST_DELAY, timeout: float = REQUEST_TIMEOUT,
+                        progress: Optional[Callable[[int, int], None]] = None,
+                        now: Optional[datetime] = None) -> dict:
+    """Check the due postings with the highest priority; blocks until done (call from a worker thread)"""
+    return asyncio.run(_run(database or default_db, limit, concurrency, host_delay, timeout, progress,
+                            now or datetime.now()))
+
+
+class LivenessScheduler:
+    """Calls submit every interval_minutes on the server's event loop (off when interval_minutes is 0)"""
+
+    def __init__(self, submit: Callable[[], object], interval_minutes: float = INTERVAL_MINUTES):
+        self.submit = submit
+        self.interval = interval_minutes * 60
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.submit()
+            except Exception:
+                logger.exception("Could not start the scheduled liveness check")
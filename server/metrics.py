@@ -0,0 +1,303 @@
+"""
+Performance metrics for the JobHunt AI API servers
+Per-route latency histograms, in-flight requests, per-request DB usage and
+cache hit rates, rendered in Prometheus text format for /api/metrics
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter, one series per label value tuple"""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """Cumulative bucket histogram with sum and count per series"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        n = len(self.buckets)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * n + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[n] += value
+            series[n + 1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[-1] if series else 0
+
+    def samples(self):
+        n = len(self.buckets)
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series[:n]):
+                cumulative += hits
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, le), cumulative
+            yield f"{self.name}_bucket", _format_labels(self.labelnames, labels, 'le="+Inf"'), series[n + 1]
+            yield f"{self.name}_sum", _format_labels(self.labelnames, labels), series[n]
+            yield f"{self.name}_count", _format_labels(self.labelnames, labels), series[n + 1]
+
+
+class Registry:
+    """Ordered collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every registered metric in Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "jobhunt_http_request_duration_seconds",
+    "HTTP request latency by method, route and status",
+    ("method", "route", "status"),
+))
+REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "jobhunt_http_requests_in_flight",
+    "HTTP requests currently being served",
+))
+REQUEST_DB_QUERIES = REGISTRY.register(Histogram(
+    "jobhunt_http_request_db_queries",
+    "Database statements executed per HTTP request",
+    ("route",),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+REQUEST_DB_SECONDS = REGISTRY.register(Histogram(
+    "jobhunt_http_request_db_seconds",
+    "Time spent in database statements per HTTP request",
+    ("route",),
+))
+DB_QUERIES = REGISTRY.register(Counter(
+    "jobhunt_db_queries_total",
+    "Database statements executed by statement type",
+    ("statement",),
+))
+DB_QUERY_SECONDS = REGISTRY.register(Counter(
+    "jobhunt_db_query_seconds_total",
+    "Total time spent in database statements by statement type",
+    ("statement",),
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "jobhunt_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss)",
+    ("cache", "result"),
+))
+CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "jobhunt_cache_hit_ratio",
+    "Fraction of cache lookups served from cache since startup",
+    ("cache",),
+))
+PUSH_CONNECTIONS = REGISTRY.register(Gauge(
+    "jobhunt_push_connections",
+    "Open push streams by transport (sse/websocket)",
+    ("transport",),
+))
+PUSH_EVENTS = REGISTRY.register(Counter(
+    "jobhunt_push_events_total",
+    "Events written to push streams by event type",
+    ("event",),
+))
+LIVENESS_CHECKS = REGISTRY.register(Counter(
+    "jobhunt_liveness_checks_total",
+    "Posting URL checks by request method and verdict",
+    ("method", "verdict"),
+))
+ADMISSION_SHED = REGISTRY.register(Counter(
+    "jobhunt_admission_shed_total",
+    "Requests refused by admission control by cost class and reason",
+    ("cost", "reason"),
+))
+ADMISSION_QUEUED = REGISTRY.register(Gauge(
+    "jobhunt_admission_queued",
+    "Requests waiting for a slot by cost class",
+    ("cost",),
+))
+ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "jobhunt_admission_wait_seconds",
+    "Time queued requests waited for a slot by cost class",
+    ("cost",),
+))
+PROCESS_START = REGISTRY.register(Gauge(
+    "jobhunt_process_start_time_seconds",
+    "Unix time the API process started",
+))
+PROCESS_START.set(time.time())
+
+
+class RequestStats:
+    """Per-request accumulator for database work"""
+    __slots__ = ("db_queries", "db_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("jobhunt_request_stats", default=None)
+
+# SQL text -> leading keyword; statements are module constants so this stays small
+_statement_types: Dict[str, str] = {}
+
+
+def observe_db_query(sql: str, params, seconds: float, rows: int = 0, cursor=None):
+    """Query hook for models.Database: count the statement globally and against the current request"""
+    statement = _statement_types.get(sql)
+    if statement is None:
+        words = sql.split(None, 1)
+        statement = words[0].upper() if words else "UNKNOWN"
+        if len(_statement_types) < 1024:
+            _statement_types[sql] = statement
+    DB_QUERIES.inc(statement)
+    DB_QUERY_SECONDS.inc(statement, amount=seconds)
+    stats = _current_request.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += seconds
+
+
+def record_cache(cache: str, hit: bool):
+    """Record a cache lookup so hit rates show up in /api/metrics"""
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def render_metrics() -> str:
+    """Refresh derived gauges and render the registry"""
+    totals: Dict[str, list] = {}
+    for (cache, result), value in list(CACHE_REQUESTS._values.items()):
+        entry = totals.setdefault(cache, [0.0, 0.0])
+        entry[0 if result == "hit" else 1] += value
+    for cache, (hits, misses) in totals.items():
+        if hits + misses:
+            CACHE_HIT_RATIO.set(hits / (hits + misses), cache)
+    return REGISTRY.render()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, in-flight requests and DB usage.
+    Routes are labelled by their template (e.g. /api/jobs/saved/{job_id})
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_FLIGHT.dec()
+            _current_request.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(elapsed, scope["method"], route, str(status))
+            REQUEST_DB_QUERIES.observe(stats.db_queries, route)
+            REQUEST_DB_SECONDS.observe(stats.db_seconds, route)
@@ -1,21 +1,278 @@
 """
 Database models for JobHunt AI
-Uses SQLite for simplicity (can upgrade to PostgreSQL later)
+Uses SQLite by default. Set JOBHUNT_DATABASE_URL=postgresql://... to run the
+same Database methods on PostgreSQL (postgres.py) through a connection pool.
 """
 
 from datetime import datetime
-from typing import Optional, List
+from typing import Callable, Iterator, Optional, List
 import json
+import os
 import sqlite3
+import time
+import weakref
 from pathlib import Path
 
-DB_PATH = Path(__file__).parent / "data" / "jobhunt.db"
+from descriptions import DESCRIPTION_COLUMNS, description_columns
+from funnel import COUNTERS, REACHED, STATS_COLUMNS, counters, epoch, reached_mask, transition
+from gazetteer import LOCATION_COLUMNS, location_columns
+from salary import SALARY_COLUMNS, salary_columns
+from vectors import job_vector, profile_vector
 
-def init_db():
+DB_PATH = Path(os.getenv("JOBHUNT_DB_PATH", Path(__file__).parent / "data" / "jobhunt.db"))
+DATABASE_URL = os.getenv("JOBHUNT_DATABASE_URL", "")
+
+# Called once per statement as hook(sql, params, seconds, rows, cursor), after its
+# result rows have been consumed (or straight away for statements without rows)
+QUERY_HOOKS: List[Callable] = []
+
+def add_query_hook(hook: Callable):
+    """Register a callback run after every statement executed through Database"""
+    if hook not in QUERY_HOOKS:
+        QUERY_HOOKS.append(hook)
+
+class TracedCursorMixin:
+    """
+    Cursor methods that report each statement to QUERY_HOOKS.
+    Wall time covers execute plus fetches, since SQLite does most of the work
+    for a SELECT while stepping through rows. Hooks see the statement as
+    models.py wrote it; _native rewrites it for the driver.
+    """
+    _trace = None  # [sql, params, seconds, rows] for the statement being read
+
+    @staticmethod
+    def _native(sql):
+        return sql
+
+    def _finish_trace(self):
+        trace, self._trace = self._trace, None
+        if trace is not None:
+            for hook in QUERY_HOOKS:
+                hook(trace[0], trace[1], trace[2], trace[3], self)
+
+    def _start_trace(self, method, sql, parameters, report_params):
+        self._finish_trace()
+        start = time.perf_counter()
+        try:
+            method(self._native(sql), parameters)
+        except Exception:
+            self._trace = [sql, report_params, time.perf_counter() - start, 0]
+            self._finish_trace()
+            raise
+        self._trace = [sql, report_params, time.perf_counter() - start, 0]
+        if self.description is None:  # no result rows: report straight away
+            self._trace[3] = max(self.rowcount, 0)
+            self._finish_trace()
+        return self
+
+    def execute(self, sql, parameters=()):
+        if not QUERY_HOOKS:
+            return super().execute(self._native(sql), parameters)
+        return self._start_trace(super().execute, sql, parameters, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not QUERY_HOOKS:
+            super().executemany(self._native(sql), seq_of_parameters)
+            return self
+        return self._start_trace(super().executemany, sql, seq_of_parameters, None)
+
+    def fetchone(self):
+        if self._trace is None:
+            return super().fetchone()
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._trace[2] += time.perf_counter() - start
+        if row is None:
+            self._finish_trace()
+        else:
+            self._trace[3] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+        if self._trace is None:
+            return super().fetchmany(size)
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._trace[2] += time.perf_counter() - start
+        self._trace[3] += len(rows)
+        if len(rows) < size:
+            self._finish_trace()
+        return rows
+
+    def fetchall(self):
+        if self._trace is None:
+            return super().fetchall()
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._trace[2] += time.perf_counter() - start
+        self._trace[3] += len(rows)
+        self._finish_trace()
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish_trace()
+        super().close()
+
+class TracedCursor(TracedCursorMixin, sqlite3.Cursor):
+    """SQLite cursor that reports each statement to QUERY_HOOKS"""
+
+class TracedConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute shortcuts) are traced"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=TracedCursor):
+        cursor = super().cursor(factory)
+        if QUERY_HOOKS and isinstance(cursor, TracedCursor):
+            self._cursors.add(cursor)
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        # Report statements whose rows were only partly read (e.g. a single fetchone)
+        for cursor in list(self._cursors):
+            cursor._finish_trace()
+        super().close()
+
+def _upsert_sql(table: str, columns: List[str], key: List[str]) -> str:
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in key)
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}")
+
+class SQLiteBackend:
+    """
+    Storage in one SQLite file. Database methods write portable SQL (?
+    placeholders, ON CONFLICT, RETURNING, COALESCE) and ask the backend for
+    the few things that differ: schema introspection, JSON building and
+    bulk writes. postgres.PostgresBackend implements the same interface.
+    """
+    name = "sqlite"
+    IntegrityError = sqlite3.IntegrityError
+    # json_set on job_data SQLite can't parse (json.dumps writes NaN as-is)
+    InvalidJSON = sqlite3.OperationalError
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+
+    def describe(self) -> str:
+        return str(self.path)
+
+    def identity(self) -> str:
+        """Which database this is, for keying data derived from it (job_index snapshots)"""
+        return f"sqlite:{self.path.resolve()}"
+
+    def connect(self, check_same_thread: bool = True):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return sqlite3.connect(self.path, factory=TracedConnection, check_same_thread=check_same_thread)
+
+    def lock_schema(self, cursor):
+        """Serialise init_db across processes (SQLite's write lock already does)"""
+
+    def stream_cursor(self, conn):
+        """Cursor for reading a large result in fetchmany batches"""
+        return conn.cursor()
+
+    def table_columns(self, cursor, table: str) -> List[str]:
+        cursor.execute(f"PRAGMA table_info({table})")
+        return [row[1] for row in cursor.fetchall()]
+
+    def add_column(self, cursor, table: str, column: str, declaration: str):
+        """ALTER TABLE ... ADD COLUMN for databases created before the column existed"""
+        if column not in self.table_columns(cursor, table):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+    def json_object(self, fields: List[tuple]) -> str:
+        """SQL for a JSON object (as text) from (key, SQL expression) pairs"""
+        return "json_object(" + ", ".join(f"'{key}', {expr}" for key, expr in fields) + ")"
+
+    def json_value(self, expr: str) -> str:
+        """SQL embedding JSON text as a value inside json_object"""
+        return f"json({expr})"
+
+    def json_with_keys(self, document: str, fields: List[tuple]) -> str:
+        """SQL for a stored JSON object (as text) with (key, SQL expression) pairs set on it"""
+        return f"json_set({document}, " + ", ".join(f"'$.{key}', {expr}" for key, expr in fields) + ")"
+
+    def upsert_many(self, conn, table: str, columns: List[str], key: List[str], rows: List[tuple]):
+        """Insert or update rows inside the caller's transaction"""
+        conn.executemany(_upsert_sql(table, columns, key), rows)
+
+    def insert_many(self, conn, table: str, columns: List[str], rows: List[tuple]):
+        conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                         rows)
+
+# change_versions name covering saved searches, search configs and dream companies (alerts.py)
+ALERT_SOURCES = "alert_sources"
+BUMP_VERSION_SQL = """INSERT INTO change_versions (name, version) VALUES (?, 1)
+    ON CONFLICT (name) DO UPDATE SET version = change_versions.version + 1"""
+
+def bump_version(conn, name: str):
+    """Mark name as changed, inside the caller's transaction"""
+    conn.execute(BUMP_VERSION_SQL, (name,))
+
+def open_backend(url: str = DATABASE_URL, path: Path = DB_PATH):
+    """PostgresBackend for a postgres:// or postgresql:// URL, otherwise SQLite at path"""
+    if url.startswith(("postgres://", "postgresql://")):
+        from postgres import PostgresBackend
+        return PostgresBackend(url)
+    if url:
+        raise ValueError(f"Unsupported JOBHUNT_DATABASE_URL {url.split(':', 1)[0]!r}; use postgresql://...")
+    return SQLiteBackend(path)
+
+_LOCATION_DECLARATIONS = [
+    ("location_city", "TEXT"), ("location_country", "TEXT"), ("location_region", "TEXT"),
+    ("location_utc_offset", "INTEGER"),  # minutes, standard time
+    ("location_remote", "INTEGER"),
+]
+
+# Per-user funnel inputs (funnel.counters); rows written without status_changed_at count from updated_at
+APPLICATION_STATES_SQL = """SELECT user_id, status, COALESCE(status_changed_at, updated_at), reached
+    FROM applications"""
+APPLICATION_EXITS_SQL = """SELECT user_id, from_status, COUNT(*), COALESCE(SUM(seconds_in_stage), 0)
+    FROM application_events WHERE from_status IS NOT NULL"""
+# Adds deltas (funnel.transition) to the counters
+ADD_APPLICATION_STATS_SQL = (
+    f"INSERT INTO application_stats ({', '.join(STATS_COLUMNS)}) VALUES ({', '.join('?' for _ in STATS_COLUMNS)}) "
+    "ON CONFLICT (user_id, status) DO UPDATE SET "
+    + ", ".join(f"{c} = application_stats.{c} + excluded.{c}" for c in COUNTERS))
+
+def _rebuild_application_stats(conn, backend, user_id: Optional[str] = None):
+    """Recompute application_stats (one user's, or everyone's) inside the caller's transaction"""
+    params = () if user_id is None else (user_id,)
+    where = "" if user_id is None else " WHERE user_id = ?"
+    # Deleting first takes SQLite's write lock, so no status change lands mid-rebuild
+    conn.execute("DELETE FROM application_stats" + where, params)
+    exits = conn.execute(APPLICATION_EXITS_SQL + where.replace("WHERE", "AND") + " GROUP BY user_id, from_status",
+                         params).fetchall()
+    states = backend.stream_cursor(conn)
+    states.execute(APPLICATION_STATES_SQL + where, params)
+    rows = [(user, status, *values)
+            for user, stages in counters(states, exits).items() for status, values in stages.items()]
+    backend.insert_many(conn, "application_stats", STATS_COLUMNS, rows)
+
+def init_db(backend=None):
     """Initialize database tables"""
-    DB_PATH.parent.mkdir(exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    backend = backend or default_backend
+    conn = backend.connect()
     cursor = conn.cursor()
+    backend.lock_schema(cursor)
     
     # Users table
     cursor.execute("""
@@ -89,16 +346,291 @@ def init_db():
         )
     """)
     
+    # Cover letter / email drafts (docgen), one per user, profile version, job and template
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS generated_docs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            profile_version TEXT NOT NULL,  -- profiles.updated_at when rendered
+            job_id TEXT NOT NULL,
+            template TEXT NOT NULL,
+            hiring_manager TEXT NOT NULL DEFAULT '',
+            content TEXT NOT NULL,  -- JSON: coverLetter, emails, tips
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            UNIQUE(user_id, profile_version, job_id, template, hiring_manager)
+        )
+    """)
+    
+    # Applications point at their generated draft instead of copying it
+    backend.add_column(cursor, "applications", "doc_id", "INTEGER REFERENCES generated_docs(id)")
+    
+    # Funnel analytics (funnel.py): every status change is logged, and per-user
+    # counters move with it so stats never scan applications
+    backend.add_column(cursor, "applications", "status_changed_at", "TEXT")
+    backend.add_column(cursor, "applications", "reached", "INTEGER NOT NULL DEFAULT 1")  # funnel.STAGE_BITS
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS application_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            application_id INTEGER NOT NULL,
+            user_id TEXT NOT NULL,
+            from_status TEXT,  -- NULL when created
+            to_status TEXT NOT NULL,
+            seconds_in_stage BIGINT,  -- time spent in from_status
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (application_id) REFERENCES applications(id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_application_events_user ON application_events (user_id, id)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS application_stats (
+            user_id TEXT NOT NULL,
+            status TEXT NOT NULL,
+            active INTEGER NOT NULL DEFAULT 0,  -- applications in the stage now
+            active_since BIGINT NOT NULL DEFAULT 0,  -- sum of their entry times, epoch seconds
+            reached INTEGER NOT NULL DEFAULT 0,  -- applications that ever got this far
+            exits INTEGER NOT NULL DEFAULT 0,  -- ended stays
+            exit_seconds BIGINT NOT NULL DEFAULT 0,  -- and their total length
+            PRIMARY KEY (user_id, status),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    cursor.execute("SELECT id, status FROM applications WHERE status_changed_at IS NULL")
+    backfill = [(reached_mask(status), app_id) for app_id, status in cursor.fetchall()]
+    if backfill:
+        cursor.executemany("UPDATE applications SET status_changed_at = updated_at, reached = ? WHERE id = ?",
+                           backfill)
+        _rebuild_application_stats(conn, backend)
+    
+    # Job catalogue (jobs.json / Job_Listings.csv shape)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            company TEXT NOT NULL,
+            role TEXT NOT NULL,
+            role_type TEXT,
+            location TEXT,
+            remote_status TEXT,
+            salary_range TEXT,
+            url TEXT,
+            date_posted TEXT,
+            date_scraped TEXT,
+            source TEXT,
+            is_ghost_job INTEGER DEFAULT 0,
+            skills TEXT,  -- JSON array
+            industry TEXT,
+            visa_sponsorship INTEGER,  -- NULL when unknown
+            job_description_summary TEXT,
+            updated_at TEXT NOT NULL
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_date_posted ON jobs (date_posted)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company)")
+    
+    # Parsed salary_range (salary.py); salary_currency '' = no salary stated, NULL = not parsed yet
+    for column, declaration in [
+        ("salary_currency", "TEXT"), ("salary_period", "TEXT"),
+        ("salary_min", "REAL"), ("salary_max", "REAL"),  # in salary_currency per salary_period
+        ("salary_min_aud", "INTEGER"), ("salary_max_aud", "INTEGER"),  # annual
+        ("salary_min_usd", "INTEGER"), ("salary_max_usd", "INTEGER"),
+    ]:
+        backend.add_column(cursor, "jobs", column, declaration)
+    cursor.execute("SELECT id, salary_range, location FROM jobs WHERE salary_currency IS NULL")
+    backfill = [salary_columns(text, location or "") + (job_id,) for job_id, text, location in cursor.fetchall()]
+    cursor.executemany(f"UPDATE jobs SET {', '.join(f'{c} = ?' for c in SALARY_COLUMNS)} WHERE id = ?", backfill)
+    # Range filters and sort-by-salary; jobs without a salary have NULLs and sort last
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_salary ON jobs (salary_max_aud, salary_min_aud)")
+    
+    # Resolved location (gazetteer.py); location_country NULL = not resolved yet, '' = unknown place
+    for table in ("jobs", "profiles"):
+        for column, declaration in _LOCATION_DECLARATIONS:
+            backend.add_column(cursor, table, column, declaration)
+    cursor.execute("SELECT id, location, remote_status FROM jobs WHERE location_country IS NULL")
+    backfill = [location_columns(location, remote_status or "") + (job_id,)
+                for job_id, location, remote_status in cursor.fetchall()]
+    cursor.executemany(f"UPDATE jobs SET {', '.join(f'{c} = ?' for c in LOCATION_COLUMNS)} WHERE id = ?", backfill)
+    cursor.execute("SELECT user_id, location FROM profiles WHERE location_country IS NULL")
+    backfill = [location_columns(location) + (user_id,) for user_id, location in cursor.fetchall()]
+    cursor.executemany(f"UPDATE profiles SET {', '.join(f'{c} = ?' for c in LOCATION_COLUMNS)} WHERE user_id = ?",
+                       backfill)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs (location_country, location_utc_offset)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_utc_offset ON jobs (location_utc_offset)")
+    
+    # Plain-text description, one-line summary and sizes (descriptions.py); NULL = not converted yet
+    for column, declaration in [("description_text", "TEXT"), ("description_summary", "TEXT"),
+                                ("description_words", "INTEGER"), ("description_chars", "INTEGER")]:
+        backend.add_column(cursor, "jobs", column, declaration)
+    cursor.execute("SELECT id, job_description_summary FROM jobs WHERE description_text IS NULL")
+    backfill = [description_columns(raw) + (job_id,) for job_id, raw in cursor.fetchall()]
+    cursor.executemany(f"UPDATE jobs SET {', '.join(f'{c} = ?' for c in DESCRIPTION_COLUMNS)} WHERE id = ?",
+                       backfill)
+    
+    # Text vectors (vectors.py) for resume-to-job similarity; NULL = not computed yet, empty = no terms
+    backend.add_column(cursor, "jobs", "text_vector", "BLOB")
+    backend.add_column(cursor, "profiles", "resume_vector", "BLOB")
+    cursor.execute("""SELECT id, role, industry, job_description_summary, skills FROM jobs
+        WHERE text_vector IS NULL""")
+    backfill = [(job_vector({"role": role, "industry": industry, "job_description_summary": summary,
+                             "skills": json.loads(skills or "[]")}), job_id)
+                for job_id, role, industry, summary, skills in cursor.fetchall()]
+    cursor.executemany("UPDATE jobs SET text_vector = ? WHERE id = ?", backfill)
+    cursor.execute("""SELECT user_id, resume_text, extracted_skills, preferred_roles FROM profiles
+        WHERE resume_vector IS NULL""")
+    backfill = [(profile_vector(text, json.loads(skills or "[]"), json.loads(roles or "[]")), user_id)
+                for user_id, text, skills, roles in cursor.fetchall()]
+    cursor.executemany("UPDATE profiles SET resume_vector = ? WHERE user_id = ?", backfill)
+    
+    # Posting liveness (liveness.py); expired jobs are gone from the board and leave the catalogue
+    backend.add_column(cursor, "jobs", "expired_at", "TEXT")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS job_checks (
+            job_id TEXT PRIMARY KEY,
+            url TEXT NOT NULL,  -- URL checked; a job re-ingested with another URL starts over
+            checked_at TEXT,
+            next_check_at TEXT,  -- NULL once expired
+            status INTEGER,  -- last HTTP status, 0 = no response
+            verdict TEXT,  -- live, expired, ghost, unknown
+            etag TEXT,
+            last_modified TEXT,
+            failures INTEGER NOT NULL DEFAULT 0,  -- checks in a row without a response
+            flagged INTEGER NOT NULL DEFAULT 0,  -- is_ghost_job was set by the checker, not the scraper
+            FOREIGN KEY (job_id) REFERENCES jobs(id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_job_checks_next ON job_checks (next_check_at)")
+    
+    # Per-user watched companies (Dream_Companies.csv shape)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dream_companies (
+            user_id TEXT NOT NULL,
+            company TEXT NOT NULL,
+            industry TEXT,
+            careers_url TEXT,
+            jobs_email TEXT,
+            recent_news TEXT,
+            direction TEXT,
+            known_contacts TEXT,
+            date_added TEXT,
+            last_updated TEXT,
+            PRIMARY KEY (user_id, company),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    
+    # Per-user search preferences (search_config.csv field/value pairs)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS search_config (
+            user_id TEXT NOT NULL,
+            field TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (user_id, field),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    
+    # Explicit job alerts; clauses are JSON arrays of phrases (any-of within a clause)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS saved_searches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            roles TEXT,  -- JSON array
+            keywords TEXT,  -- JSON array
+            industries TEXT,  -- JSON array
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_saved_searches_user ON saved_searches (user_id)")
+
+    # Bumped in the same transaction as the writes they track (see bump_version)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS change_versions (
+            name TEXT PRIMARY KEY,
+            version BIGINT NOT NULL
+        )
+    """)
+    
+    # Alert matches; one per user and job however many subscriptions matched
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            job_id TEXT NOT NULL,
+            subscription TEXT NOT NULL,  -- search:<id>, config, company:<name>
+            created_at TEXT NOT NULL,
+            read_at TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            UNIQUE(user_id, job_id)
+        )
+    """)
+    
+    # Parsed resume uploads keyed by parser version + content hash (resume_pool)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS resume_parses (
+            content_hash TEXT PRIMARY KEY,
+            result TEXT NOT NULL,  -- JSON from resume_parser.parse_resume
+            created_at TEXT NOT NULL
+        )
+    """)
+    
+    # Push messages relayed between API workers (push.SQLiteBroker); pruned after a few minutes
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS push_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            channel TEXT NOT NULL,  -- user id, or * for everyone
+            payload TEXT NOT NULL,  -- JSON
+            created_at REAL NOT NULL
+        )
+    """)
+    
+    # Per-user listings are read newest first; these let SQLite walk the
+    # index instead of sorting (exports stream without a temp b-tree)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_saved_jobs_user_created ON saved_jobs (user_id, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_applications_user_created ON applications (user_id, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications (user_id, id)")
+    
     conn.commit()
     conn.close()
     print("✅ Database initialized")
 
+JOB_COLUMNS = [
+    "id", "company", "role", "role_type", "location", "remote_status", "salary_range", "url",
+    "date_posted", "date_scraped", "source", "is_ghost_job", "skills", "industry",
+    "visa_sponsorship", "job_description_summary", "updated_at",
+] + SALARY_COLUMNS + LOCATION_COLUMNS + ["text_vector"] + DESCRIPTION_COLUMNS
+# iter_jobs leaves out the descriptions themselves: listings carry the summary, not the text
+CATALOGUE_COLUMNS = [c for c in JOB_COLUMNS if c not in ("job_description_summary", "description_text")]
+JOB_CHECK_COLUMNS = [
+    "job_id", "url", "checked_at", "next_check_at", "status", "verdict",
+    "etag", "last_modified", "failures", "flagged",
+]
+DREAM_COMPANY_COLUMNS = [
+    "company", "industry", "careers_url", "jobs_email", "recent_news", "direction",
+    "known_contacts", "date_added", "last_updated",
+]
+
+# profiles columns holding JSON arrays
+PROFILE_JSON_COLUMNS = {"preferred_roles", "preferred_industries", "extracted_skills"}
+# profiles columns the API never returns
+PROFILE_HIDDEN_COLUMNS = {"resume_vector"}
+
+# Replaces the whole profile row
+SAVE_PROFILE_SQL = _upsert_sql("profiles", [
+    "user_id", "full_name", "email", "phone", "location", "linkedin_url", "github_url",
+    "portfolio_url", "twitter_url", "experience_level", "years_of_experience",
+    "preferred_roles", "preferred_industries", "work_style", "salary_expectation",
+    "resume_text", "resume_file_name", "extracted_skills", "created_at", "updated_at",
+] + LOCATION_COLUMNS + ["resume_vector"], ["user_id"])
+
+
 class Database:
-    def __init__(self):
-        self.db_path = DB_PATH
+    def __init__(self, backend=None):
+        self.backend = backend or default_backend
+        self._profile_json_sql = None
     
-    def get_conn(self):
-        return sqlite3.connect(self.db_path)
+    def get_conn(self, check_same_thread: bool = True):
+        return self.backend.connect(check_same_thread)
     
     # User operations
     def create_user(self, user_id: str, email: str, password_hash: str) -> bool:
@@ -111,7 +643,7 @@ class Database:
             )
             conn.commit()
             return True
-        except sqlite3.IntegrityError:
+        except self.backend.IntegrityError:
             return False  # Email already exists
         finally:
             conn.close()
@@ -152,12 +684,7 @@ class Database:
         cursor = conn.cursor()
         
         cursor.execute(
-            """INSERT OR REPLACE INTO profiles 
-            (user_id, full_name, email, phone, location, linkedin_url, github_url, 
-            portfolio_url, twitter_url, experience_level, years_of_experience,
-            preferred_roles, preferred_industries, work_style, salary_expectation,
-            resume_text, resume_file_name, extracted_skills, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            SAVE_PROFILE_SQL,
             (
                 user_id,
                 profile_data.get("fullName", ""),
@@ -178,7 +705,10 @@ class Database:
                 profile_data.get("resumeFileName", ""),
                 json.dumps(profile_data.get("extractedSkills", [])),
                 profile_data.get("createdAt", datetime.now().isoformat()),
-                datetime.now().isoformat()
+                datetime.now().isoformat(),
+            ) + location_columns(profile_data.get("location", "")) + (
+                profile_vector(profile_data.get("resumeText", ""), profile_data.get("extractedSkills", []),
+                               profile_data.get("preferredRoles", [])),
             )
         )
         conn.commit()
@@ -195,23 +725,92 @@ class Database:
             return None
         
         columns = [desc[0] for desc in cursor.description]
-        profile = dict(zip(columns, row))
+        profile = {name: value for name, value in zip(columns, row) if name not in PROFILE_HIDDEN_COLUMNS}
         
         # Parse JSON fields
-        profile["preferred_roles"] = json.loads(profile["preferred_roles"] or "[]")
-        profile["preferred_industries"] = json.loads(profile["preferred_industries"] or "[]")
-        profile["extracted_skills"] = json.loads(profile["extracted_skills"] or "[]")
+        for name in PROFILE_JSON_COLUMNS:
+            profile[name] = json.loads(profile[name] or "[]")
         
         return profile
     
+    def get_profile_json(self, user_id: str) -> Optional[str]:
+        """get_profile as JSON text, built by the database without decoding the JSON columns"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        if self._profile_json_sql is None:
+            fields = [(name, self.backend.json_value(f"COALESCE(NULLIF({name}, ''), '[]')")
+                       if name in PROFILE_JSON_COLUMNS else name)
+                      for name in self.backend.table_columns(cursor, "profiles") if name not in PROFILE_HIDDEN_COLUMNS]
+            self._profile_json_sql = f"SELECT {self.backend.json_object(fields)} FROM profiles WHERE user_id = ?"
+        cursor.execute(self._profile_json_sql, (user_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+    
+    def save_resume(self, user_id: str, file_name: str, parsed: dict):
+        """Store resume text and skills; contact fields only fill ones still empty"""
+        now = datetime.now().isoformat()
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT preferred_roles FROM profiles WHERE user_id = ?", (user_id,))
+        row = cursor.fetchone()
+        vector = profile_vector(parsed["text"], parsed["skills"], json.loads(row[0] or "[]") if row else [])
+        cursor.execute(
+            """INSERT INTO profiles (user_id, full_name, email, phone, linkedin_url,
+            resume_text, resume_file_name, extracted_skills, resume_vector, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                full_name = COALESCE(NULLIF(profiles.full_name, ''), excluded.full_name),
+                email = COALESCE(NULLIF(profiles.email, ''), excluded.email),
+                phone = COALESCE(NULLIF(profiles.phone, ''), excluded.phone),
+                linkedin_url = COALESCE(NULLIF(profiles.linkedin_url, ''), excluded.linkedin_url),
+                resume_text = excluded.resume_text,
+                resume_file_name = excluded.resume_file_name,
+                extracted_skills = excluded.extracted_skills,
+                resume_vector = excluded.resume_vector,
+                updated_at = excluded.updated_at""",
+            (user_id, parsed.get("fullName"), parsed.get("email"), parsed.get("phone"), parsed.get("linkedinUrl"),
+             parsed["text"], file_name, json.dumps(parsed["skills"]), vector, now, now)
+        )
+        conn.commit()
+        conn.close()
+    
+    def get_resume_vector(self, user_id: str) -> bytes:
+        """profiles.resume_vector (vectors.py); empty without a profile or anything in it"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT resume_vector FROM profiles WHERE user_id = ?", (user_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return bytes(row[0]) if row and row[0] else b""
+    
+    def get_resume_parse(self, content_hash: str) -> Optional[dict]:
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT result FROM resume_parses WHERE content_hash = ?", (content_hash,))
+        row = cursor.fetchone()
+        conn.close()
+        return json.loads(row[0]) if row else None
+    
+    def put_resume_parse(self, content_hash: str, result: dict):
+        conn = self.get_conn()
+        conn.execute(
+            """INSERT INTO resume_parses (content_hash, result, created_at) VALUES (?, ?, ?)
+            ON CONFLICT(content_hash) DO UPDATE SET result = excluded.result, created_at = excluded.created_at""",
+            (content_hash, json.dumps(result), datetime.now().isoformat())
+        )
+        conn.commit()
+        conn.close()
+    
     # Saved jobs operations
     def save_job(self, user_id: str, job_id: str, job_data: dict, notes: str = ""):
         conn = self.get_conn()
         cursor = conn.cursor()
         cursor.execute(
-            """INSERT OR REPLACE INTO saved_jobs 
-            (user_id, job_id, job_data, notes, created_at)
-            VALUES (?, ?, ?, ?, ?)""",
+            """INSERT INTO saved_jobs (user_id, job_id, job_data, notes, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, job_id) DO UPDATE SET job_data = excluded.job_data, notes = excluded.notes,
+                status = 'saved', created_at = excluded.created_at""",
             (user_id, job_id, json.dumps(job_data), notes, datetime.now().isoformat())
         )
         conn.commit()
@@ -227,14 +826,57 @@ class Database:
         rows = cursor.fetchall()
         conn.close()
         
-        jobs = []
-        for row in rows:
-            job_data = json.loads(row[1])
-            job_data["saved_notes"] = row[2]
-            job_data["saved_status"] = row[3]
-            job_data["saved_at"] = row[4]
-            jobs.append(job_data)
-        return jobs
+        return [self._saved_job_from_row(row) for row in rows]
+    
+    def get_saved_jobs_json(self, user_id: str) -> str:
+        """
+        get_saved_jobs as a JSON array. The database adds the saved_* keys to
+        the stored job_data text, so no job is decoded into Python objects.
+        """
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        document = self.backend.json_with_keys(
+            "job_data", [("saved_notes", "notes"), ("saved_status", "status"), ("saved_at", "created_at")])
+        try:
+            cursor.execute(
+                f"SELECT {document} FROM saved_jobs WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,)
+            )
+            rows = cursor.fetchall()
+        except self.backend.InvalidJSON:
+            # job_data the database can't parse (json.dumps writes NaN as-is); take the slow path
+            return json.dumps(self.get_saved_jobs(user_id))
+        finally:
+            conn.close()
+        return "[" + ",".join([row[0] for row in rows]) + "]"
+    
+    @staticmethod
+    def _saved_job_from_row(row) -> dict:
+        job_data = json.loads(row[1])
+        job_data["saved_notes"] = row[2]
+        job_data["saved_status"] = row[3]
+        job_data["saved_at"] = row[4]
+        return job_data
+    
+    def iter_saved_jobs(self, user_id: str, batch_size: int = 500) -> Iterator[dict]:
+        """Stream saved jobs newest first, holding one batch of rows at a time"""
+        # Exports are consumed by StreamingResponse, which may resume the
+        # generator on a different threadpool thread between batches
+        conn = self.get_conn(check_same_thread=False)
+        try:
+            cursor = self.backend.stream_cursor(conn)
+            cursor.execute(
+                "SELECT job_id, job_data, notes, status, created_at FROM saved_jobs WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,)
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._saved_job_from_row(row)
+        finally:
+            conn.close()
     
     def delete_saved_job(self, user_id: str, job_id: str):
         conn = self.get_conn()
@@ -248,26 +890,128 @@ class Database:
     
     # Application tracking
     def create_application(self, user_id: str, job_id: str, company: str, role: str, 
-                          cover_letter: str = "", email_sent: str = "") -> int:
+                          cover_letter: str = "", email_sent: str = "", doc_id: Optional[int] = None) -> int:
         conn = self.get_conn()
-        cursor = conn.cursor()
         now = datetime.now().isoformat()
-        cursor.execute(
-            """INSERT INTO applications 
-            (user_id, job_id, company, role, cover_letter, email_sent, status, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (user_id, job_id, company, role, cover_letter, email_sent, "draft", now, now)
+        try:
+            with conn:
+                app_id = conn.execute(
+                    """INSERT INTO applications 
+                    (user_id, job_id, company, role, cover_letter, email_sent, doc_id, status, created_at, updated_at,
+                    status_changed_at, reached)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) RETURNING id""",
+                    (user_id, job_id, company, role, cover_letter, email_sent, doc_id, "draft", now, now,
+                     now, REACHED["draft"])
+                ).fetchone()[0]
+                self._log_status_change(conn, user_id, app_id, None, None, 0, "draft", now)
+        finally:
+            conn.close()
+        return app_id
+    
+    def set_application_status(self, user_id: str, app_id: int, status: str) -> Optional[dict]:
+        """
+        Move an application to status (one of funnel.STAGES), logging the
+        change and updating application_stats in the same transaction.
+        None if the user has no such application.
+        """
+        conn = self.get_conn()
+        try:
+            with conn:
+                while True:
+                    row = conn.execute(
+                        """SELECT status, COALESCE(status_changed_at, updated_at), reached FROM applications
+                        WHERE id = ? AND user_id = ?""",
+                        (app_id, user_id)
+                    ).fetchone()
+                    if row is None:
+                        return None
+                    previous, since, reached = row
+                    if previous == status:
+                        return {"id": app_id, "status": status, "previous_status": previous, "status_changed_at": since}
+                    now = datetime.now().isoformat()
+                    # Only if nothing moved it since the read; otherwise read again (now holding the write lock)
+                    moved = conn.execute(
+                        """UPDATE applications SET status = ?, status_changed_at = ?, reached = reached | ?,
+                        applied_at = COALESCE(applied_at, ?), updated_at = ?
+                        WHERE id = ? AND status = ? AND COALESCE(status_changed_at, updated_at) = ?""",
+                        (status, now, REACHED[status], now if status == "sent" else None, now,
+                         app_id, previous, since)
+                    ).rowcount
+                    if moved:
+                        break
+                self._log_status_change(conn, user_id, app_id, previous, since, reached, status, now)
+        finally:
+            conn.close()
+        return {"id": app_id, "status": status, "previous_status": previous, "status_changed_at": now}
+    
+    @staticmethod
+    def _log_status_change(conn, user_id: str, app_id: int, previous: Optional[str], since: Optional[str],
+                           reached: int, status: str, now: str):
+        """application_events row and application_stats deltas for one status change"""
+        at = epoch(now)
+        seconds = None if previous is None else max(0, at - epoch(since))
+        conn.execute(
+            """INSERT INTO application_events
+            (application_id, user_id, from_status, to_status, seconds_in_stage, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)""",
+            (app_id, user_id, previous, status, seconds, now)
         )
-        app_id = cursor.lastrowid
-        conn.commit()
+        conn.executemany(ADD_APPLICATION_STATS_SQL,
+                         transition(user_id, previous, None if since is None else epoch(since), reached, status, at))
+    
+    def get_application_stats(self, user_id: str) -> List[tuple]:
+        """The user's application_stats rows (STATS_COLUMNS order), for funnel.summarise"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(STATS_COLUMNS)} FROM application_stats WHERE user_id = ?", (user_id,))
+        rows = cursor.fetchall()
         conn.close()
-        return app_id
+        return rows
+    
+    def iter_application_stats(self, batch_size: int = 5000) -> Iterator[tuple]:
+        """Every application_stats row (STATS_COLUMNS order)"""
+        yield from self._iter_rows(f"SELECT {', '.join(STATS_COLUMNS)} FROM application_stats", batch_size)
+    
+    def iter_application_states(self, batch_size: int = 5000) -> Iterator[tuple]:
+        """(user_id, status, status_changed_at, reached) of every application"""
+        yield from self._iter_rows(APPLICATION_STATES_SQL, batch_size)
+    
+    def get_application_exit_totals(self) -> List[tuple]:
+        """(user_id, status, exits, exit_seconds) from the status change log"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute(APPLICATION_EXITS_SQL + " GROUP BY user_id, from_status")
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+    
+    def rebuild_application_stats(self, user_id: Optional[str] = None):
+        """Recompute one user's application_stats (or everyone's) from applications and their events"""
+        conn = self.get_conn()
+        try:
+            with conn:
+                _rebuild_application_stats(conn, self.backend, user_id)
+        finally:
+            conn.close()
+    
+    def _iter_rows(self, sql: str, batch_size: int) -> Iterator[tuple]:
+        conn = self.get_conn(check_same_thread=False)
+        try:
+            cursor = self.backend.stream_cursor(conn)
+            cursor.execute(sql)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
     
     def get_applications(self, user_id: str) -> List[dict]:
         conn = self.get_conn()
         cursor = conn.cursor()
         cursor.execute(
-            """SELECT id, job_id, company, role, status, applied_at, notes, created_at 
+            """SELECT id, job_id, company, role, status, applied_at, notes, created_at, doc_id, status_changed_at
             FROM applications WHERE user_id = ? ORDER BY created_at DESC""",
             (user_id,)
         )
@@ -284,10 +1028,456 @@ class Database:
                 "status": row[4],
                 "applied_at": row[5],
                 "notes": row[6],
-                "created_at": row[7]
+                "created_at": row[7],
+                "doc_id": row[8],
+                "status_changed_at": row[9]
             })
         return apps
+    
+    def get_application(self, user_id: str, app_id: int) -> Optional[dict]:
+        """One application with its generated draft (if any) resolved"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT a.*, d.content AS doc FROM applications a
+            LEFT JOIN generated_docs d ON d.id = a.doc_id AND d.user_id = a.user_id
+            WHERE a.user_id = ? AND a.id = ?""",
+            (user_id, app_id)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            return None
+        application = dict(zip([desc[0] for desc in cursor.description], row))
+        application["doc"] = json.loads(application["doc"]) if application["doc"] else None
+        return application
+    
+    def iter_applications(self, user_id: str, batch_size: int = 500) -> Iterator[dict]:
+        """Stream applications newest first, holding one batch of rows at a time"""
+        conn = self.get_conn(check_same_thread=False)
+        try:
+            cursor = self.backend.stream_cursor(conn)
+            cursor.execute(
+                """SELECT id, job_id, company, role, status, applied_at, notes, created_at, updated_at
+                FROM applications WHERE user_id = ? ORDER BY created_at DESC""",
+                (user_id,)
+            )
+            columns = [desc[0] for desc in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            conn.close()
+
+    # Bulk imports: each call is one transaction over a batch of rows
+    def upsert_jobs(self, rows: List[tuple]) -> List[str]:
+        """
+        Insert or update catalogue jobs; rows are tuples in JOB_COLUMNS order.
+        Returns the ids that were not in the catalogue before.
+        """
+        conn = self.get_conn()
+        try:
+            with conn:
+                ids = list(dict.fromkeys(row[0] for row in rows))
+                existing = self._existing_job_ids(conn, ids)
+                self.backend.upsert_many(conn, "jobs", JOB_COLUMNS, ["id"], rows)
+                self._keep_job_checks(conn, [row[0] for row in rows])
+        finally:
+            conn.close()
+        return [job_id for job_id in ids if job_id not in existing]
+
+    @staticmethod
+    def _existing_job_ids(conn, job_ids: List[str]) -> set:
+        existing = set()
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            rows = conn.execute(f"SELECT id FROM jobs WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            existing.update(row[0] for row in rows.fetchall())
+        return existing
+    
+    @staticmethod
+    def _keep_job_checks(conn, job_ids: List[str]):
+        """
+        Re-apply liveness verdicts to re-imported jobs: the upsert overwrote
+        is_ghost_job with the scraper's value. A job now at a different URL
+        is a new posting, so its old verdict is dropped instead.
+        """
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            ids = ", ".join("?" * len(chunk))
+            conn.execute(f"""UPDATE jobs SET expired_at = NULL WHERE id IN ({ids}) AND expired_at IS NOT NULL
+                AND url != (SELECT url FROM job_checks WHERE job_id = jobs.id)""", chunk)
+            conn.execute(f"""DELETE FROM job_checks WHERE job_id IN ({ids})
+                AND url != (SELECT url FROM jobs WHERE id = job_checks.job_id)""", chunk)
+            conn.execute(f"""UPDATE jobs SET is_ghost_job = 1 WHERE id IN ({ids}) AND is_ghost_job = 0
+                AND id IN (SELECT job_id FROM job_checks WHERE flagged = 1)""", chunk)
+    
+    def get_jobs(self, job_ids: List[str]) -> dict:
+        """Catalogue jobs by id, as {id: job} with skills decoded"""
+        jobs = {}
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            cursor.execute(f"SELECT * FROM jobs WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            columns = [desc[0] for desc in cursor.description]
+            for row in cursor.fetchall():
+                job = dict(zip(columns, row))
+                job["skills"] = json.loads(job["skills"] or "[]")
+                jobs[job["id"]] = job
+        conn.close()
+        return jobs
+    
+    def iter_jobs(self, batch_size: int = 1000, include_expired: bool = False) -> Iterator[dict]:
+        """Whole catalogue (CATALOGUE_COLUMNS) newest posting first, skills decoded, one batch of rows in memory"""
+        conn = self.get_conn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {', '.join(CATALOGUE_COLUMNS)} FROM jobs"
+                           + ("" if include_expired else " WHERE expired_at IS NULL") + " ORDER BY date_posted DESC, id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    job = dict(zip(CATALOGUE_COLUMNS, row))
+                    job["skills"] = json.loads(job["skills"] or "[]")
+                    yield job
+        finally:
+            conn.close()
+    
+    def get_job_description(self, job_id: str) -> Optional[str]:
+        """Plain-text description of a catalogue job (descriptions.py), None if there is no such job"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT description_text FROM jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return None if row is None else row[0] or ""
+    
+    def upsert_dream_companies(self, user_id: str, rows: List[tuple]) -> int:
+        """Insert or update a user's watched companies; rows are tuples in DREAM_COMPANY_COLUMNS order"""
+        conn = self.get_conn()
+        try:
+            with conn:
+                self.backend.upsert_many(conn, "dream_companies", ["user_id"] + DREAM_COMPANY_COLUMNS,
+                                         ["user_id", "company"], [(user_id,) + tuple(row) for row in rows])
+                bump_version(conn, ALERT_SOURCES)
+        finally:
+            conn.close()
+        return len(rows)
+    
+    def upsert_search_config(self, user_id: str, rows: List[tuple]) -> int:
+        """Insert or update a user's search preferences; rows are (field, value) tuples"""
+        conn = self.get_conn()
+        try:
+            with conn:
+                self.backend.upsert_many(conn, "search_config", ["user_id", "field", "value"], ["user_id", "field"],
+                                         [(user_id, field, value) for field, value in rows])
+                bump_version(conn, ALERT_SOURCES)
+        finally:
+            conn.close()
+        return len(rows)
+
+    # Posting liveness (see liveness.py)
+    def get_liveness_candidates(self, now: str) -> List[dict]:
+        """Unexpired jobs with a URL whose next check is due, with their last check and save count"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT job_id, COUNT(*) FROM saved_jobs GROUP BY job_id")
+        saves = dict(cursor.fetchall())
+        cursor.execute(
+            """SELECT j.id, j.url, j.date_posted, j.is_ghost_job, c.url AS checked_url, c.verdict, c.etag,
+                c.last_modified, COALESCE(c.failures, 0) AS failures, COALESCE(c.flagged, 0) AS flagged
+            FROM jobs j LEFT JOIN job_checks c ON c.job_id = j.id
+            WHERE j.expired_at IS NULL AND COALESCE(j.url, '') != ''
+            AND (c.next_check_at IS NULL OR c.next_check_at <= ?)""",
+            (now,)
+        )
+        columns = [desc[0] for desc in cursor.description]
+        jobs = []
+        for row in cursor.fetchall():
+            job = dict(zip(columns, row))
+            job["saves"] = saves.get(job["id"], 0)
+            jobs.append(job)
+        conn.close()
+        return jobs
+    
+    def lease_job_checks(self, rows: List[tuple]):
+        """Claim (job_id, url, until) for a run, so runs in other workers skip those jobs meanwhile"""
+        conn = self.get_conn()
+        try:
+            with conn:
+                self.backend.upsert_many(conn, "job_checks", ["job_id", "url", "next_check_at"], ["job_id"], rows)
+        finally:
+            conn.close()
+    
+    def record_job_checks(self, rows: List[tuple], job_updates: List[tuple]):
+        """
+        Store check results (tuples in JOB_CHECK_COLUMNS order) and apply
+        (is_ghost_job, expired_at, job_id) flag changes, in one transaction
+        """
+        conn = self.get_conn()
+        try:
+            with conn:
+                self.backend.upsert_many(conn, "job_checks", JOB_CHECK_COLUMNS, ["job_id"], rows)
+                if job_updates:
+                    conn.executemany("UPDATE jobs SET is_ghost_job = ?, expired_at = ? WHERE id = ?", job_updates)
+        finally:
+            conn.close()
+    
+    # Job alerts
+    def create_saved_search(self, user_id: str, name: str, roles: List[str],
+                            keywords: List[str], industries: List[str]) -> int:
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            """INSERT INTO saved_searches (user_id, name, roles, keywords, industries, created_at)
+            VALUES (?, ?, ?, ?, ?, ?) RETURNING id""",
+            (user_id, name, json.dumps(roles), json.dumps(keywords), json.dumps(industries),
+             datetime.now().isoformat())
+        )
+        search_id = cursor.fetchone()[0]
+        bump_version(conn, ALERT_SOURCES)
+        conn.commit()
+        conn.close()
+        return search_id
+    
+    def get_saved_searches(self, user_id: Optional[str] = None) -> List[dict]:
+        """A user's saved searches, or everyone's when user_id is None"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        sql = "SELECT id, user_id, name, roles, keywords, industries, created_at FROM saved_searches"
+        cursor.execute(sql + (" WHERE user_id = ?" if user_id else ""), (user_id,) if user_id else ())
+        rows = cursor.fetchall()
+        conn.close()
+        return [{
+            "id": row[0],
+            "user_id": row[1],
+            "name": row[2],
+            "roles": json.loads(row[3] or "[]"),
+            "keywords": json.loads(row[4] or "[]"),
+            "industries": json.loads(row[5] or "[]"),
+            "created_at": row[6]
+        } for row in rows]
+    
+    def delete_saved_search(self, user_id: str, search_id: int) -> bool:
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM saved_searches WHERE id = ? AND user_id = ?", (search_id, user_id))
+        deleted = cursor.rowcount > 0
+        if deleted:
+            bump_version(conn, ALERT_SOURCES)
+        conn.commit()
+        conn.close()
+        return deleted
+    
+    def get_search_configs(self) -> dict:
+        """{user_id: {field: value}} for every user's search_config"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_id, field, value FROM search_config")
+        configs = {}
+        for user_id, name, value in cursor.fetchall():
+            configs.setdefault(user_id, {})[name] = value
+        conn.close()
+        return configs
+    
+    def get_watched_companies(self) -> List[tuple]:
+        """(user_id, company) for every dream company"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT user_id, company FROM dream_companies")
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+    
+    def get_company_careers_urls(self) -> List[tuple]:
+        """Distinct (company, careers_url) pairs across every user's dream companies"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT company, careers_url FROM dream_companies WHERE COALESCE(careers_url, '') != ''")
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+    
+    def alert_sources_signature(self) -> tuple:
+        """
+        Changes whenever saved searches, search configs or dream companies
+        change: the ALERT_SOURCES version every write through Database bumps,
+        plus row counts so rows added or deleted with raw SQL still show
+        """
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("""SELECT
+            (SELECT COALESCE(MAX(version), 0) FROM change_versions WHERE name = ?),
+            (SELECT COUNT(*) || ':' || COALESCE(MAX(id), 0) FROM saved_searches),
+            (SELECT COUNT(*) FROM search_config),
+            (SELECT COUNT(*) FROM dream_companies)""", (ALERT_SOURCES,))
+        row = cursor.fetchone()
+        conn.close()
+        return tuple(row)
+    
+    def add_notifications(self, rows: List[tuple]) -> int:
+        """Insert (user_id, job_id, subscription, created_at) rows, ignoring ones already sent"""
+        conn = self.get_conn()
+        try:
+            with conn:
+                return conn.executemany(
+                    """INSERT INTO notifications (user_id, job_id, subscription, created_at)
+                    VALUES (?, ?, ?, ?) ON CONFLICT(user_id, job_id) DO NOTHING""",
+                    rows
+                ).rowcount
+        finally:
+            conn.close()
+    
+    def get_notifications(self, user_id: str, unread_only: bool = False, limit: int = 100,
+                          after_id: Optional[int] = None) -> List[dict]:
+        """Newest first, or oldest first from after_id when resuming a push stream"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        where, params = "n.user_id = ?", [user_id]
+        if unread_only:
+            where += " AND n.read_at IS NULL"
+        if after_id is not None:
+            where += " AND n.id > ?"
+            params.append(after_id)
+        cursor.execute(
+            """SELECT n.id, n.job_id, n.subscription, n.created_at, n.read_at, j.company, j.role, j.url
+            FROM notifications n LEFT JOIN jobs j ON j.id = n.job_id
+            WHERE """ + where + " ORDER BY n.id " + ("ASC" if after_id is not None else "DESC") + " LIMIT ?",
+            params + [limit]
+        )
+        columns = [desc[0] for desc in cursor.description]
+        rows = cursor.fetchall()
+        conn.close()
+        return [dict(zip(columns, row)) for row in rows]
+    
+    def latest_notification_id(self, user_id: str) -> int:
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM notifications WHERE user_id = ?", (user_id,))
+        latest = cursor.fetchone()[0]
+        conn.close()
+        return latest
+    
+    def mark_notifications_read(self, user_id: str, ids: Optional[List[int]] = None) -> int:
+        """Mark the given notifications (or all of them) as read"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        now = datetime.now().isoformat()
+        if ids is None:
+            cursor.execute("UPDATE notifications SET read_at = ? WHERE user_id = ? AND read_at IS NULL",
+                           (now, user_id))
+        else:
+            cursor.executemany("UPDATE notifications SET read_at = ? WHERE user_id = ? AND id = ? AND read_at IS NULL",
+                               [(now, user_id, i) for i in ids])
+        updated = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return updated
+    
+    # Generated application drafts (see docgen)
+    def get_generated_docs(self, user_id: str, profile_version: str, job_ids: List[str],
+                           template: str, hiring_manager: str) -> dict:
+        """Stored drafts for these jobs, as {job_id: (doc_id, content)}"""
+        docs = {}
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            cursor.execute(
+                f"""SELECT job_id, id, content FROM generated_docs
+                WHERE user_id = ? AND profile_version = ? AND template = ? AND hiring_manager = ?
+                AND job_id IN ({', '.join('?' * len(chunk))})""",
+                [user_id, profile_version, template, hiring_manager] + chunk
+            )
+            for job_id, doc_id, content in cursor.fetchall():
+                docs[job_id] = (doc_id, json.loads(content))
+        conn.close()
+        return docs
+    
+    def add_generated_docs(self, user_id: str, profile_version: str, template: str, hiring_manager: str,
+                           rows: List[tuple]) -> dict:
+        """Store (job_id, content JSON) drafts in one transaction; returns {job_id: doc_id}"""
+        now = datetime.now().isoformat()
+        ids = {}
+        conn = self.get_conn()
+        try:
+            with conn:
+                for job_id, content in rows:
+                    # A concurrent batch may have stored the same key first; keep its row
+                    cursor = conn.execute(
+                        """INSERT INTO generated_docs
+                        (user_id, profile_version, job_id, template, hiring_manager, content, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(user_id, profile_version, job_id, template, hiring_manager)
+                        DO UPDATE SET created_at = generated_docs.created_at RETURNING id""",
+                        (user_id, profile_version, job_id, template, hiring_manager, content, now)
+                    )
+                    ids[job_id] = cursor.fetchone()[0]
+        finally:
+            conn.close()
+        return ids
+    
+    def get_generated_doc(self, user_id: str, doc_id: int) -> Optional[dict]:
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT id, job_id, template, hiring_manager, profile_version, content, created_at
+            FROM generated_docs WHERE user_id = ? AND id = ?""",
+            (user_id, doc_id)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            return None
+        doc = dict(zip([desc[0] for desc in cursor.description], row))
+        doc.update(json.loads(doc.pop("content")))
+        return doc
+    
+    # Push relay (see push.SQLiteBroker)
+    def add_push_events(self, rows: List[tuple]):
+        """Append (channel, payload) rows in one transaction"""
+        now = time.time()
+        conn = self.get_conn()
+        try:
+            with conn:
+                self.backend.insert_many(conn, "push_events", ["channel", "payload", "created_at"],
+                                         [(channel, payload, now) for channel, payload in rows])
+        finally:
+            conn.close()
+    
+    def get_push_events(self, after_id: int, limit: int = 1000) -> List[tuple]:
+        """(id, channel, payload) rows newer than after_id, oldest first"""
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, channel, payload FROM push_events WHERE id > ? ORDER BY id LIMIT ?",
+                       (after_id, limit))
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+    
+    def latest_push_event_id(self) -> int:
+        conn = self.get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM push_events")
+        latest = cursor.fetchone()[0]
+        conn.close()
+        return latest
+    
+    def prune_push_events(self, older_than: float) -> int:
+        conn = self.get_conn()
+        try:
+            with conn:
+                return conn.execute("DELETE FROM push_events WHERE created_at < ?", (older_than,)).rowcount
+        finally:
+            conn.close()
 
 # Initialize on import
+default_backend = open_backend()
 init_db()
 db = Database()
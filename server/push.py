@@ -0,0 +1,231 @@
+"""
+Push delivery of job matches and catalogue updates
+Clients keep one SSE (or WebSocket) stream open instead of polling. Messages
+go through a broker with one channel per user plus ALL for everyone:
+
+    {"type": "notifications"}            new alert matches for that user
+    {"type": "jobs", "ingested": ...}    the job catalogue was refreshed
+
+A notifications message is only a wake-up. The stream then reads the user's
+notifications newer than the last one it sent. Those ids double as SSE event
+ids, so a reconnecting client (Last-Event-ID) gets everything it missed from
+the database. No per-connection backlog needs to be kept.
+
+LocalBroker delivers inside one process. With several uvicorn workers, set
+JOBHUNT_PUSH_BROKER=sqlite: messages are then relayed through the
+push_events table, which every worker polls. A Redis/Postgres broker would
+plug in the same way, by overriding publish/start/stop.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from functools import partial
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from metrics import PUSH_EVENTS
+from models import db as default_db
+
+logger = logging.getLogger(__name__)
+
+ALL = "*"
+SUBSCRIPTION_QUEUE_SIZE = 32  # messages are wake-ups, so dropping old ones loses nothing
+REPLAY_BATCH = 200
+SQLITE_POLL_SECONDS = float(os.getenv("JOBHUNT_PUSH_POLL_SECONDS", "0.5"))
+SQLITE_RETENTION_SECONDS = 300
+
+
+class Subscription:
+    """Inbox of one connected stream; only touched from the event loop"""
+    __slots__ = ("channels", "_queue", "_ready")
+
+    def __init__(self, channels: Tuple[str, ...]):
+        self.channels = channels
+        self._queue = deque(maxlen=SUBSCRIPTION_QUEUE_SIZE)
+        self._ready = asyncio.Event()
+
+    def put(self, message: dict):
+        if not self._queue or self._queue[-1] != message:  # coalesce repeated wake-ups
+            self._queue.append(message)
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Next message, or None after timeout seconds without one"""
+        if not self._queue:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._queue.popleft()
+
+
+class LocalBroker:
+    """Fans messages out to the subscriptions of this process"""
+
+    def __init__(self):
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, *channels: str) -> Subscription:
+        """Called from the event loop serving the stream"""
+        self._loop = asyncio.get_running_loop()
+        sub = Subscription(channels)
+        for channel in channels:
+            self._channels.setdefault(channel, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        for channel in sub.channels:
+            subs = self._channels.get(channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._channels[channel]
+
+    def publish(self, channel: str, message: dict):
+        """Send message to a channel; safe to call from any thread"""
+        self.publish_many([(channel, message)])
+
+    def publish_many(self, messages: List[Tuple[str, dict]]):
+        for channel, message in messages:
+            self._dispatch(channel, message)
+
+    def _dispatch(self, channel: str, message: dict):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # nobody has subscribed in this process yet
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(channel, message)
+        else:
+            # One hop onto the loop per message, however many subscribers it has
+            loop.call_soon_threadsafe(self._deliver, channel, message)
+
+    def _deliver(self, channel: str, message: dict):
+        for sub in list(self._channels.get(channel, ())):
+            sub.put(message)
+
+
+class SQLiteBroker(LocalBroker):
+    """Relays messages between worker processes through the push_events table"""
+
+    def __init__(self, database=None, poll_seconds: float = SQLITE_POLL_SECONDS):
+        super().__init__()
+        self._database = database or default_db
+        self.poll_seconds = poll_seconds
+        self._last_id = 0
+        self._poller: Optional[asyncio.Task] = None
+
+    def publish_many(self, messages: List[Tuple[str, dict]]):
+        # Every worker, this one included, picks them up on its next poll
+        self._database.add_push_events([(channel, json.dumps(message)) for channel, message in messages])
+
+    async def start(self):
+        await super().start()
+        if self._poller is None:
+            self._last_id = await self._run(self._database.latest_push_event_id)
+            self._poller = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, partial(fn, *args))
+
+    async def _poll(self):
+        pruned_at = 0.0
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                rows = await self._run(self._database.get_push_events, self._last_id)
+                for event_id, channel, payload in rows:
+                    self._last_id = event_id
+                    self._deliver(channel, json.loads(payload))
+                if time.time() - pruned_at > SQLITE_RETENTION_SECONDS / 5:
+                    pruned_at = time.time()
+                    await self._run(self._database.prune_push_events, pruned_at - SQLITE_RETENTION_SECONDS)
+            except Exception:
+                logger.exception("Polling push_events failed")
+
+
+BROKERS = {"local": LocalBroker, "sqlite": SQLiteBroker}
+
+
+def broker_from_env() -> LocalBroker:
+    name = os.getenv("JOBHUNT_PUSH_BROKER", "local")
+    if name not in BROKERS:
+        raise ValueError(f"Unknown JOBHUNT_PUSH_BROKER {name!r}; expected one of {', '.join(BROKERS)}")
+    return BROKERS[name]()
+
+
+broker = broker_from_env()
+
+
+def publish_matches(user_ids: Set[str]):
+    """alerts.ALERT_HOOKS callback: wake the streams of users with new notifications"""
+    broker.publish_many([(user_id, {"type": "notifications"}) for user_id in user_ids])
+
+
+def publish_jobs_updated(stats: dict):
+    """Tell every connected client the job catalogue changed"""
+    broker.publish(ALL, {"type": "jobs", "ingested": stats.get("ingested", 0),
+                         "last_scraped": stats.get("last_scraped")})
+
+
+async def user_events(user_id: str, last_event_id: Optional[int] = None, keepalive: float = 15.0,
+                      database=None) -> AsyncIterator[Optional[Tuple[Optional[int], str, dict]]]:
+    """
+    Yield (event_id, event, data) for one user's stream, or None when keepalive
+    seconds pass quietly. Match events carry the notification id; resuming from
+    last_event_id replays newer notifications first.
+    """
+    database = database or default_db
+    loop = asyncio.get_running_loop()
+    # Subscribe before reading so nothing published in between is lost
+    sub = broker.subscribe(user_id, ALL)
+    try:
+        replay = last_event_id is not None
+        if not replay:
+            last_event_id = await loop.run_in_executor(None, database.latest_notification_id, user_id)
+        yield None, "ready", {"last_event_id": last_event_id}
+        while True:
+            if replay:
+                rows = await loop.run_in_executor(
+                    None, partial(database.get_notifications, user_id, limit=REPLAY_BATCH, after_id=last_event_id))
+                for row in rows:
+                    last_event_id = row["id"]
+                    PUSH_EVENTS.inc("match")
+                    yield row["id"], "match", row
+                replay = len(rows) == REPLAY_BATCH
+                continue
+            message = await sub.get(keepalive)
+            if message is None:
+                yield None
+            elif message["type"] == "notifications":
+                replay = True
+            else:
+                PUSH_EVENTS.inc(message["type"])
+                yield None, message["type"], message
+    finally:
+        broker.unsubscribe(sub)
+
+
+def format_sse(event_id: Optional[int], event: str, data: dict) -> str:
+    """One text/event-stream frame; events without an id leave Last-Event-ID alone"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
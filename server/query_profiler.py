@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+SQL query profiler and slow-query log for models.Database
+
+Opt-in: set JOBHUNT_SLOW_QUERY_MS to a threshold in milliseconds and every
+statement slower than that is written as one JSON line to a rotating log
+(JOBHUNT_SLOW_QUERY_LOG, default server/data/slow_queries.log) with its
+normalised SQL, parameter shape, rows returned, wall time, calling Database
+method and EXPLAIN QUERY PLAN.
+
+Summarise the log:
+    python query_profiler.py [LOG] --top 20 --sort total
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_LOG_PATH = Path(__file__).parent / "data" / "slow_queries.log"
+MODELS_FILE = str(Path(__file__).parent / "models.py")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# SQL text -> normalised form; Database statements are constants so this stays small
+_normalised: Dict[str, str] = {}
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and replace literals so equivalent statements group together"""
+    cached = _normalised.get(sql)
+    if cached is not None:
+        return cached
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = _PLACEHOLDER_LIST.sub("(?, ...)", text)
+    if len(_normalised) < 4096:
+        _normalised[sql] = text
+    return text
+
+
+def params_shape(params) -> str:
+    """Describe bound parameters by type only, e.g. "(str, int)", never their values"""
+    if params is None:
+        return "many"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+
+
+def _calling_method() -> Optional[str]:
+    """Name of the Database method (or other models.py function) that issued the statement"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if code.co_filename == MODELS_FILE and not code.co_name.startswith("_") \
+                and code.co_name not in ("execute", "executemany", "fetchone", "fetchmany",
+                                         "fetchall", "close", "__next__"):
+            return code.co_name
+        frame = frame.f_back
+    return None
+
+
+def explain(cursor, sql: str, params) -> List[str]:
+    """EXPLAIN QUERY PLAN on the statement's own connection, bypassing the trace hooks (SQLite only)"""
+    if params is None or not isinstance(cursor.connection, sqlite3.Connection):
+        return []
+    try:
+        plan_cursor = sqlite3.Connection.cursor(cursor.connection)
+        rows = plan_cursor.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        plan_cursor.close()
+    except sqlite3.Error:
+        return []
+    return [row[-1] for row in rows]
+
+
+class QueryProfiler:
+    """Query hook that logs statements slower than threshold_ms"""
+
+    def __init__(self, threshold_ms: float = 50.0, log_path: Path = DEFAULT_LOG_PATH,
+                 max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3, with_plan: bool = True):
+        self.threshold = threshold_ms / 1000.0
+        self.with_plan = with_plan
+        self.log_path = Path(log_path)
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(f"jobhunt.slow_queries.{self.log_path}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            handler = RotatingFileHandler(self.log_path, maxBytes=max_bytes,
+                                          backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+
+    def __call__(self, sql: str, params, seconds: float, rows: int, cursor):
+        if seconds < self.threshold:
+            return
+        entry = {
+            "ts": datetime.now().isoformat(),
+            "ms": round(seconds * 1000, 3),
+            "sql": normalize_sql(sql),
+            "params": params_shape(params),
+            "rows": rows,
+            "method": _calling_method(),
+        }
+        if self.with_plan:
+            entry["plan"] = explain(cursor, sql, params)
+        self.logger.info(json.dumps(entry))
+
+
+def install_from_env() -> Optional[QueryProfiler]:
+    """Register a QueryProfiler if JOBHUNT_SLOW_QUERY_MS is set"""
+    threshold = os.getenv("JOBHUNT_SLOW_QUERY_MS")
+    if not threshold:
+        return None
+    from models import add_query_hook
+
+    profiler = QueryProfiler(
+        threshold_ms=float(threshold),
+        log_path=Path(os.getenv("JOBHUNT_SLOW_QUERY_LOG", str(DEFAULT_LOG_PATH))),
+        with_plan=os.getenv("JOBHUNT_SLOW_QUERY_EXPLAIN", "1") != "0",
+    )
+    add_query_hook(profiler)
+    return profiler
+
+
+# Summary CLI
+def read_entries(log_path: Path):
+    """Yield entries from the log and its rotated backups (oldest first)"""
+    backups = sorted(log_path.parent.glob(log_path.name + ".*"),
+                     key=lambda p: int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0, reverse=True)
+    for path in backups + [log_path]:
+        if not path.exists():
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def summarize(entries) -> List[dict]:
+    groups: Dict[str, dict] = {}
+    for entry in entries:
+        group = groups.setdefault(entry["sql"], {
+            "sql": entry["sql"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "rows": 0, "methods": set(), "plan": [],
+        })
+        group["count"] += 1
+        group["total_ms"] += entry["ms"]
+        group["max_ms"] = max(group["max_ms"], entry["ms"])
+        group["rows"] += entry.get("rows", 0)
+        if entry.get("method"):
+            group["methods"].add(entry["method"])
+        if entry.get("plan"):
+            group["plan"] = entry["plan"]
+    for group in groups.values():
+        group["avg_ms"] = group["total_ms"] / group["count"]
+        group["avg_rows"] = group["rows"] / group["count"]
+        group["full_scan"] = any(step.startswith("SCAN") and "USING" not in step for step in group["plan"])
+        group["methods"] = sorted(group["methods"])
+    return list(groups.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise the slow-query log")
+    parser.add_argument("log", nargs="?", default=os.getenv("JOBHUNT_SLOW_QUERY_LOG", str(DEFAULT_LOG_PATH)))
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--sort", choices=["total", "count", "max", "avg"], default="total")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    groups = summarize(read_entries(Path(args.log)))
+    key = {"total": "total_ms", "count": "count", "max": "max_ms", "avg": "avg_ms"}[args.sort]
+    top = sorted(groups, key=lambda g: g[key], reverse=True)[:args.top]
+
+    if args.json:
+        print(json.dumps(top, indent=2))
+        return
+    if not top:
+        print(f"No slow queries logged in {args.log}")
+        return
+
+    print(f"{'calls':>7} {'total ms':>10} {'avg ms':>8} {'max ms':>8} {'avg rows':>9}  query")
+    for g in top:
+        print(f"{g['count']:>7} {g['total_ms']:>10.1f} {g['avg_ms']:>8.2f} {g['max_ms']:>8.2f} {g['avg_rows']:>9.1f}  {g['sql'][:100]}")
+        if g["methods"]:
+            print(f"{'':>46}method: {', '.join(g['methods'])}")
+        for step in g["plan"]:
+            flag = "  <- full table scan" if step.startswith("SCAN") and "USING" not in step else ""
+            print(f"{'':>46}plan: {step}{flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Resume text extraction
+Server-side counterpart of src/lib/pdfParser.ts and aiMatcher.extractSkills:
+pulls text out of PDF/TXT uploads, then the contact details and skills the
+profile form pre-fills. Everything here is pure and stdlib-only, so
+resume_pool can run it in worker processes.
+"""
+
+import re
+import zlib
+from typing import List, Optional
+
+# Bump when extraction changes so cached parses are redone
+PARSER_VERSION = 1
+
+MAX_INFLATED_BYTES = 32 * 1024 * 1024  # per upload, against compression bombs
+
+# Mirrors DESIGN_SKILLS in src/lib/aiMatcher.ts
+SKILLS = [
+    # Design tools
+    "figma", "sketch", "adobe xd", "adobe photoshop", "adobe illustrator",
+    "invision", "principle", "framer", "proto.io", "balsamiq",
+    "after effects", "premiere pro", "cinema 4d", "blender",
+    "midjourney", "dalle", "dall-e", "stable diffusion", "runway",
+    # Design disciplines
+    "ui design", "ux design", "product design", "visual design",
+    "interaction design", "motion design", "graphic design", "brand design",
+    "web design", "mobile design", "responsive design", "app design",
+    "design systems", "component library", "design ops",
+    # UX methods
+    "user research", "usability testing", "user interviews", "surveys",
+    "wireframing", "prototyping", "mockups", "user flows",
+    "information architecture", "ia", "content strategy",
+    "design thinking", "service design", "design sprint",
+    "journey mapping", "personas", "competitive analysis",
+    # Technical
+    "html", "css", "javascript", "typescript",
+    "react", "vue", "angular", "next.js", "gatsby",
+    "tailwind css", "styled components", "sass", "less",
+    "github", "git", "storybook",
+    # Collaboration tools
+    "jira", "confluence", "notion", "linear", "asana",
+    "miro", "figjam", "mural", "whimsical",
+    "slack", "discord", "zoom",
+    # Analytics
+    "google analytics", "mixpanel", "amplitude", "hotjar",
+    "optimizely", "vwo", "user testing",
+    # Soft skills
+    "communication", "collaboration", "presentation", "storytelling",
+    "problem solving", "critical thinking", "empathy",
+]
+
+# One pass over the text instead of a regex per skill. The lookahead lets
+# skills starting at different offsets overlap, as separate searches would.
+_SKILLS_RE = re.compile(
+    r"(?=\b(" + "|".join(re.escape(s) for s in sorted(SKILLS, key=len, reverse=True)) + r")\b)"
+)
+_SKILL_NAMES = {s: " ".join(w[:1].upper() + w[1:] for w in s.split(" ")) for s in SKILLS}
+
+_EMAIL = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+_PHONE = re.compile(r"(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{3,4}")
+_LINKEDIN = re.compile(r"linkedin\.com/in/[a-zA-Z0-9-]+", re.IGNORECASE)
+_NAME_WORD = re.compile(r"^[A-Z][a-z]+(-[A-Z][a-z]+)?$")
+
+# PDF content streams and text-showing operators
+_STREAM = re.compile(rb"<<(.*?)>>\s*stream\r?\n(.*?)\r?\n?endstream", re.DOTALL)
+_PDF_TOKEN = re.compile(rb"\((?:\\.|[^\\)])*\)|\[(?:\\.|[^\]])*\]|T[Jj*dDm]|'|\"|ET")
+_PDF_STRING = re.compile(rb"\((?:\\.|[^\\)])*\)|-?\d+\.?\d*")
+_PDF_ESCAPE = re.compile(rb"\\([nrtbf()\\]|[0-7]{1,3}|\r?\n)")
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+            b"(": b"(", b")": b")", b"\\": b"\\"}
+# TJ kerning this far negative (thousandths of an em) is a word gap
+_TJ_SPACE = -200
+
+
+class UnsupportedResume(ValueError):
+    """Upload that is neither a PDF nor plain text"""
+
+
+def _unescape(raw: bytes) -> bytes:
+    def sub(m):
+        esc = m.group(1)
+        if esc in _ESCAPES:
+            return _ESCAPES[esc]
+        if esc[:1].isdigit():
+            return bytes([int(esc, 8) & 0xFF])
+        return b""  # escaped line break
+    return _PDF_ESCAPE.sub(sub, raw)
+
+
+def _content_streams(data: bytes):
+    budget = MAX_INFLATED_BYTES
+    for match in _STREAM.finditer(data):
+        header, body = match.groups()
+        if b"/FlateDecode" in header:
+            inflater = zlib.decompressobj()
+            try:
+                body = inflater.decompress(body, budget)
+            except zlib.error:
+                continue
+        elif b"/Filter" in header:
+            continue  # images and other encodings carry no text we can read
+        budget -= len(body)
+        if budget <= 0:
+            return
+        yield body
+
+
+def _stream_text(content: bytes) -> str:
+    parts = []
+    pending = []  # strings since the last operator
+    for token in _PDF_TOKEN.findall(content):
+        first = token[:1]
+        if first == b"(":
+            pending = [_unescape(token[1:-1])]
+        elif first == b"[":
+            pending = []
+            for item in _PDF_STRING.findall(token[1:-1]):
+                if item[:1] == b"(":
+                    pending.append(_unescape(item[1:-1]))
+                elif float(item) < _TJ_SPACE:
+                    pending.append(b" ")
+        elif token in (b"Tj", b"TJ"):
+            parts.extend(pending)
+            pending = []
+        elif token in (b"'", b'"'):
+            parts.append(b"\n")
+            parts.extend(pending)
+            pending = []
+        elif token in (b"Td", b"TD", b"T*", b"Tm", b"ET"):
+            if parts and parts[-1] != b"\n":
+                parts.append(b"\n")
+    return b"".join(parts).decode("latin-1")
+
+
+def _readable_strings(data: bytes) -> str:
+    """Fallback of pdfParser.ts: printable ASCII inside (...) string literals"""
+    return " ".join(m.decode("ascii") for m in re.findall(rb"\(([\x20-\x7e]*?)\)", data))
+
+
+def extract_pdf_text(data: bytes) -> str:
+    text = "\n".join(filter(None, (_stream_text(s) for s in _content_streams(data))))
+    if len(text.strip()) < 100:
+        text = _readable_strings(data)
+    # Keep line breaks (extract_name looks at the first lines), squeeze the rest
+    lines = (re.sub(r"[^\x20-\x7E]+|\s+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def extract_text(data: bytes) -> tuple:
+    """(text, type) for a PDF or plain-text upload; sniffed from the bytes, not the file name"""
+    if data[:1024].lstrip().startswith(b"%PDF-"):
+        return extract_pdf_text(data), "pdf"
+    if b"\x00" in data[:4096]:
+        raise UnsupportedResume("Unsupported file format. Please upload a PDF or plain text resume.")
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+    return text.replace("\r\n", "\n").strip(), "txt"
+
+
+def extract_email(text: str) -> Optional[str]:
+    match = _EMAIL.search(text)
+    return match.group(0) if match else None
+
+
+def extract_phone(text: str) -> Optional[str]:
+    match = _PHONE.search(text)
+    return match.group(0) if match else None
+
+
+def extract_linkedin_url(text: str) -> Optional[str]:
+    match = _LINKEDIN.search(text)
+    return f"https://{match.group(0)}" if match else None
+
+
+def extract_name(text: str) -> Optional[str]:
+    """First of the top five lines made of 2-4 capitalised words"""
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    for line in lines[:5]:
+        words = line.split()
+        if 2 <= len(words) <= 4 and all(_NAME_WORD.match(w) for w in words):
+            return line
+    return None
+
+
+def extract_skills(text: str) -> List[str]:
+    found = dict.fromkeys(_SKILL_NAMES[m] for m in _SKILLS_RE.findall(text.lower()))
+    return list(found)
+
+
+def parse_resume(data: bytes) -> dict:
+    """Text, contact fields and skills from an uploaded resume"""
+    text, kind = extract_text(data)
+    return {
+        "type": kind,
+        "text": text,
+        "fullName": extract_name(text),
+        "email": extract_email(text),
+        "phone": extract_phone(text),
+        "linkedinUrl": extract_linkedin_url(text),
+        "skills": extract_skills(text),
+        "parser_version": PARSER_VERSION,
+    }
@@ -0,0 +1,124 @@
+"""
+Resume parsing off the request path
+Uploads are parsed by resume_parser in a small process pool, so a CPU-heavy
+PDF does not hold the GIL for the rest of the API. Results are cached in
+resume_parses by parser version and content hash, so identical uploads
+(re-uploads, the same file from several tabs) are parsed once. Concurrent
+uploads of the same bytes share one parse. The pool admits a bounded number
+of parses; past that, callers get ResumePoolBusy instead of an ever-growing
+queue. A parse that outlives PARSE_TIMEOUT_SECONDS or kills its worker takes
+the pool down with it (the workers are terminated, a fresh pool starts on the
+next upload) and surfaces as ResumeParseFailed.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Tuple
+
+from metrics import record_cache
+from models import db as default_db
+from resume_parser import PARSER_VERSION, parse_resume
+
+MAX_RESUME_BYTES = 10 * 1024 * 1024
+RESUME_WORKERS = int(os.getenv("JOBHUNT_RESUME_WORKERS", str(min(4, os.cpu_count() or 1))))
+QUEUED_PER_WORKER = 4
+ADMISSION_TIMEOUT_SECONDS = 5
+PARSE_TIMEOUT_SECONDS = 60
+
+
+class ResumePoolBusy(Exception):
+    """Every parse slot stayed taken for ADMISSION_TIMEOUT_SECONDS"""
+
+
+class ResumeParseFailed(Exception):
+    """The parse timed out or its worker died"""
+
+
+def content_hash(data: bytes) -> str:
+    return f"v{PARSER_VERSION}:{hashlib.sha256(data).hexdigest()}"
+
+
+class ResumePool:
+    """Process pool plus content-hash cache for resume parsing"""
+
+    def __init__(self, workers: int = RESUME_WORKERS, database=None):
+        self.workers = workers
+        self._database = database or default_db
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(workers * QUEUED_PER_WORKER)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Started on first use; spawn rather than fork, since the API process has threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def parse(self, data: bytes) -> Tuple[dict, bool]:
+        """Blocking; returns (parsed resume, served from cache)"""
+        key = content_hash(data)
+        cached = self._database.get_resume_parse(key)
+        record_cache("resume_parse", cached is not None)
+        if cached is not None:
+            return cached, True
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            try:
+                return future.result(PARSE_TIMEOUT_SECONDS), True
+            except TimeoutError:
+                raise ResumeParseFailed("Resume took too long to parse") from None
+
+        try:
+            if not self._slots.acquire(timeout=ADMISSION_TIMEOUT_SECONDS):
+                raise ResumePoolBusy()
+            pool = self._pool()
+            try:
+                result = pool.submit(parse_resume, data).result(PARSE_TIMEOUT_SECONDS)
+            except TimeoutError:
+                # The worker is still busy with it; kill it rather than let it parse on
+                self._discard(pool)
+                raise ResumeParseFailed("Resume took too long to parse") from None
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM on a hostile PDF); start a fresh pool next time
+                self._discard(pool)
+                raise ResumeParseFailed("Resume could not be parsed") from None
+            finally:
+                self._slots.release()
+            self._database.put_resume_parse(key, result)
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is pool:
+                self._executor = None
+        # shutdown() never stops a running task, so terminate the workers first
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+resume_pool = ResumePool()
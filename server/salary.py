@@ -0,0 +1,148 @@
+"""
+Salary normalisation
+Turns free-text salary_range values ("$120,000 - $150,000", "AUD 140k-170k",
+"$85/hr", "£70,000 - £85,000", "Not disclosed") into currency, pay period,
+min/max in the original units, and annual amounts in AUD and USD. This runs
+once at ingest, so filters and sorting compare numbers. Before, the browser
+(calculateSalaryMatch in aiMatcher.ts) re-parsed the text on every
+comparison.
+
+Conversion uses the local RATES_TO_AUD table, not a live feed: salaries are
+for filtering and ranking, not payroll.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+DEFAULT_CURRENCY = "AUD"
+# Units of AUD per unit of currency, as of RATES_AS_OF
+RATES_AS_OF = "2026-10-01"
+RATES_TO_AUD = {
+    "AUD": 1.0, "USD": 1.52, "GBP": 2.03, "EUR": 1.77, "NZD": 0.88,
+    "CAD": 1.09, "SGD": 1.17, "INR": 0.018, "JPY": 0.0101,
+}
+PERIOD_FACTORS = {"hour": 2080, "day": 260, "week": 52, "month": 12, "year": 1}
+# Annual AUD outside this band is a misparse ("3 days ago", a phone number), not a salary
+ANNUAL_AUD_BOUNDS = (10_000, 2_000_000)
+
+# Stored on the jobs table, in this order
+SALARY_COLUMNS = [
+    "salary_currency", "salary_period", "salary_min", "salary_max",
+    "salary_min_aud", "salary_max_aud", "salary_min_usd", "salary_max_usd",
+]
+
+_CODES = re.compile(r"\b(" + "|".join(RATES_TO_AUD).lower() + r")\b")
+# Longest first, so "ca$" isn't read as "a$"
+_SYMBOLS = [("au$", "AUD"), ("us$", "USD"), ("nz$", "NZD"), ("ca$", "CAD"), ("a$", "AUD"), ("c$", "CAD"),
+            ("s$", "SGD"), ("£", "GBP"), ("€", "EUR"), ("₹", "INR"), ("¥", "JPY")]
+_AMOUNT = re.compile(r"(\d[\d,.]*\d|\d)(?:\s*(k|m)\b)?(?![\d%])")
+# "60.000": dots as thousands separators
+_DOTTED_THOUSANDS = re.compile(r"\d{1,3}(?:\.\d{3})+")
+_PERIODS = [
+    ("hour", re.compile(r"/\s*h(?:ou)?r|per\s+hour|hourly|\bp\.?h\b|an\s+hour")),
+    ("day", re.compile(r"/\s*day|per\s+day|\bdaily\b|\bp\.?d\b")),
+    ("week", re.compile(r"/\s*w(?:ee)?k|per\s+week|\bweekly\b|\bp\.?w\b")),
+    ("month", re.compile(r"/\s*mo(?:nth)?\b|per\s+month|\bmonthly\b|\bp\.?c\.?m\b")),
+    ("year", re.compile(r"/\s*y(?:ea)?r|per\s+(?:year|annum)|\bannual(?:ly)?\b|\byearly\b|\bp\.?a\b")),
+]
+# Where a bare "$" is not Australian dollars
+_LOCATION_CURRENCIES = [
+    (re.compile(r"\b(united states|usa|u\.s\.|new york|san francisco|seattle|austin|boston|chicago|"
+                r"los angeles|remote - us)\b"), "USD"),
+    (re.compile(r"\b(new zealand|auckland|wellington)\b"), "NZD"),
+    (re.compile(r"\b(canada|toronto|vancouver|montreal)\b"), "CAD"),
+    (re.compile(r"\b(singapore)\b"), "SGD"),
+]
+
+
+@dataclass(frozen=True)
+class Salary:
+    currency: str
+    period: str
+    min: float
+    max: float
+    min_aud: int
+    max_aud: int
+    min_usd: int
+    max_usd: int
+
+    def columns(self) -> tuple:
+        """Values in SALARY_COLUMNS order"""
+        return (self.currency, self.period, self.min, self.max,
+                self.min_aud, self.max_aud, self.min_usd, self.max_usd)
+
+
+def _currency(text: str, location: str) -> str:
+    match = _CODES.search(text)
+    if match:
+        return match.group(1).upper()
+    for symbol, code in _SYMBOLS:
+        if symbol in text:
+            return code
+    location = location.lower()
+    for pattern, code in _LOCATION_CURRENCIES:
+        if pattern.search(location):
+            return code
+    return DEFAULT_CURRENCY
+
+
+def _period(text: str, largest: float) -> str:
+    for period, pattern in _PERIODS:
+        if pattern.search(text):
+            return period
+    # No unit given: go by size
+    if largest < 500:
+        return "hour"
+    if largest < 2_000:
+        return "day"
+    if largest < 20_000:
+        return "month"
+    return "year"
+
+
+def parse_salary(text: Optional[str], location: str = "") -> Optional[Salary]:
+    """Structured salary for a salary_range string, or None when it states no amount"""
+    text = (text or "").lower()
+    amounts = []
+    for number, suffix in _AMOUNT.findall(text):
+        if _DOTTED_THOUSANDS.fullmatch(number):
+            number = number.replace(".", "")
+        try:
+            value = float(number.replace(",", ""))
+        except ValueError:  # "1.2.3", a version number
+            continue
+        amounts.append((value, suffix))
+        if len(amounts) == 2:
+            break
+    if not amounts:
+        return None
+    # "140-170k": the second amount's suffix applies to the first too
+    if len(amounts) == 2 and amounts[1][1] and not amounts[0][1] and amounts[0][0] < 1_000:
+        amounts[0] = (amounts[0][0], amounts[1][1])
+    values = [value * {"k": 1e3, "m": 1e6}.get(suffix, 1) for value, suffix in amounts]
+    low, high = min(values), max(values)
+    if high <= 0:
+        return None
+
+    currency = _currency(text, location)
+    period = _period(text, high)
+    to_aud = RATES_TO_AUD[currency] * PERIOD_FACTORS[period]
+    min_aud, max_aud = round(low * to_aud), round(high * to_aud)
+    if not ANNUAL_AUD_BOUNDS[0] <= max_aud <= ANNUAL_AUD_BOUNDS[1]:
+        return None
+    usd = RATES_TO_AUD["USD"]
+    return Salary(currency, period, low, high, min_aud, max_aud, round(min_aud / usd), round(max_aud / usd))
+
+
+def salary_columns(text: Optional[str], location: str = "") -> tuple:
+    """SALARY_COLUMNS values for a job; currency '' marks text that was parsed but had no salary"""
+    salary = parse_salary(text, location)
+    if salary is None:
+        return ("",) + (None,) * (len(SALARY_COLUMNS) - 1)
+    return salary.columns()
+
+
+def to_aud(amount: float, currency: str = "AUD") -> int:
+    """Annual amount in another currency, in AUD"""
+    return round(amount * RATES_TO_AUD[currency.upper()])
@@ -0,0 +1,149 @@
+"""
+Background task runner for the JobHunt AI API
+Long-running work (job refreshes, ingestion) runs on a small worker pool
+instead of inside the HTTP request. Submitting a task whose dedupe key is
+already queued or running returns the existing task. Clients follow
+progress by polling the task or via Server-Sent Events.
+
+Tasks live in process memory: with several uvicorn workers, each worker
+deduplicates and reports only its own tasks.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_FINISHED_TASKS = 200
+FINISHED_STATES = ("succeeded", "failed")
+
+
+class Task:
+    """A unit of background work and its observable progress"""
+
+    def __init__(self, kind: str, dedupe_key: Optional[str] = None):
+        self.id = secrets.token_hex(8)
+        self.kind = kind
+        self.dedupe_key = dedupe_key
+        self.status = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.version = 0  # bumped on every change; SSE event ids
+        self._lock = threading.Lock()
+        self._waiters = []  # (loop, asyncio.Event) of SSE streams watching this task
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def report(self, progress: Optional[float] = None, message: Optional[str] = None):
+        """Called from the worker to publish progress (0..1) and a status line"""
+        self._update(progress=progress, message=message)
+
+    def _update(self, **changes):
+        with self._lock:
+            for key, value in changes.items():
+                if value is not None:
+                    setattr(self, key, value)
+            self.version += 1
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "version": self.version,
+        }
+
+    async def wait_for_change(self, seen_version: int, timeout: float) -> bool:
+        """Wait until version moves past seen_version; False on timeout"""
+        if self.version > seen_version:
+            return True
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            self._waiters.append(waiter)
+        try:
+            if self.version > seen_version:  # changed while registering
+                return True
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.remove(waiter)
+
+
+class TaskManager:
+    """Bounded worker pool plus an index of recent tasks"""
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobhunt-task")
+        self._tasks: "OrderedDict[str, Task]" = OrderedDict()
+        self._active: Dict[str, Task] = {}  # dedupe key -> queued/running task
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn: Callable[[Task], Any], dedupe_key: Optional[str] = None):
+        """Queue fn(task); returns (task, created) where created is False for a duplicate"""
+        with self._lock:
+            if dedupe_key is not None and dedupe_key in self._active:
+                return self._active[dedupe_key], False
+            task = Task(kind, dedupe_key)
+            self._tasks[task.id] = task
+            if dedupe_key is not None:
+                self._active[dedupe_key] = task
+            self._prune()
+        self._executor.submit(self._run, task, fn)
+        return task, True
+
+    def get(self, task_id: str) -> Optional[Task]:
+        return self._tasks.get(task_id)
+
+    def _run(self, task: Task, fn: Callable[[Task], Any]):
+        task._update(status="running", started_at=datetime.now().isoformat())
+        try:
+            result = fn(task)
+        except Exception as e:
+            logger.exception("Task %s (%s) failed", task.id, task.kind)
+            outcome = {"status": "failed", "error": str(e) or type(e).__name__}
+        else:
+            outcome = {"status": "succeeded", "progress": 1.0, "result": result}
+        with self._lock:
+            if task.dedupe_key is not None and self._active.get(task.dedupe_key) is task:
+                del self._active[task.dedupe_key]
+        task._update(finished_at=datetime.now().isoformat(), **outcome)
+
+    def _prune(self):
+        finished = [t.id for t in self._tasks.values() if t.finished]
+        for task_id in itertools.islice(finished, max(0, len(finished) - MAX_FINISHED_TASKS)):
+            del self._tasks[task_id]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+task_manager = TaskManager(max_workers=int(os.getenv("JOBHUNT_TASK_WORKERS", "2")))
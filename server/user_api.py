@@ -7,19 +7,23 @@ Simple JSON-based user account persistence
 import json
 import os
 import hashlib
+import threading
 from datetime import datetime
 from typing import Dict, Optional
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 from typing import List
 
+from metrics import MetricsMiddleware, record_cache, render_metrics, PROMETHEUS_CONTENT_TYPE
+
 # Setup paths
 BASE_DIR = Path(__file__).parent.parent
-DATA_DIR = BASE_DIR / "server" / "data"
-DATA_DIR.mkdir(exist_ok=True)
+DATA_DIR = Path(os.getenv("JOBHUNT_DATA_DIR", BASE_DIR / "server" / "data"))
+DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 USERS_FILE = DATA_DIR / "users.json"
 PROFILES_DIR = DATA_DIR / "profiles"
@@ -35,6 +39,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 # Pydantic models
@@ -99,10 +104,41 @@ def load_users() -> Dict:
         return json.load(f)
 
 
+def _write_json_atomic(path: Path, data):
+    """Write JSON via a temp file + rename so concurrent readers never see a partial file"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
 def save_users(users: Dict):
     """Save users to JSON file"""
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+    _write_json_atomic(USERS_FILE, users)
+    _user_count_cache["key"] = _users_file_key()
+    _user_count_cache["count"] = len(users)
+
+
+# (mtime_ns, size) of users.json -> user count, so health checks don't parse the file
+_user_count_cache = {"key": None, "count": 0}
+
+
+def _users_file_key():
+    stat = USERS_FILE.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def count_users() -> int:
+    """Count users, re-reading users.json only when it changed on disk"""
+    if not USERS_FILE.exists():
+        return 0
+    key = _users_file_key()
+    hit = _user_count_cache["key"] == key
+    record_cache("user_count", hit)
+    if not hit:
+        _user_count_cache["count"] = len(load_users())
+        _user_count_cache["key"] = key
+    return _user_count_cache["count"]
 
 
 def get_profile_path(user_id: str) -> Path:
@@ -112,9 +148,7 @@ def get_profile_path(user_id: str) -> Path:
 
 def save_user_profile(user_id: str, profile: dict):
     """Save user profile to file"""
-    profile_path = get_profile_path(user_id)
-    with open(profile_path, 'w') as f:
-        json.dump(profile, f, indent=2)
+    _write_json_atomic(get_profile_path(user_id), profile)
 
 
 def load_user_profile(user_id: str) -> Optional[dict]:
@@ -270,10 +304,16 @@ def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "users": len(load_users())
+        "users": count_users()
     }
 
 
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # Run server
 if __name__ == "__main__":
     import uvicorn
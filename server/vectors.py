@@ -0,0 +1,107 @@
+"""
+Text vectors for resume-to-job similarity
+Keyword matching (DESIGN_SKILLS in src/lib/aiMatcher.ts) only sees a fixed
+list of skills, so the rest of a resume counts for nothing. This turns
+text into a sparse hashed term-frequency vector, with no model to download:
+
+- Terms are lowercase words and adjacent word pairs, without stop words
+  and HTML. Role and skills count ROLE_WEIGHT and SKILL_WEIGHT times.
+- Each term hashes (crc32) into one of DIMENSIONS buckets, weighted
+  1 + log(count). Only the MAX_JOB_TERMS / MAX_PROFILE_TERMS heaviest
+  buckets are kept.
+- Stored as u16 bucket ids followed by u8 weights, the largest scaled to
+  255: 3 bytes per term.
+
+Ingest stores job_vector() in jobs.text_vector and profile saves store
+profile_vector() in profiles.resume_vector. IDF weighting needs the whole
+catalogue, so job_index applies it when it builds a snapshot, and serves
+nearest jobs from there.
+"""
+
+import heapq
+import html
+import math
+import re
+import zlib
+from array import array
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+from typing import Iterable, List, Optional, Tuple
+
+DIMENSIONS = 1 << 16
+MAX_JOB_TERMS = 64
+MAX_PROFILE_TERMS = 256
+ROLE_WEIGHT = 3
+SKILL_WEIGHT = 2
+
+_TAG = re.compile(r"<[^>]*>")
+# Keeps c++, c#, next.js and node.js whole
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each etc few for from further get had has have having
+he her here hers him his how i if in into is it its itself just may me more most must my no nor not now of
+off on once only or other our ours out over own per same she should so some such than that the their them
+then there these they this those through to too under until up us very via was we were what when where
+which while who whom why will with would you your yours
+""".split())
+
+
+def terms(text: str) -> List[str]:
+    """Words and adjacent word pairs of text, lowercased, without stop words or HTML tags"""
+    words = [w for w in _WORD.findall(_TAG.sub(" ", html.unescape(text or "")).lower()) if w not in STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+@lru_cache(maxsize=1 << 18)
+def _bucket(term: str) -> int:
+    return zlib.crc32(term.encode()) & (DIMENSIONS - 1)
+
+
+@lru_cache(maxsize=1 << 14)
+def _level(count: int, top: int) -> int:
+    """u8 weight of a bucket counted count times, where the heaviest one was counted top times"""
+    return round(255 * (1 + math.log(count)) / (1 + math.log(top)))
+
+
+def encode(buckets: Counter, max_terms: int) -> bytes:
+    """Sublinear, u8-quantised form of the max_terms heaviest bucket counts"""
+    kept = sorted(heapq.nlargest(max_terms, buckets.items(), key=itemgetter(1)))
+    if not kept:
+        return b""
+    top = max(count for _, count in kept)
+    return (array("H", [bucket for bucket, _ in kept]).tobytes()
+            + bytes([_level(count, top) for _, count in kept]))
+
+
+def decode(vector: Optional[bytes]) -> Tuple[memoryview, bytes]:
+    """(u16 bucket ids, u8 weights) of a stored vector; both empty for None"""
+    if not vector:
+        return memoryview(b"").cast("H"), b""
+    n = len(vector) // 3
+    return memoryview(vector)[:2 * n].cast("H"), bytes(vector[2 * n:])
+
+
+def _counts(parts: Iterable[Tuple[str, int]]) -> Counter:
+    """Bucket counts of (text, times counted) parts"""
+    buckets: Counter = Counter()
+    for text, weight in parts:
+        buckets.update(map(_bucket, terms(text) * weight))
+    return buckets
+
+
+def job_vector(job: dict) -> bytes:
+    """Vector of a normalised job dict (ingest.clean_job shape)"""
+    parts = [(job["role"], ROLE_WEIGHT), (job.get("industry") or "", 1),
+             (job.get("job_description_summary") or "", 1)]
+    parts += [(skill, SKILL_WEIGHT) for skill in job.get("skills") or []]
+    return encode(_counts(parts), MAX_JOB_TERMS)
+
+
+def profile_vector(resume_text: str, skills: Iterable[str] = (), roles: Iterable[str] = ()) -> bytes:
+    """Vector of a profile's resume, skills and preferred roles; empty when there is nothing to go on"""
+    parts = [(resume_text or "", 1)]
+    parts += [(skill, SKILL_WEIGHT) for skill in skills or []]
+    parts += [(role, ROLE_WEIGHT) for role in roles or []]
+    return encode(_counts(parts), MAX_PROFILE_TERMS)
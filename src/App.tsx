@@ -11,6 +11,8 @@ import { Button, Card, Badge, Input, Modal, EmptyState } from './components/ui';
 import { getRelativeTime, stripHtml, getTimezoneFromLocation, getRegionFromLocation, formatTime } from './lib/utils';
 import { useJobs } from './hooks/useJobs';
 import { useUserProfile } from './hooks/useUserProfile';
+import { useSimilarJobs } from './hooks/useSimilarJobs';
+import { useJobDescription } from './hooks/useJobDescription';
 import { isDesignRole } from './lib/aiMatcher';
 import { ProfileSetup } from './components/ProfileSetup';
 import { MatchScoreBadge } from './components/MatchScore';
@@ -291,8 +293,11 @@ function JobDetailModal({ job, isOpen, onClose, isSaved, onToggleSave, profile }
   profile: UserProfile | null;
 }) {
   const [activeTab, setActiveTab] = useState<'details' | 'apply'>('details');
+  const fullDescription = useJobDescription(isOpen && job ? job.id : null);
 
   if (!job) return null;
+  // Full text once loaded; until then the summary, or the scraped HTML for jobs.json listings
+  const description = fullDescription || job.description_summary || stripHtml(job.job_description_summary || '');
 
   return (
     <Modal
@@ -398,8 +403,8 @@ function JobDetailModal({ job, isOpen, onClose, isSaved, onToggleSave, profile }
 
           <div className="mb-6">
             <h3 className="font-semibold text-[var(--color-text-primary)] mb-3">About this role</h3>
-            <p className="text-[var(--color-text-secondary)] leading-relaxed">
-              {stripHtml(job.job_description_summary || '') || 'No description available.'}
+            <p className="text-[var(--color-text-secondary)] leading-relaxed whitespace-pre-line">
+              {description || 'No description available.'}
             </p>
           </div>
 
@@ -462,6 +467,7 @@ function App() {
     login,
     logout
   } = useUserProfile();
+  const similarity = useSimilarJobs(`${isAuthenticated}:${profile?.updatedAt || ''}:${lastScraped}`);
   
   const [savedJobs, setSavedJobs] = useState<Set<string>>(new Set());
   const [activeTab, setActiveTab] = useState<'jobs' | 'saved' | 'ai-matches'>('jobs');
@@ -504,8 +510,8 @@ function App() {
   // AI Matching: Rank DESIGN jobs based on profile (filter out non-design roles)
   const matchedJobs = useMemo(() => {
     if (!profile || !isComplete) return designJobs as MatchedJob[];
-    return rankJobs(designJobs, profile);
-  }, [designJobs, profile, isComplete]);
+    return rankJobs(designJobs, profile, similarity);
+  }, [designJobs, profile, isComplete, similarity]);
 
   const filteredJobs = useMemo(() => {
     let filtered = matchedJobs.filter(job => {
@@ -514,10 +520,13 @@ function App() {
         const match = job.role.toLowerCase().includes(q) || job.company.toLowerCase().includes(q) || job.skills?.some((s: string) => s.toLowerCase().includes(q));
         if (!match) return false;
       }
-      const jobRegions = getRegionFromLocation(job.location);
+      // Resolved once by the server gazetteer when present; string checks otherwise
+      const jobRegions = job.location_country !== undefined
+        ? [...(job.location_country ? [job.location_country] : []), ...(job.location_remote || !job.location_country ? ['REMOTE'] : [])]
+        : getRegionFromLocation(job.location);
       if (!selectedRegions.some(r => jobRegions.includes(r))) return false;
       if (job.remote_status !== 'Remote') {
-        const jobTz = getTimezoneFromLocation(job.location);
+        const jobTz = job.location_utc_offset != null ? job.location_utc_offset / 60 : getTimezoneFromLocation(job.location);
         if (jobTz < timezoneRange.min || jobTz > timezoneRange.max) return false;
       }
       if (!remoteTypes.includes(job.remote_status)) return false;
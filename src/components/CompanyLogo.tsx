@@ -6,12 +6,17 @@ interface CompanyLogoProps {
   className?: string;
 }
 
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
+
 const SIZE_CLASSES = {
   sm: 'w-10 h-10 text-sm',
   md: 'w-14 h-14 text-xl',
   lg: 'w-16 h-16 text-2xl'
 };
 
+// /api/assets/logo serves 32, 64, 128 or 256px; 128 covers every box above at 2x
+const THUMB_PIXELS = 128;
+
 // Major company domains for logo lookup
 const COMPANY_DOMAINS: Record<string, string> = {
   // Tech Giants
@@ -150,6 +155,16 @@ function getCompanyDomain(company: string): string | null {
   return null;
 }
 
+// Served from the API's thumbnail cache; Clearbit is only tried when the server has no logo
+function getServerLogoUrl(company: string, pixels: number): string {
+  return `${API_URL}/assets/logo/${encodeURIComponent(company)}?size=${pixels}`;
+}
+
+function getClearbitUrl(company: string, pixels: number): string | null {
+  const domain = getCompanyDomain(company);
+  return domain ? `https://logo.clearbit.com/${domain}?size=${pixels}` : null;
+}
+
 function getInitials(company: string): string {
   return company
     .split(/\s+/)
@@ -174,15 +189,9 @@ export function CompanyLogo({ company, size = 'md', className = '' }: CompanyLog
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    const domain = getCompanyDomain(company);
-    if (domain) {
-      // Try Clearbit Logo API
-      const url = `https://logo.clearbit.com/${domain}?size=256`;
-      setLogoUrl(url);
-    } else {
-      setError(true);
-      setLoading(false);
-    }
+    setLogoUrl(getServerLogoUrl(company, THUMB_PIXELS));
+    setError(false);
+    setLoading(true);
   }, [company]);
 
   const handleLoad = () => {
@@ -190,6 +199,11 @@ export function CompanyLogo({ company, size = 'md', className = '' }: CompanyLog
   };
 
   const handleError = () => {
+    const fallback = getClearbitUrl(company, 256);
+    if (fallback && logoUrl !== fallback) {
+      setLogoUrl(fallback);
+      return;
+    }
     setError(true);
     setLoading(false);
   };
@@ -237,9 +251,15 @@ export function CompanyLogo({ company, size = 'md', className = '' }: CompanyLog
 
 // Smaller inline version for lists
 export function CompanyLogoSmall({ company }: { company: string }) {
-  const domain = getCompanyDomain(company);
   const gradient = getGradientForCompany(company);
-  const [hasError, setHasError] = useState(!domain);
+  const fallback = getClearbitUrl(company, 64);
+  const [src, setSrc] = useState(getServerLogoUrl(company, 64));
+  const [hasError, setHasError] = useState(false);
+
+  useEffect(() => {
+    setSrc(getServerLogoUrl(company, 64));
+    setHasError(false);
+  }, [company]);
 
   if (hasError) {
     return (
@@ -253,10 +273,16 @@ export function CompanyLogoSmall({ company }: { company: string }) {
 
   return (
     <img
-      src={`https://logo.clearbit.com/${domain}?size=64`}
+      src={src}
       alt={company}
       className="w-8 h-8 rounded-lg object-contain bg-white shadow-sm p-0.5"
-      onError={() => setHasError(true)}
+      onError={() => {
+        if (fallback && src !== fallback) {
+          setSrc(fallback);
+        } else {
+          setHasError(true);
+        }
+      }}
     />
   );
 }
@@ -0,0 +1,47 @@
+import { useState, useEffect } from 'react';
+
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
+// Descriptions already fetched this session, by job id
+const descriptions = new Map<string, string>();
+
+// Full plain-text description of a job, fetched when jobId is set (e.g. when
+// its detail modal opens). Listings only carry the one-line summary. The
+// endpoint is cacheable, so reopening a job is served by the browser cache
+// even after a reload. null until loaded, or when the API is not available.
+export function useJobDescription(jobId: string | null): string | null {
+  const [description, setDescription] = useState<string | null>(
+    jobId ? descriptions.get(jobId) ?? null : null
+  );
+
+  useEffect(() => {
+    if (!jobId) {
+      setDescription(null);
+      return;
+    }
+    const cached = descriptions.get(jobId);
+    if (cached !== undefined) {
+      setDescription(cached);
+      return;
+    }
+
+    setDescription(null);
+    const controller = new AbortController();
+    fetch(`${API_URL}/jobs/${encodeURIComponent(jobId)}/description`, { signal: controller.signal })
+      .then(response => {
+        if (!response.ok) throw new Error(`Failed to fetch: ${response.status}`);
+        return response.json();
+      })
+      .then(data => {
+        descriptions.set(jobId, data.description || '');
+        setDescription(data.description || '');
+      })
+      .catch(err => {
+        if (err.name !== 'AbortError') {
+          console.warn('Job description not available:', err);
+        }
+      });
+    return () => controller.abort();
+  }, [jobId]);
+
+  return description;
+}
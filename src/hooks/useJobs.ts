@@ -12,7 +12,103 @@ interface JobsData {
 }
 
 const JOBS_URL = '/data/jobs.json';
-const API_URL = 'http://localhost:5000/api';
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
+
+// Refreshes run as background tasks; resolve once the task reports it is done
+function waitForTask(taskId: string): Promise<void> {
+  return new Promise((resolve, reject) => {
+    const events = new EventSource(`${API_URL}/tasks/${taskId}/events`);
+    events.addEventListener('done', (event) => {
+      events.close();
+      const task = JSON.parse((event as MessageEvent).data);
+      if (task.status === 'succeeded') {
+        resolve();
+      } else {
+        reject(new Error(task.error || 'Update failed'));
+      }
+    });
+    events.onerror = () => {
+      events.close();
+      reject(new Error('Lost connection to update task'));
+    };
+  });
+}
+
+const POLL_INTERVAL_MS = 5 * 60 * 1000;
+const PAGE_SIZE = 200; // the most /api/jobs returns at once
+
+interface Catalogue {
+  jobs: JobListing[];
+  lastScraped: string;
+  total: number;
+}
+
+// Every job from the API's catalogue snapshot, a page at a time; starts over if a new snapshot
+// is published midway, so the pages never mix two versions
+async function fetchCatalogue(): Promise<Catalogue> {
+  for (let attempt = 0; attempt < 3; attempt++) {
+    const jobs: JobListing[] = [];
+    let version: number | undefined;
+    let total = 0;
+    do {
+      const response = await fetch(`${API_URL}/jobs?offset=${jobs.length}&limit=${PAGE_SIZE}`);
+      if (!response.ok) {
+        throw new Error(`Failed to fetch: ${response.status}`);
+      }
+      const page = await response.json();
+      if (version !== undefined && page.version !== version) break;
+      version = page.version;
+      total = page.total;
+      jobs.push(...page.jobs);
+      if (page.jobs.length === 0) break;
+    } while (jobs.length < total);
+    if (jobs.length >= total) {
+      // Snapshot versions are publish times in nanoseconds
+      return { jobs, lastScraped: new Date((version ?? Date.now() * 1e6) / 1e6).toISOString(), total };
+    }
+  }
+  throw new Error('Job catalogue kept changing while loading');
+}
+
+async function fetchStaticJobs(): Promise<Catalogue> {
+  // Add cache-buster
+  const response = await fetch(`${JOBS_URL}?t=${Date.now()}`);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch: ${response.status}`);
+  }
+  const data = await response.json();
+  return {
+    jobs: data.jobs || [],
+    lastScraped: data.last_scraped || new Date().toISOString(),
+    total: data.total_jobs || 0
+  };
+}
+
+// Catalogue refreshes are pushed over SSE (EventSource reconnects and resumes
+// by itself); polling is only the fallback when there is no session or the
+// stream is refused
+function subscribeToJobUpdates(onJobsUpdated: () => void): () => void {
+  const token = localStorage.getItem('jh_token');
+  let interval: ReturnType<typeof setInterval> | undefined;
+  const poll = () => {
+    if (!interval) interval = setInterval(onJobsUpdated, POLL_INTERVAL_MS);
+  };
+
+  if (!token || typeof EventSource === 'undefined') {
+    poll();
+    return () => clearInterval(interval);
+  }
+
+  const events = new EventSource(`${API_URL}/push/events?token=${encodeURIComponent(token)}`);
+  events.addEventListener('jobs', () => onJobsUpdated());
+  events.onerror = () => {
+    if (events.readyState === EventSource.CLOSED) poll();
+  };
+  return () => {
+    events.close();
+    clearInterval(interval);
+  };
+}
 
 export function useJobs(): JobsData {
   const [jobs, setJobs] = useState<JobListing[]>([]);
@@ -26,18 +122,19 @@ export function useJobs(): JobsData {
     try {
       setIsLoading(true);
       setError(null);
-      
-      // Add cache-buster
-      const response = await fetch(`${JOBS_URL}?t=${Date.now()}`);
-      
-      if (!response.ok) {
-        throw new Error(`Failed to fetch: ${response.status}`);
+
+      // The API's listings carry one-line summaries; jobs.json (full scraped HTML) is the fallback
+      // when no API server is running
+      let data: Catalogue;
+      try {
+        data = await fetchCatalogue();
+      } catch (err) {
+        console.warn('API not available, fetching local jobs:', err);
+        data = await fetchStaticJobs();
       }
-      
-      const data = await response.json();
-      setJobs(data.jobs || []);
-      setLastScraped(data.last_scraped || new Date().toISOString());
-      setTotalJobs(data.total_jobs || 0);
+      setJobs(data.jobs);
+      setLastScraped(data.lastScraped);
+      setTotalJobs(data.total);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Unknown error');
       console.error('Error fetching jobs:', err);
@@ -51,10 +148,14 @@ export function useJobs(): JobsData {
       setIsUpdating(true);
       setError(null);
       
-      // Call the API to trigger update
+      // Call the API to trigger update (admins only; anyone else just refetches)
+      const token = localStorage.getItem('jh_token');
       const response = await fetch(`${API_URL}/jobs/update`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' }
+        headers: {
+          'Content-Type': 'application/json',
+          ...(token ? { Authorization: `Bearer ${token}` } : {})
+        }
       });
       
       if (!response.ok) {
@@ -64,14 +165,17 @@ export function useJobs(): JobsData {
       const result = await response.json();
       
       if (result.success) {
+        if (result.task_id) {
+          await waitForTask(result.task_id);
+        }
         // Refetch jobs after update
         await fetchJobs();
       } else {
         throw new Error(result.error || 'Update failed');
       }
     } catch (err) {
-      // If API is not available, just refetch local file
-      console.warn('API not available, fetching local jobs:', err);
+      // Not an admin, or no API: just reload the catalogue
+      console.warn('Could not trigger a job update:', err);
       await fetchJobs();
     } finally {
       setIsUpdating(false);
@@ -81,10 +185,7 @@ export function useJobs(): JobsData {
   useEffect(() => {
     fetchJobs();
     
-    // Auto-refresh every 5 minutes
-    const interval = setInterval(fetchJobs, 5 * 60 * 1000);
-    
-    return () => clearInterval(interval);
+    return subscribeToJobUpdates(fetchJobs);
   }, [fetchJobs]);
 
   return {
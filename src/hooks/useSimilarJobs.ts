@@ -0,0 +1,46 @@
+import { useState, useEffect } from 'react';
+
+const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
+const SIMILAR_LIMIT = 200;
+
+// Cosine similarity (0-1) of the jobs nearest the signed-in user's resume,
+// by job id. Empty without a session, a resume, or the API; matching then
+// falls back to keywords alone. Refetched when refreshKey changes, e.g. on a
+// profile save or a catalogue refresh.
+export function useSimilarJobs(refreshKey: string): Record<string, number> {
+  const [similarity, setSimilarity] = useState<Record<string, number>>({});
+
+  useEffect(() => {
+    const token = localStorage.getItem('jh_token');
+    if (!token) {
+      setSimilarity({});
+      return;
+    }
+
+    const controller = new AbortController();
+    fetch(`${API_URL}/jobs/similar?limit=${SIMILAR_LIMIT}`, {
+      headers: { Authorization: `Bearer ${token}` },
+      signal: controller.signal,
+    })
+      .then(response => {
+        if (!response.ok) throw new Error(`Failed to fetch: ${response.status}`);
+        return response.json();
+      })
+      .then(data => {
+        const scores: Record<string, number> = {};
+        for (const job of data.jobs || []) {
+          scores[job.id] = job.similarity;
+        }
+        setSimilarity(scores);
+      })
+      .catch(err => {
+        if (err.name !== 'AbortError') {
+          console.warn('Similar jobs not available:', err);
+          setSimilarity({});
+        }
+      });
+    return () => controller.abort();
+  }, [refreshKey]);
+
+  return similarity;
+}
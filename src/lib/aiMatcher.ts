@@ -168,8 +168,17 @@ export function detectExperienceLevel(text: string): { level: string; years: num
   return { level: 'entry', years };
 }
 
+// API listings carry a one-line summary instead of the scraped description, so their tagged
+// skills go in too; jobs.json listings still have the whole description
+function matchText(job: JobListing): string {
+  const text = job.description_summary !== undefined
+    ? `${job.role} ${job.description_summary} ${(job.skills || []).join(' ')}`
+    : `${job.role} ${job.job_description_summary || ''}`;
+  return text.toLowerCase();
+}
+
 function calculateSkillMatch(job: JobListing, userSkills: string[]): { score: number; matched: string[]; missing: string[] } {
-  const jobText = `${job.role} ${job.job_description_summary || ''}`.toLowerCase();
+  const jobText = matchText(job);
   const jobSkills = extractSkills(jobText);
   
   if (jobSkills.length === 0) {
@@ -229,7 +238,7 @@ function calculateRoleMatch(job: JobListing, preferredRoles: string[]): number {
 }
 
 function calculateExperienceMatch(job: JobListing, userLevel: string, userYears: number): number {
-  const jobText = `${job.role} ${job.job_description_summary || ''}`.toLowerCase();
+  const jobText = matchText(job);
   const { level: jobLevel, years: jobYears } = detectExperienceLevel(jobText);
   
   const levelScores: Record<string, number> = { entry: 1, mid: 2, senior: 3, lead: 4, executive: 5 };
@@ -253,25 +262,42 @@ function calculateExperienceMatch(job: JobListing, userLevel: string, userYears:
   return Math.round(levelMatch);
 }
 
+// Location priority scores (higher = more relevant for AU designers)
+const LOCATION_PRIORITIES: Record<string, number> = {
+  'sydney': 10, 'melbourne': 10, 'brisbane': 9, 'perth': 9, 'adelaide': 9, 'canberra': 9,
+  'australia': 8, 'au': 8,
+  'auckland': 8, 'wellington': 8, 'new zealand': 8, 'nz': 8,
+  'singapore': 7, 'sg': 7,
+  'tokyo': 6, 'japan': 6, 'osaka': 6,
+  'hong kong': 6, 'hk': 6,
+  'remote': 5, 'anywhere': 5, 'worldwide': 5,
+};
+// The same priorities keyed by the server's resolved city and country
+const CITY_PRIORITIES: Record<string, number> = {
+  Sydney: 10, Melbourne: 10, Brisbane: 9, Perth: 9, Adelaide: 9, Canberra: 9,
+};
+const COUNTRY_PRIORITIES: Record<string, number> = { AU: 8, NZ: 8, SG: 7, JP: 6, HK: 6 };
+const COUNTRY_CODES: Record<string, string> = {
+  'australia': 'AU', 'new zealand': 'NZ', 'singapore': 'SG', 'japan': 'JP',
+};
+
 function calculateLocationMatch(job: JobListing, userLocation: string, workStyle: string): { score: number; priority: number } {
   const jobLocation = job.location.toLowerCase();
   const userLoc = userLocation.toLowerCase();
   
-  // Location priority scores (higher = more relevant for AU designers)
-  const locationPriorities: Record<string, number> = {
-    'sydney': 10, 'melbourne': 10, 'brisbane': 9, 'perth': 9, 'adelaide': 9, 'canberra': 9,
-    'australia': 8, 'au': 8,
-    'auckland': 8, 'wellington': 8, 'new zealand': 8, 'nz': 8,
-    'singapore': 7, 'sg': 7,
-    'tokyo': 6, 'japan': 6, 'osaka': 6,
-    'hong kong': 6, 'hk': 6,
-    'remote': 5, 'anywhere': 5, 'worldwide': 5,
-  };
-  
   let priority = 1;
-  for (const [loc, p] of Object.entries(locationPriorities)) {
-    if (jobLocation.includes(loc)) {
-      priority = Math.max(priority, p);
+  if (job.location_country !== undefined) {
+    priority = Math.max(
+      priority,
+      CITY_PRIORITIES[job.location_city || ''] || 0,
+      COUNTRY_PRIORITIES[job.location_country] || 0,
+      job.location_remote ? 5 : 0,
+    );
+  } else {
+    for (const [loc, p] of Object.entries(LOCATION_PRIORITIES)) {
+      if (jobLocation.includes(loc)) {
+        priority = Math.max(priority, p);
+      }
     }
   }
   
@@ -290,9 +316,11 @@ function calculateLocationMatch(job: JobListing, userLocation: string, workStyle
   }
   
   // Same country/region match
-  const countries = ['australia', 'new zealand', 'singapore', 'japan'];
-  const userCountry = countries.find(c => userLoc.includes(c));
-  const jobCountry = countries.find(c => jobLocation.includes(c));
+  const countries = Object.keys(COUNTRY_CODES);
+  const userName = countries.find(c => userLoc.includes(c));
+  const userCountry = userName && COUNTRY_CODES[userName];
+  const jobName = countries.find(c => jobLocation.includes(c));
+  const jobCountry = job.location_country !== undefined ? job.location_country : jobName && COUNTRY_CODES[jobName];
   
   if (userCountry && jobCountry && userCountry === jobCountry) {
     return { score: 90, priority };
@@ -307,16 +335,25 @@ function calculateLocationMatch(job: JobListing, userLocation: string, workStyle
 }
 
 function calculateSalaryMatch(job: JobListing, userExpectation?: number): number {
-  if (!userExpectation || !job.salary_range || job.salary_range === 'Not disclosed') {
+  if (!userExpectation) {
     return 70; // Neutral score
   }
   
-  // Extract salary from range string
-  const salaryMatch = job.salary_range.match(/\$?([\d,]+)/g);
-  if (!salaryMatch) return 70;
-  
-  const salaries = salaryMatch.map(s => parseInt(s.replace(/,/g, '')));
-  const minSalary = Math.min(...salaries);
+  let minSalary: number;
+  if (job.salary_min_aud != null) {
+    // Already parsed and annualised by the server
+    minSalary = job.salary_min_aud;
+  } else {
+    if (job.salary_currency === '' || !job.salary_range || job.salary_range === 'Not disclosed') {
+      return 70;
+    }
+    // Extract salary from range string
+    const salaryMatch = job.salary_range.match(/\$?([\d,]+)/g);
+    if (!salaryMatch) return 70;
+    
+    const salaries = salaryMatch.map(s => parseInt(s.replace(/,/g, '')));
+    minSalary = Math.min(...salaries);
+  }
   
   if (minSalary >= userExpectation) {
     return 100;
@@ -345,7 +382,19 @@ function calculateIndustryMatch(job: JobListing, preferredIndustries: string[]):
   return 60;
 }
 
-export function calculateJobMatch(job: JobListing, userProfile: UserProfile): MatchScore {
+// Scale a job's resume similarity (cosine, 0-1) against the best one, 0-100;
+// undefined for jobs outside the server's nearest neighbours
+function calculateSemanticMatch(job: JobListing, similarity?: Record<string, number>): number | undefined {
+  if (!similarity || !(job.id in similarity)) return undefined;
+  const best = Math.max(...Object.values(similarity));
+  return best > 0 ? Math.round((similarity[job.id] / best) * 100) : 0;
+}
+
+export function calculateJobMatch(
+  job: JobListing,
+  userProfile: UserProfile,
+  similarity?: Record<string, number>,
+): MatchScore {
   // Filter out non-design roles entirely
   if (!isDesignRole(job.role)) {
     return {
@@ -360,6 +409,12 @@ export function calculateJobMatch(job: JobListing, userProfile: UserProfile): Ma
   }
   
   const skillMatch = calculateSkillMatch(job, userProfile.extractedSkills);
+  const semanticMatch = calculateSemanticMatch(job, similarity);
+  // Keywords only see DESIGN_SKILLS; resume similarity sees the whole text.
+  // Jobs outside the nearest neighbours keep the keyword score alone.
+  const skillsScore = semanticMatch === undefined
+    ? skillMatch.score
+    : Math.round(skillMatch.score * 0.5 + semanticMatch * 0.5);
   const roleMatch = calculateRoleMatch(job, userProfile.preferredRoles);
   const experienceMatch = calculateExperienceMatch(job, userProfile.experienceLevel, userProfile.yearsOfExperience);
   const locationResult = calculateLocationMatch(job, userProfile.location, userProfile.workStyle);
@@ -378,7 +433,7 @@ export function calculateJobMatch(job: JobListing, userProfile: UserProfile): Ma
   
   const overall = Math.round(
     roleMatch * weights.role +
-    skillMatch.score * weights.skills +
+    skillsScore * weights.skills +
     experienceMatch * weights.experience +
     locationResult.score * weights.location +
     salaryMatch * weights.salary +
@@ -400,6 +455,10 @@ export function calculateJobMatch(job: JobListing, userProfile: UserProfile): Ma
     reasons.push('Relevant skills');
   }
   
+  if (semanticMatch !== undefined && semanticMatch >= 80) {
+    reasons.push('Similar to your resume');
+  }
+  
   if (locationResult.score >= 90) {
     reasons.push(job.remote_status === 'Remote' ? 'Fully remote' : 'Great location match');
   }
@@ -418,11 +477,12 @@ export function calculateJobMatch(job: JobListing, userProfile: UserProfile): Ma
   
   return {
     overall,
-    skills: skillMatch.score,
+    skills: skillsScore,
     experience: experienceMatch,
     location: locationResult.score,
     salary: salaryMatch,
     culture: industryMatch,
+    semantic: semanticMatch,
     reasons: reasons.length > 0 ? reasons : ['Design role match']
   };
 }
@@ -442,7 +502,7 @@ export function generateMatchExplanation(job: JobListing, userProfile: UserProfi
   
   // Add specific details
   if (matchScore.skills >= 70) {
-    const jobText = `${job.role} ${job.job_description_summary || ''}`.toLowerCase();
+    const jobText = matchText(job);
     const jobSkills = extractSkills(jobText);
     const matchedSkills = jobSkills.filter(skill => 
       userProfile.extractedSkills.some(userSkill => 
@@ -462,10 +522,14 @@ export function generateMatchExplanation(job: JobListing, userProfile: UserProfi
   return explanations.join(' ');
 }
 
-export function rankJobs(jobs: JobListing[], userProfile: UserProfile): MatchedJob[] {
+export function rankJobs(
+  jobs: JobListing[],
+  userProfile: UserProfile,
+  similarity?: Record<string, number>,
+): MatchedJob[] {
   const matched = jobs.map(job => {
-    const matchScore = calculateJobMatch(job, userProfile);
-    const jobText = `${job.role} ${job.job_description_summary || ''}`.toLowerCase();
+    const matchScore = calculateJobMatch(job, userProfile, similarity);
+    const jobText = matchText(job);
     const jobSkills = extractSkills(jobText);
     
     const matchedSkills = jobSkills.filter(skill => 
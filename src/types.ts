@@ -8,6 +8,19 @@ export interface JobListing {
   salary_range: string;
   salary_min?: number;
   salary_max?: number;
+  // Parsed from salary_range by the server (salary.py); null when no salary is stated
+  salary_currency?: string;
+  salary_period?: 'hour' | 'day' | 'week' | 'month' | 'year' | '';
+  salary_min_aud?: number | null; // annual
+  salary_max_aud?: number | null;
+  salary_min_usd?: number | null;
+  salary_max_usd?: number | null;
+  // Resolved from location by the server gazetteer (gazetteer.py); '' when the place is unknown
+  location_city?: string;
+  location_country?: string; // ISO code, as in the region filter
+  location_region?: 'APAC' | 'AMER' | 'EMEA' | '';
+  location_utc_offset?: number | null; // minutes, standard time
+  location_remote?: boolean;
   url: string;
   date_posted: string;
   date_scraped: string;
@@ -21,7 +34,10 @@ export interface JobListing {
   skills?: string[];
   industry?: string;
   visa_sponsorship?: boolean;
-  job_description_summary?: string;
+  job_description_summary?: string; // scraped HTML; API listings carry the fields below instead
+  description_summary?: string; // one-line plain text; full text from /api/jobs/{id}/description
+  description_words?: number;
+  description_chars?: number;
 }
 
 export interface DreamCompany {
@@ -98,6 +114,7 @@ export interface MatchScore {
   location: number;
   salary: number;
   culture: number;
+  semantic?: number; // resume similarity from /api/jobs/similar, scaled 0-100
   reasons: string[];
 }
 